@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AuthMeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'auth_me'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,177 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+LOCAL_SIZE = getattr(settings, "AUTH_TOKEN_CACHE_SIZE", 10_000)
+# Other processes can not evict their local entries, so keep them short.
+LOCAL_TTL = getattr(settings, "AUTH_TOKEN_LOCAL_TTL", 10)
+SHARED_TTL = getattr(settings, "AUTH_TOKEN_CACHE_TTL", 60 * 5)
+
+
+class LRUCache:
+    """Thread safe, size bounded mapping whose entries expire after ``ttl``."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self.data[key]
+                return None
+            self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = (value, time.monotonic() + self.ttl)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+
+class TokenCacheStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def record(self, name):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def as_dict(self):
+        lookups = self.local_hits + self.shared_hits + self.misses
+        hits = self.local_hits + self.shared_hits
+        return {
+            "lookups": lookups,
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "local_entries": len(local_cache.data),
+        }
+
+
+local_cache = LRUCache(LOCAL_SIZE, LOCAL_TTL)
+stats = TokenCacheStats()
+
+
+def token_cache_key(key):
+    # Keep raw tokens out of the shared cache.
+    return "auth:token:" + hashlib.sha256(key.encode()).hexdigest()
+
+
+def token_version_key(cache_key):
+    return cache_key + ":version"
+
+
+def forget_token(key):
+    """Retire the cached entry of a token; call it once the change committed.
+
+    The shared entry is not deleted but given a new version: a miss that read
+    the user before the commit stores its entry under the old version, which
+    no later lookup accepts.
+    """
+    cache_key = token_cache_key(key)
+    local_cache.delete(cache_key)
+    cache.set(token_version_key(cache_key), uuid.uuid4().hex, SHARED_TTL)
+
+
+def user_fields(user):
+    return {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields
+        if field.attname != "password"
+    }
+
+
+def build_user(fields):
+    """Rebuild the user from cached fields; the password stays deferred."""
+    model = get_user_model()
+    names = list(fields)
+    return model.from_db(
+        router.db_for_read(model), names, [fields[name] for name in names]
+    )
+
+
+def build_token(model, key, user):
+    """Rebuild the token for ``user``; ``created`` stays deferred."""
+    token = model.from_db(router.db_for_read(model), ["key", "user_id"], [key, user.pk])
+    token.user = user
+    return token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` that resolves tokens without a query when cached.
+
+    A token's user fields are looked up in a per process LRU, then in the
+    shared cache, and only then in the database. Entries are retired when
+    the token is deleted (logout) or the user is saved, see
+    ``auth_me.signals``. Shared entries carry the token's version, so one
+    built from rows read before such a change is never accepted.
+    """
+
+    def get_shared(self, cache_key):
+        """Return ``(version, fields)``; ``fields`` is None unless current."""
+        version_key = token_version_key(cache_key)
+        found = cache.get_many([version_key, cache_key])
+        version = found.get(version_key)
+        if version is None:
+            cache.add(version_key, uuid.uuid4().hex, SHARED_TTL)
+            return cache.get(version_key), None
+        entry = found.get(cache_key)
+        if entry is None or entry[0] != version:
+            return version, None
+        return version, entry[1]
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        fields = local_cache.get(cache_key)
+        if fields is not None:
+            stats.record("local_hits")
+        else:
+            version, fields = self.get_shared(cache_key)
+            if fields is not None:
+                stats.record("shared_hits")
+            else:
+                stats.record("misses")
+                model = self.get_model()
+                try:
+                    token = model.objects.select_related("user").get(key=key)
+                except model.DoesNotExist as exc:
+                    raise exceptions.AuthenticationFailed(_("Invalid token.")) from exc
+                fields = user_fields(token.user)
+                cache.set(cache_key, (version, fields), SHARED_TTL)
+            local_cache.set(cache_key, fields)
+
+        user = build_user(fields)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        return (user, build_token(self.get_model(), key, user))
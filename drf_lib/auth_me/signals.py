@@ -0,0 +1,23 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import forget_token
+from .models import CustomUser
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(instance, **kwargs):
+    # The key is the pk, which delete() clears before the commit.
+    key = instance.key
+    transaction.on_commit(lambda: forget_token(key))
+
+
+@receiver(post_save, sender=CustomUser)
+def forget_user_tokens(instance, created, **kwargs):
+    # is_active, is_staff and the cached profile fields may have changed.
+    if created:
+        return
+    keys = list(Token.objects.filter(user=instance).values_list("key", flat=True))
+    transaction.on_commit(lambda: [forget_token(key) for key in keys])
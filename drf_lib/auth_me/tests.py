@@ -1,3 +1,69 @@
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
 
-# Create your tests here.
+from .authentication import CachedTokenAuthentication, local_cache, token_cache_key
+from .models import CustomUser
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            "reader@example.com", password="x", is_active=True
+        )
+        cls.key = Token.objects.create(user=cls.user).key
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.auth = CachedTokenAuthentication()
+
+    def deactivate(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+    def test_cached_lookups_skip_the_database(self):
+        self.auth.authenticate_credentials(self.key)
+        with self.assertNumQueries(0):
+            user, token = self.auth.authenticate_credentials(self.key)
+            local_cache.clear()
+            self.auth.authenticate_credentials(self.key)
+        self.assertEqual(user, self.user)
+        self.assertEqual(token.pk, self.key)
+        self.assertEqual(token.user, user)
+
+    def test_invalid_token(self):
+        with self.assertRaises(exceptions.AuthenticationFailed) as caught:
+            self.auth.authenticate_credentials("nope")
+        self.assertIsInstance(caught.exception.__cause__, Token.DoesNotExist)
+
+    def test_deactivation_retires_the_entry(self):
+        self.auth.authenticate_credentials(self.key)
+        self.deactivate()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(self.key)
+
+    def test_entry_read_before_deactivation_is_not_accepted(self):
+        # A miss that read the active user, then stored it after the commit.
+        cache_key = token_cache_key(self.key)
+        version, fields = self.auth.get_shared(cache_key)
+        self.assertIsNone(fields)
+        self.auth.authenticate_credentials(self.key)
+        stale = cache.get(cache_key)
+        self.deactivate()
+        cache.set(cache_key, stale)
+        local_cache.clear()
+        self.assertEqual(stale[0], version)
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(self.key)
+
+    def test_deleted_token_is_not_accepted(self):
+        self.auth.authenticate_credentials(self.key)
+        local_cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            Token.objects.get(key=self.key).delete()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.auth.authenticate_credentials(self.key)
@@ -1,8 +1,13 @@
 from django.urls import path, include, re_path
 
+from .views import TokenCacheStatsView
+
 app_name = "auth_me"
 
 urlpatterns = [
     path("auth/", include("djoser.urls")),
     path("auth/", include("djoser.urls.authtoken")),
+    path(
+        "auth/token-cache/", TokenCacheStatsView.as_view(), name="token-cache-stats"
+    ),
 ]
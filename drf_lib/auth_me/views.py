@@ -1,3 +1,12 @@
-from django.shortcuts import render
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from .authentication import stats
+
+
+class TokenCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(stats.as_dict())
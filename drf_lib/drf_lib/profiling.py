@@ -0,0 +1,331 @@
+"""
+Opt-in request profiling.
+
+Enable with ``REQUEST_PROFILING = True`` and add
+``drf_lib.profiling.RequestProfilingMiddleware`` to ``MIDDLEWARE``.
+Every request is then measured per resolved URL name (wall time, number
+and duration of DB queries, duplicate SQL, cache hits and misses, template
+render time). The numbers are folded into in-process histograms, sent back
+in a ``Server-Timing`` header and served to staff as JSON by ``stats_view``.
+
+The middleware works for sync and async views. Queries are recorded by an
+execute wrapper installed on every database connection, which finds the
+request's profile through a context variable; that variable follows the
+request into ``sync_to_async`` threads, so ORM calls of async views count.
+Queries made while a streaming response body is iterated happen after the
+middleware returned and are not counted.
+"""
+
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the histogram buckets, in milliseconds (or queries).
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf"))
+
+_current = contextvars.ContextVar("request_profile", default=None)
+_MISSING = object()
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples."""
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if count and seen >= target:
+                return round(min(bound, self.max), 3)
+        return round(self.max, 3)
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": round(self.max, 3),
+        }
+
+
+class ViewStats:
+    def __init__(self):
+        self.wall_ms = Histogram()
+        self.db_ms = Histogram()
+        self.queries = Histogram()
+        self.render_ms = Histogram()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.duplicate_queries = 0
+        self.requests_with_duplicates = 0
+
+    def add(self, profile, wall_ms):
+        self.wall_ms.add(wall_ms)
+        self.db_ms.add(profile.db_ms)
+        self.queries.add(profile.queries)
+        if profile.render_ms is not None:
+            self.render_ms.add(profile.render_ms)
+        self.cache_hits += profile.cache_hits
+        self.cache_misses += profile.cache_misses
+        duplicates = profile.duplicates()
+        if duplicates:
+            self.duplicate_queries += sum(duplicates.values())
+            self.requests_with_duplicates += 1
+
+    def as_dict(self):
+        return {
+            "wall_ms": self.wall_ms.as_dict(),
+            "db_ms": self.db_ms.as_dict(),
+            "queries": self.queries.as_dict(),
+            "render_ms": self.render_ms.as_dict(),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "duplicate_queries": self.duplicate_queries,
+            "requests_with_duplicates": self.requests_with_duplicates,
+        }
+
+
+class StatsRegistry:
+    """Per view statistics over a rolling window.
+
+    Samples go into the current window; when it is older than ``window``
+    seconds it becomes the previous window and a new one starts, so the
+    endpoint always shows between one and two windows of history.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.current = {}
+        self.previous = {}
+
+    def _roll(self, now):
+        if now - self.started >= self.window:
+            self.previous = self.current
+            self.current = {}
+            self.started = now
+
+    def add(self, view_name, profile, wall_ms):
+        with self.lock:
+            self._roll(time.time())
+            self.current.setdefault(view_name, ViewStats()).add(profile, wall_ms)
+
+    def snapshot(self):
+        with self.lock:
+            self._roll(time.time())
+            return {
+                "window_seconds": self.window,
+                "current_window_started": self.started,
+                "current": {k: v.as_dict() for k, v in self.current.items()},
+                "previous": {k: v.as_dict() for k, v in self.previous.items()},
+            }
+
+
+registry = StatsRegistry(getattr(settings, "REQUEST_PROFILING_WINDOW", 300))
+
+
+class RequestProfile:
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.sql = Counter()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.render_started = None
+        self.render_ms = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - started) * 1000
+            self.queries += 1
+            self.sql[sql] += 1
+
+    def rendered(self, _response):
+        """Post render callback; Django passes it the rendered response."""
+        self.render_ms = (time.perf_counter() - self.render_started) * 1000
+
+    def duplicates(self):
+        return {sql: count - 1 for sql, count in self.sql.items() if count > 1}
+
+    def server_timing(self, wall_ms):
+        parts = [
+            f"total;dur={wall_ms:.1f}",
+            f'db;dur={self.db_ms:.1f};desc="{self.queries} queries"',
+            f'cache;desc="{self.cache_hits} hits {self.cache_misses} misses"',
+        ]
+        if self.render_ms is not None:
+            parts.append(f"render;dur={self.render_ms:.1f}")
+        duplicates = sum(self.duplicates().values())
+        if duplicates:
+            parts.append(f'dup;desc="{duplicates} duplicate queries"')
+        return ", ".join(parts)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper of every connection; a no-op outside profiled requests."""
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    return profile(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install_query_recorders(**kwargs):
+    """Cover the connections of the thread a request runs its queries in.
+
+    ``request_started`` is sent in that thread, also under ASGI, so this
+    reaches connections that were opened before the middleware was loaded.
+    """
+    for connection in connections.all():
+        install_query_recorder(connection)
+
+
+def counting_get(original):
+    def get(key, default=None, version=None):
+        value = original(key, _MISSING, version)
+        profile = _current.get()
+        if profile is not None:
+            if value is _MISSING:
+                profile.cache_misses += 1
+            else:
+                profile.cache_hits += 1
+        return default if value is _MISSING else value
+
+    get.requests = 0
+    return get
+
+
+def count_cache_gets():
+    """Wrap ``get`` of the request's cache instances; returns an undo callable.
+
+    The wrapper is set on the instance, not the backend class, and removed
+    when the last profiled request using that instance is done. Concurrent
+    async requests can share an instance, so hits go to whichever request's
+    profile is current.
+    """
+    wrapped = []
+    for alias in settings.CACHES:
+        backend = caches[alias]
+        get = vars(backend).get("get")
+        if get is None:
+            get = backend.get = counting_get(backend.get)
+        get.requests += 1
+        wrapped.append(backend)
+
+    def undo():
+        for backend in wrapped:
+            backend.get.requests -= 1
+            if not backend.get.requests:
+                del backend.get
+
+    return undo
+
+
+class RequestProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_PROFILING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.duplicate_threshold = getattr(
+            settings, "REQUEST_PROFILING_DUPLICATE_THRESHOLD", 2
+        )
+        connection_created.connect(install_query_recorder)
+        request_started.connect(install_query_recorders)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile = RequestProfile()
+        token = _current.set(profile)
+        undo = count_cache_gets()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            undo()
+            _current.reset(token)
+        return self.finish(request, response, profile, started)
+
+    async def __acall__(self, request):
+        profile = RequestProfile()
+        token = _current.set(profile)
+        undo = count_cache_gets()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            undo()
+            _current.reset(token)
+        return self.finish(request, response, profile, started)
+
+    def finish(self, request, response, profile, started):
+        wall_ms = (time.perf_counter() - started) * 1000
+        match = getattr(request, "resolver_match", None)
+        view_name = match.view_name if match else "<unresolved>"
+        registry.add(view_name, profile, wall_ms)
+        response["Server-Timing"] = profile.server_timing(wall_ms)
+
+        duplicates = profile.duplicates()
+        if sum(duplicates.values()) >= self.duplicate_threshold:
+            sql, count = max(duplicates.items(), key=lambda item: item[1])
+            logger.warning(
+                "%s ran %d duplicate queries; most repeated (%d extra): %s",
+                view_name,
+                sum(duplicates.values()),
+                count,
+                sql,
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        profile = _current.get()
+        if profile is not None:
+            profile.render_started = time.perf_counter()
+            response.add_post_render_callback(profile.rendered)
+        return response
+
+
+def stats_view(request):
+    if not (request.user.is_authenticated and request.user.is_staff):
+        return JsonResponse({"error": "Permission denied."}, status=403)
+    return JsonResponse(registry.snapshot())
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "drf_lib.profiling.RequestProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -55,6 +57,10 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Per view timing, query and cache statistics, see drf_lib/profiling.py.
+REQUEST_PROFILING = False
+REQUEST_PROFILING_WINDOW = 300
+
 ROOT_URLCONF = "drf_lib.urls"
 
 TEMPLATES = [
@@ -134,7 +140,7 @@ EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        "auth_me.authentication.CachedTokenAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.AllowAny"],
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
@@ -157,5 +163,20 @@ DJOSER = {
 STATICFILES_DIRS = [BASE_DIR / "static"]
 
 CELERY_BROKER_URL = "redis://localhost:6379/0"
+CELERY_RESULT_BACKEND = CELERY_BROKER_URL
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
+
+# LocMem by default (and in tests). The catalog version, cached responses and
+# cached tokens must be shared by every worker process, so deployments
+# running more than one set LIB_REDIS_CACHE=1 to use the Redis that Celery
+# already talks to.
+if os.environ.get("LIB_REDIS_CACHE"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ.get("LIB_CACHE_URL", CELERY_BROKER_URL),
+        }
+    }
+LIB_RESPONSE_CACHE_TIMEOUT = 60 * 5
+AUTH_TOKEN_CACHE_TTL = 60 * 5
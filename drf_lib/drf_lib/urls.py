@@ -18,7 +18,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from . import profiling
+
 urlpatterns = [
+    path("admin/profiling/", profiling.stats_view, name="request_profiling"),
     path("admin/", admin.site.urls),
     path("api/", include("auth_me.urls", namespace="auth_me")),
     path("book/", include("lib.urls", namespace="books")), 
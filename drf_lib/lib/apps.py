@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LibConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'lib'
+
+    def ready(self):
+        from . import signals  # noqa: F401
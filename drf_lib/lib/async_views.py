@@ -0,0 +1,144 @@
+"""
+Async read endpoints for the book catalog.
+
+They answer the same queries as ``BookListCreateView`` and ``BookDetailView``
+(filters, ``?search=``, ``?ordering=``, keyset cursors) but run on the event
+loop under ASGI: rows come from the async ORM and the list is streamed as it
+is read, instead of going through DRF's sync stack on a worker thread. The
+list links ``next`` and ``previous`` pages with the same cursors as the sync
+list; a previous page is read backwards, so only it is held before sending.
+"""
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import condition, require_safe
+from rest_framework.utils.urls import replace_query_param
+
+from .cache import catalog_etag, catalog_last_modified
+from .filters import BookFilter
+from .models import Book
+from .pagination import (
+    BookCursorPagination,
+    InvalidCursor,
+    decode_token,
+    encode_token,
+    keyset_ordering,
+    order_by,
+    position_of,
+    seek,
+)
+from .search import search_books
+from .serializers import book_values_serializer
+from .views import BookListCreateView
+
+
+def get_ordering(request):
+    """``?ordering=`` as ``OrderingFilter`` reads it, then made a keyset."""
+    fields = [
+        field.strip()
+        for field in request.GET.get("ordering", "").split(",")
+        if field.strip().lstrip("-") in BookListCreateView.ordering_fields
+    ]
+    return keyset_ordering(fields or BookListCreateView.ordering)
+
+
+def get_page_size(request):
+    pagination = BookCursorPagination
+    try:
+        size = int(request.GET.get(pagination.page_size_query_param, ""))
+    except ValueError:
+        return pagination.page_size
+    return min(max(size, 1), pagination.max_page_size)
+
+
+def page_links(base_url, first, last, position, reverse, has_more):
+    """``(next, previous)`` as ``BookCursorPagination`` links them."""
+    next_link = previous_link = None
+    if last is not None and (has_more or reverse):
+        next_link = replace_query_param(base_url, "cursor", encode_token(last))
+    if first is not None and position is not None and (has_more or not reverse):
+        previous_link = replace_query_param(
+            base_url, "cursor", encode_token(first, True)
+        )
+    return next_link, previous_link
+
+
+async def aiter_rows(rows):
+    """Iterate a list or an async iterator of rows alike."""
+    if isinstance(rows, list):
+        for row in rows:
+            yield row
+    else:
+        async for row in rows:
+            yield row
+
+
+@require_safe
+@condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified)
+async def book_list(request):
+    filterset = BookFilter(request.GET, queryset=Book.objects.all())
+    if not filterset.is_valid():
+        return JsonResponse(filterset.errors, status=400)
+    queryset = search_books(filterset.qs, request.GET.get("search", ""))
+
+    ordering = get_ordering(request)
+    token = request.GET.get("cursor")
+    position, reverse = None, False
+    if token:
+        try:
+            position, reverse = decode_token(token, ordering, Book)
+        except InvalidCursor:
+            return JsonResponse(
+                {"detail": BookCursorPagination.invalid_cursor_message}, status=404
+            )
+        queryset = queryset.filter(seek(ordering, position, reverse))
+
+    page_size = get_page_size(request)
+    queryset = order_by(queryset, ordering, reverse)
+    rows = book_values_serializer.values(queryset)[: page_size + 1]
+    base_url = request.build_absolute_uri()
+
+    async def read_page():
+        """Return ``(rows, has_more)`` for a previous page, in display order."""
+        page = [row async for row in rows.aiterator(chunk_size=page_size + 1)]
+        return page[page_size - 1 :: -1], len(page) > page_size
+
+    async def stream():
+        yield '{"results": ['
+        count = 0
+        first = last = None
+        has_more = False
+        if reverse:
+            # Read backwards from the cursor, so the page is flipped before use.
+            page, has_more = await read_page()
+        else:
+            page = rows.aiterator(chunk_size=page_size + 1)
+        async for row in aiter_rows(page):
+            if count == page_size:
+                has_more = True
+                break
+            last = position_of(ordering, row)
+            if first is None:
+                first = last
+            data = book_values_serializer.to_representation(row)
+            yield ("," if count else "") + json.dumps(data, cls=DjangoJSONEncoder)
+            count += 1
+        links = page_links(base_url, first, last, position, reverse, has_more)
+        yield '], "next": {}, "previous": {}}}'.format(*map(json.dumps, links))
+
+    return StreamingHttpResponse(stream(), content_type="application/json")
+
+
+@require_safe
+@condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified)
+async def book_detail(request, pk):
+    queryset = book_values_serializer.values(Book.objects.filter(pk=pk))
+    try:
+        row = await queryset.aget()
+    except Book.DoesNotExist:
+        return JsonResponse({"detail": "No Book matches the given query."}, status=404)
+    return JsonResponse(
+        book_values_serializer.to_representation(row), encoder=DjangoJSONEncoder
+    )
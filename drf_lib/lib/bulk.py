@@ -0,0 +1,146 @@
+import functools
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import bump_catalog_version, forget_books
+from .models import Book
+from .serializers import BookSerializer
+from .tasks import queue_book_notifications
+
+BATCH_SIZE = getattr(settings, "LIB_BULK_BATCH_SIZE", 500)
+
+
+class BulkResult:
+    def __init__(self):
+        self.ids = []
+        self.errors = []
+
+    def add_error(self, index, errors):
+        self.errors.append({"index": index, "errors": errors})
+
+    def as_dict(self, key):
+        return {key: self.ids, "errors": self.errors}
+
+
+class BookBulkWriter:
+    """Create, update or delete books in batches inside one transaction.
+
+    Items are validated with ``BookSerializer(many=True)`` one batch at a
+    time. Without ``partial_success`` a single invalid item rolls the whole
+    request back, and the remaining items are still validated so that every
+    error is reported. With it, valid items are written and invalid ones are
+    only reported. Errors carry the item's index in the request.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, partial_success=False):
+        self.batch_size = batch_size
+        self.partial_success = partial_success
+
+    def batches(self, items):
+        """Yield lists of ``(index, item)`` pairs of at most ``batch_size``."""
+        for start in range(0, len(items), self.batch_size):
+            yield list(enumerate(items[start : start + self.batch_size], start))
+
+    def validate(self, batch, result, partial=False):
+        """Return ``[(index, validated_data), ...]`` for the valid items."""
+        serializer = BookSerializer(
+            data=[item for index, item in batch], many=True, partial=partial
+        )
+        if serializer.is_valid():
+            return [
+                (index, data)
+                for (index, item), data in zip(batch, serializer.validated_data)
+            ]
+        valid = []
+        for (index, item), errors in zip(batch, serializer.errors):
+            if errors:
+                result.add_error(index, errors)
+            else:
+                valid.append((index, serializer.child.run_validation(item)))
+        return valid
+
+    def writable(self, result):
+        return self.partial_success or not result.errors
+
+    def finish(self, result):
+        if self.writable(result):
+            transaction.on_commit(bump_catalog_version)
+        else:
+            transaction.set_rollback(True)
+            result.ids = []
+        return result
+
+    def find(self, batch, result):
+        """Return ``{index: pk}`` for items naming an existing book by id."""
+        ids = {
+            index: item.get("id") if isinstance(item, dict) else item
+            for index, item in batch
+        }
+        existing = set(
+            Book.objects.filter(
+                pk__in=[pk for pk in ids.values() if isinstance(pk, int)]
+            ).values_list("pk", flat=True)
+        )
+        found = {}
+        for index, pk in ids.items():
+            if pk in existing:
+                found[index] = pk
+            else:
+                result.add_error(index, {"id": ["Book not found."]})
+        return found
+
+    @transaction.atomic
+    def create(self, items):
+        result = BulkResult()
+        for batch in self.batches(items):
+            valid = self.validate(batch, result)
+            if not valid or not self.writable(result):
+                continue
+            created = Book.objects.bulk_create([Book(**data) for index, data in valid])
+            ids = [book.pk for book in created]
+            result.ids += ids
+            queue_book_notifications(ids)
+        return self.finish(result)
+
+    @transaction.atomic
+    def update(self, items):
+        result = BulkResult()
+        for batch in self.batches(items):
+            found = self.find(batch, result)
+            valid = self.validate(
+                [(index, item) for index, item in batch if index in found],
+                result,
+                partial=True,
+            )
+            if not valid or not self.writable(result):
+                continue
+            books = Book.objects.in_bulk([found[index] for index, data in valid])
+            fields = set()
+            for index, data in valid:
+                book = books[found[index]]
+                for field, value in data.items():
+                    setattr(book, field, value)
+                fields.update(data)
+            if fields:
+                # bulk_update skips auto_now, so stamp the rows for exports.
+                now = timezone.now()
+                for book in books.values():
+                    book.updated_at = now
+                fields.add("updated_at")
+                Book.objects.bulk_update(books.values(), sorted(fields))
+            result.ids += list(books)
+            # bulk_update sends no post_save, so drop cached details here.
+            transaction.on_commit(functools.partial(forget_books, list(books)))
+        return self.finish(result)
+
+    @transaction.atomic
+    def delete(self, items):
+        result = BulkResult()
+        for batch in self.batches(items):
+            found = self.find(batch, result)
+            if found and self.writable(result):
+                Book.objects.filter(pk__in=found.values()).delete()
+                result.ids += list(found.values())
+        return self.finish(result)
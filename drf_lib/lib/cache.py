@@ -0,0 +1,135 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = "lib:catalog:version"
+
+
+def get_version(key):
+    """Return the version stored under ``key``, creating it if it was evicted.
+
+    A version is the time of the last write in nanoseconds. A recreated one
+    is the current time, which is past any version handed out before.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_versions(keys):
+    current = cache.get_many(keys)
+    now = time.time_ns()
+    # Never move backwards, even if the clocks of two workers disagree.
+    versions = {key: max(now, (current.get(key) or 0) + 1) for key in keys}
+    cache.set_many(versions, timeout=None)
+    return versions
+
+
+def get_catalog_version():
+    """Return the catalog version.
+
+    It moves on with every Book write, so it also serves as the catalog's
+    ``Last-Modified`` time.
+    """
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    return bump_versions([CATALOG_VERSION_KEY])[CATALOG_VERSION_KEY]
+
+
+def catalog_last_modified(request, *args, **kwargs):
+    return datetime.fromtimestamp(get_catalog_version() / 1e9, tz=timezone.utc)
+
+
+def catalog_etag(request, *args, **kwargs):
+    """ETag of a catalog response: the version plus what shapes the body."""
+    key = "\n".join(
+        [
+            str(get_catalog_version()),
+            request.get_full_path(),
+            request.META.get("HTTP_ACCEPT", ""),
+        ]
+    )
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+RESPONSE_TIMEOUT = getattr(settings, "LIB_RESPONSE_CACHE_TIMEOUT", 60 * 5)
+LOCK_TIMEOUT = 10
+
+
+def normalized_query(request):
+    """Query params as a stable string: sorted keys, blank values dropped.
+
+    Values keep their order because DRF reads the first one, e.g. of
+    ``ordering``.
+    """
+    return urlencode(
+        sorted(
+            (key, [value for value in values if value])
+            for key, values in request.query_params.lists()
+            if any(values)
+        ),
+        doseq=True,
+    )
+
+
+def list_response_key(request):
+    # The host is part of the key because pagination links are absolute.
+    key = f"{request.get_host()}?{normalized_query(request)}"
+    digest = hashlib.md5(key.encode()).hexdigest()
+    return f"lib:books:v{get_catalog_version()}:{digest}"
+
+
+def book_version_key(pk):
+    return f"lib:book:{pk}:version"
+
+
+def book_response_key(pk):
+    # Versioned like the list keys: a response computed from rows read
+    # before a write commits is stored under a version no one reads again.
+    return f"lib:book:{pk}:v{get_version(book_version_key(pk))}"
+
+
+def forget_books(pks):
+    """Retire the cached responses of ``pks``; call it once the write committed."""
+    bump_versions([book_version_key(pk) for pk in pks])
+
+
+def get_or_compute(key, compute, timeout=RESPONSE_TIMEOUT):
+    """Return the cached value of ``key`` or store ``compute()`` under it.
+
+    Only the worker that wins ``cache.add`` on the lock recomputes a missing
+    entry; the others wait up to ``LOCK_TIMEOUT`` seconds for its result.
+    The lock is released even when ``compute()`` raises, and a waiter that
+    finds it gone without a value computes at once instead of waiting on.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+    lock = f"{key}:lock"
+    if cache.add(lock, True, LOCK_TIMEOUT):
+        try:
+            value = compute()
+            cache.set(key, value, timeout)
+        finally:
+            cache.delete(lock)
+        return value
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        found = cache.get_many([key, lock])
+        if key in found:
+            return found[key]
+        if lock not in found:
+            # Released: the value was stored after the read, or the
+            # computation failed.
+            value = cache.get(key)
+            return compute() if value is None else value
+    return compute()
@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+import zlib
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Book
+
+COLUMNS = ["id", "title", "author", "published_date", "updated_at"]
+CHUNK_SIZE = 2000
+# Rows are written to a text buffer that is sent once it holds this much.
+FLUSH_SIZE = 64 * 1024
+
+
+def export_rows(since_id=None, chunk_size=CHUNK_SIZE, since=None):
+    """Iterate ``values_list`` tuples in id order, ``chunk_size`` rows at a time.
+
+    Only one chunk is held in memory (a server side cursor where the database
+    has them), so memory stays flat whatever the catalog size. Pass the last
+    id of a previous export as ``since_id`` to fetch only newer books, or the
+    largest ``updated_at`` it saw as ``since`` to also get changed ones.
+    Deletions are not exported.
+    """
+    queryset = Book.objects.order_by("id")
+    if since_id is not None:
+        queryset = queryset.filter(id__gt=since_id)
+    if since is not None:
+        queryset = queryset.filter(updated_at__gt=since)
+    return queryset.values_list(*COLUMNS).iterator(chunk_size=chunk_size)
+
+
+def parse_since(value):
+    """Parse an ISO 8601 time for ``since``, or return None if it is invalid.
+
+    A time without an offset is taken in the current time zone.
+    """
+    try:
+        since = parse_datetime(value)
+    except ValueError:
+        return None
+    if since is not None and timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def write_csv(buffer, rows):
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    yield
+    for row in rows:
+        writer.writerow(row)
+        yield
+
+
+def write_ndjson(buffer, rows):
+    for row in rows:
+        buffer.write(json.dumps(dict(zip(COLUMNS, row)), default=str))
+        buffer.write("\n")
+        yield
+
+
+FORMATS = {
+    "csv": (write_csv, "text/csv"),
+    "ndjson": (write_ndjson, "application/x-ndjson"),
+}
+
+
+def encode(write, rows, flush_size=FLUSH_SIZE):
+    """Run the ``write`` generator of a format and yield its output as UTF-8.
+
+    ``write`` yields after each record it put in the buffer. The first record
+    goes out on its own, so the client sees bytes before the first full
+    buffer, then the output is sent in pieces of about ``flush_size``.
+    """
+    buffer = io.StringIO()
+    sent_first = False
+    for _ in write(buffer, rows):
+        if sent_first and buffer.tell() < flush_size:
+            continue
+        sent_first = True
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def gzip_stream(chunks, level=6):
+    """Compress ``chunks`` into one gzip stream.
+
+    Every chunk is sync flushed, so each one reaches the client as soon as it
+    is encoded; at ``FLUSH_SIZE`` chunks that costs next to nothing in size.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def export_chunks(
+    export_format, since_id=None, gzip=False, chunk_size=CHUNK_SIZE, since=None
+):
+    write = FORMATS[export_format][0]
+    chunks = encode(write, export_rows(since_id, chunk_size, since))
+    if gzip:
+        chunks = gzip_stream(chunks)
+    return chunks
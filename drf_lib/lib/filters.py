@@ -0,0 +1,27 @@
+import django_filters
+from rest_framework import filters
+
+from .models import Book
+from .search import search_books, uses_fts
+
+
+class BookFilter(django_filters.FilterSet):
+    # ?published_after=YYYY-MM-DD&published_before=YYYY-MM-DD, both inclusive.
+    published = django_filters.DateFromToRangeFilter(field_name="published_date")
+
+    class Meta:
+        model = Book
+        fields = ["author", "published_date"]
+
+
+class BookSearchFilter(filters.SearchFilter):
+    """``?search=`` served by the FTS5 index on SQLite.
+
+    Every word must match the start of a word in the title or the author.
+    Other databases keep ``SearchFilter``'s ``icontains`` lookups.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if not uses_fts(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+        return search_books(queryset, request.query_params.get(self.search_param, ""))
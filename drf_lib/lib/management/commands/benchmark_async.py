@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from lib.models import Book
+from lib.seeding import seed_books
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests per second and latency of the sync (DRF) and async "
+        "book read endpoints under concurrent in-process ASGI clients."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=10_000)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--page-size", type=int, default=50)
+
+    def handle(self, *args, **options):
+        missing = options["books"] - Book.objects.count()
+        if missing > 0:
+            seed_books(missing, seed=0)
+        pk = Book.objects.order_by("id").values_list("id", flat=True).first()
+        query = f"?page_size={options['page_size']}"
+        endpoints = [
+            ("sync list", reverse("books:book-list-create") + query),
+            ("async list", reverse("books:async-book-list") + query),
+            ("sync detail", reverse("books:book-detail", args=[pk])),
+            ("async detail", reverse("books:async-book-detail", args=[pk])),
+        ]
+        # Measure the views themselves, not the response cache.
+        with override_settings(ALLOWED_HOSTS=["testserver"], LIB_RESPONSE_CACHE=False):
+            for name, url in endpoints:
+                elapsed, latencies = async_to_sync(self.run)(
+                    url, options["requests"], options["concurrency"]
+                )
+                self.report(name, elapsed, latencies)
+
+    async def run(self, url, total, concurrency):
+        client = AsyncClient()
+        latencies = []
+
+        async def worker(count):
+            for _ in range(count):
+                started = time.perf_counter()
+                response = await client.get(url)
+                if response.streaming:
+                    async for _ in response.streaming_content:
+                        pass
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        shares = [total // concurrency + (i < total % concurrency) for i in range(concurrency)]
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(count) for count in shares))
+        return time.perf_counter() - started, sorted(latencies)
+
+    def report(self, name, elapsed, latencies):
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+        self.stdout.write(
+            f"{name:<14} {len(latencies) / elapsed:8.0f} req/s  "
+            f"p50 {percentile(0.5):7.1f} ms  p99 {percentile(0.99):7.1f} ms"
+        )
@@ -0,0 +1,80 @@
+import statistics
+import time
+
+from django.db import connection
+from django.db.models import Q
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.core.management.base import BaseCommand
+
+from lib.models import Book
+from lib.seeding import seed_books
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure book list latency for filters, search and orderings. "
+        "The catalog is first topped up to --books generated books."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=1_000_000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        missing = options["books"] - Book.objects.count()
+        if missing > 0:
+            self.stdout.write(f"Seeding {missing} books...")
+            seed_books(missing, options["seed"])
+
+        sample = Book.objects.order_by("id").values("title", "author").first()
+        author = sample["author"]
+        word = sample["title"].split()[0].rstrip(".")
+        scenarios = [
+            ("first page", {}),
+            ("author", {"author": author}),
+            ("author, newest first", {"author": author, "ordering": "-published_date"}),
+            (
+                "one year",
+                {"published_after": "1990-01-01", "published_before": "1990-12-31"},
+            ),
+            ("ordering by title", {"ordering": "title"}),
+            ("search", {"search": word}),
+            ("search prefix", {"search": word[:3]}),
+        ]
+
+        url = reverse("books:book-list-create")
+        client = Client()
+        # Measure the database path, not the response cache.
+        with override_settings(ALLOWED_HOSTS=["testserver"], LIB_RESPONSE_CACHE=False):
+            for name, params in scenarios:
+                self.report(
+                    name,
+                    lambda params=params: client.get(url, params),
+                    options["repeat"],
+                )
+        # The previous SearchFilter lookups, for comparison with "search".
+        legacy = Book.objects.filter(
+            Q(title__icontains=word) | Q(author__icontains=word)
+        )
+        self.report(
+            "search, icontains",
+            lambda: list(legacy.order_by("published_date", "id")[:50]),
+            options["repeat"],
+        )
+
+    def report(self, name, request, repeat):
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                request()
+                timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"{name:<24} p50 {statistics.median(timings):8.2f} ms  "
+            f"p95 {p95:8.2f} ms  {len(queries)} queries"
+        )
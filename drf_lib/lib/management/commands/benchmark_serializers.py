@@ -0,0 +1,84 @@
+import datetime
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from lib.models import Book
+from lib.serializers import BookSerializer, book_values_serializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare BookSerializer with the values() read path. Books are "
+        "generated inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[10_000, 100_000],
+            help="Catalog sizes to measure.",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="Runs per path, the best one is kept."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                for size in sorted(options["sizes"]):
+                    self.fill(size)
+                    self.measure(size, options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def fill(self, size):
+        missing = size - Book.objects.count()
+        if missing <= 0:
+            return
+        start = datetime.date(1950, 1, 1)
+        Book.objects.bulk_create(
+            (
+                Book(
+                    title=f"Benchmark book {i}",
+                    author=f"Author {i % 997}",
+                    published_date=start + datetime.timedelta(days=random.randrange(27000)),
+                )
+                for i in range(missing)
+            ),
+            batch_size=5000,
+        )
+
+    def best_of(self, repeat, func):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def measure(self, size, repeat):
+        queryset = Book.objects.order_by("published_date", "id")[:size]
+        full, expected = self.best_of(
+            repeat, lambda: BookSerializer(queryset.all(), many=True).data
+        )
+        fast, actual = self.best_of(
+            repeat,
+            lambda: book_values_serializer.many(
+                book_values_serializer.values(queryset.all())
+            ),
+        )
+        if [dict(row) for row in expected] != actual:
+            self.stderr.write(self.style.ERROR(f"{size}: outputs differ!"))
+        self.stdout.write(
+            f"{size} books: serializer {full * 1000:.0f} ms "
+            f"({size / full:,.0f} rows/s), values {fast * 1000:.0f} ms "
+            f"({size / fast:,.0f} rows/s), {full / fast:.1f}x faster"
+        )
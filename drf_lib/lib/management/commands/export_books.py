@@ -0,0 +1,48 @@
+import argparse
+import sys
+
+from django.core.management.base import BaseCommand
+
+from lib.exports import CHUNK_SIZE, FORMATS, export_chunks, parse_since
+
+
+def since_time(value):
+    since = parse_since(value)
+    if since is None:
+        raise argparse.ArgumentTypeError(f"not an ISO 8601 time: {value!r}")
+    return since
+
+
+class Command(BaseCommand):
+    help = "Stream the book catalog as CSV or NDJSON to a file or stdout."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(FORMATS), default="ndjson")
+        parser.add_argument(
+            "--since-id", type=int, help="Only export books with a greater id."
+        )
+        parser.add_argument(
+            "--since",
+            type=since_time,
+            help="Only export books added or changed after this ISO 8601 time.",
+        )
+        parser.add_argument("--gzip", action="store_true")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            "-o", "--output", help="File to write to; stdout when omitted."
+        )
+
+    def handle(self, *args, **options):
+        chunks = export_chunks(
+            options["format"],
+            options["since_id"],
+            options["gzip"],
+            chunk_size=options["chunk_size"],
+            since=options["since"],
+        )
+        if options["output"]:
+            with open(options["output"], "wb") as output:
+                output.writelines(chunks)
+        else:
+            sys.stdout.buffer.writelines(chunks)
+            sys.stdout.buffer.flush()
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from lib import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text index of book titles and authors."
+
+    def handle(self, *args, **options):
+        if not search.uses_fts():
+            raise CommandError("The book search index only exists on SQLite.")
+        count = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} books."))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from lib.seeding import CHUNK_SIZE, seed_books
+
+
+class Command(BaseCommand):
+    help = "Insert generated books in bulk, e.g. to set up a benchmark database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("count", type=int, help="Number of books to create.")
+        parser.add_argument(
+            "--seed", type=int, help="Random seed, for a reproducible catalog."
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            "--factory",
+            action="store_true",
+            help="Build rows with BookFactory instead of the fast generator.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        def progress(done, total):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{done}/{total} books ({done / elapsed:,.0f}/s)")
+
+        done = seed_books(
+            options["count"],
+            options["seed"],
+            chunk_size=options["chunk_size"],
+            use_factory=options["factory"],
+            progress=progress,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {done} books in {time.perf_counter() - started:.1f}s."
+            )
+        )
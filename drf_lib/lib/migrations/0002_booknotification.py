@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-18 15:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lib', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('queued_at', models.DateTimeField(auto_now_add=True)),
+                ('digest_id', models.CharField(blank=True, db_index=True, max_length=64)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('recipient', models.EmailField(max_length=254)),
+                ('sent_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='lib.book')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('book', 'recipient'), name='booknotification_book_recipient')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+
+TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS lib_book_fts_ai AFTER INSERT ON lib_book BEGIN "
+    "INSERT INTO lib_book_fts (rowid, title, author) "
+    "VALUES (new.id, new.title, new.author); END",
+    "CREATE TRIGGER IF NOT EXISTS lib_book_fts_ad AFTER DELETE ON lib_book BEGIN "
+    "INSERT INTO lib_book_fts (lib_book_fts, rowid, title, author) "
+    "VALUES ('delete', old.id, old.title, old.author); END",
+    "CREATE TRIGGER IF NOT EXISTS lib_book_fts_au AFTER UPDATE ON lib_book BEGIN "
+    "INSERT INTO lib_book_fts (lib_book_fts, rowid, title, author) "
+    "VALUES ('delete', old.id, old.title, old.author); "
+    "INSERT INTO lib_book_fts (rowid, title, author) "
+    "VALUES (new.id, new.title, new.author); END",
+]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS lib_book_fts USING fts5("
+        "title, author, content = 'lib_book', content_rowid = 'id', "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+    )
+    for sql in TRIGGERS:
+        schema_editor.execute(sql)
+    schema_editor.execute("INSERT INTO lib_book_fts (lib_book_fts) VALUES ('rebuild')")
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for name in ("ai", "ad", "au"):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS lib_book_fts_{name}")
+    schema_editor.execute("DROP TABLE IF EXISTS lib_book_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lib', '0003_book_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,35 @@
+from importlib import import_module
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# Adding (or removing) a column remakes lib_book on SQLite, which drops the
+# full-text index triggers of 0004 with it.
+search_index = import_module("lib.migrations.0004_book_search_index")
+
+
+def create_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in search_index.TRIGGERS:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lib', '0004_book_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, create_triggers),
+        migrations.AddField(
+            model_name='book',
+            name='updated_at',
+            field=models.DateTimeField(
+                auto_now=True, db_index=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(create_triggers, migrations.RunPython.noop),
+    ]
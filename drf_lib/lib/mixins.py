@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from rest_framework.response import Response
+
+from .cache import book_response_key, get_or_compute, list_response_key
+
+
+class FastReadMixin:
+    """Serve ``list`` and ``retrieve`` through a ``ValuesSerializer``.
+
+    Rows are read with ``values()`` and converted by the precompiled field
+    plan; model instances and ``serializer_class`` are only used for writes.
+    Set ``fast_read = False`` to fall back to the full serializer.
+    """
+
+    fast_read = True
+    values_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        if not self.fast_read:
+            return super().list(request, *args, **kwargs)
+        queryset = self.values_serializer.values(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.values_serializer.many(page))
+        return Response(self.values_serializer.many(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.fast_read:
+            return super().retrieve(request, *args, **kwargs)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            self.values_serializer.values(self.filter_queryset(self.get_queryset())),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]},
+        )
+        self.check_object_permissions(request, row)
+        return Response(self.values_serializer.to_representation(row))
+
+
+class ResponseCacheMixin:
+    """Cache the data of ``list`` and ``retrieve`` responses.
+
+    List entries are keyed by the normalized query string and the catalog
+    version, so any Book write retires them. Detail entries are keyed by pk
+    and a per-book version that moves on once a save or delete of that book
+    commits. ``LIB_RESPONSE_CACHE = False`` turns the cache off.
+    """
+
+    def use_response_cache(self):
+        return getattr(settings, "LIB_RESPONSE_CACHE", True)
+
+    def list(self, request, *args, **kwargs):
+        compute = super().list
+        if not self.use_response_cache():
+            return compute(request, *args, **kwargs)
+        data = get_or_compute(
+            list_response_key(request),
+            lambda: compute(request, *args, **kwargs).data,
+        )
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        compute = super().retrieve
+        if not self.use_response_cache():
+            return compute(request, *args, **kwargs)
+        pk = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        data = get_or_compute(
+            book_response_key(pk), lambda: compute(request, *args, **kwargs).data
+        )
+        return Response(data)
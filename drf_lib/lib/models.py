@@ -4,6 +4,42 @@ class Book(models.Model):
     title = models.CharField(max_length=255)
     author = models.CharField(max_length=255)
     published_date = models.DateField()
+    # Lets exports fetch only the books changed since a previous run.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        # Match the list filters and the (field, id) keyset orderings.
+        indexes = [
+            models.Index(fields=["published_date", "id"], name="book_published_id_idx"),
+            models.Index(
+                fields=["author", "published_date", "id"], name="book_author_published_idx"
+            ),
+            models.Index(fields=["title", "id"], name="book_title_id_idx"),
+        ]
 
     def __str__(self):
         return self.title
+
+
+class BookNotification(models.Model):
+    """Outbox row for a new book and one recipient until its digest has gone out."""
+
+    book = models.ForeignKey(
+        Book, on_delete=models.CASCADE, related_name="notifications"
+    )
+    recipient = models.EmailField()
+    queued_at = models.DateTimeField(auto_now_add=True)
+    # Empty until a flush claims the row; the flush's task id otherwise.
+    digest_id = models.CharField(max_length=64, blank=True, db_index=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["book", "recipient"], name="booknotification_book_recipient"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Notification for {self.book_id} to {self.recipient}"
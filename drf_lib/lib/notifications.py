@@ -0,0 +1,122 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection, send_mail
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Book, BookNotification
+
+# A digest goes out once this many books are waiting, or WINDOW seconds after
+# the first one was queued, whichever comes first.
+DIGEST_SIZE = getattr(settings, "LIB_NOTIFICATION_DIGEST_SIZE", 100)
+WINDOW = getattr(settings, "LIB_NOTIFICATION_WINDOW", 60)
+MAX_PER_FLUSH = getattr(settings, "LIB_NOTIFICATION_MAX_PER_FLUSH", 5000)
+# Claims older than this are taken over, in case a worker died mid flush.
+CLAIM_TIMEOUT = getattr(settings, "LIB_NOTIFICATION_CLAIM_TIMEOUT", 60 * 60)
+FROM_EMAIL = getattr(settings, "LIB_NOTIFICATION_FROM", "admin@example.com")
+RECIPIENTS = getattr(settings, "LIB_NOTIFICATION_RECIPIENTS", ["user@example.com"])
+# Sent rows are kept this many seconds, then pruned after a flush.
+RETENTION = getattr(settings, "LIB_NOTIFICATION_RETENTION", 7 * 24 * 60 * 60)
+
+
+def queue(book_ids):
+    """Add one outbox row per book and recipient; already queued pairs are kept."""
+    BookNotification.objects.bulk_create(
+        [
+            BookNotification(book_id=book_id, recipient=recipient)
+            for book_id in book_ids
+            for recipient in RECIPIENTS
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def pending_count():
+    """Return the number of books waiting for a digest."""
+    return (
+        BookNotification.objects.filter(digest_id="")
+        .values("book_id")
+        .distinct()
+        .count()
+    )
+
+
+def claim(digest_id, limit=MAX_PER_FLUSH):
+    """Mark up to ``limit`` unsent rows as belonging to ``digest_id``.
+
+    The ``UPDATE`` repeats the filter, so when two flushes race for the same
+    rows each row ends up in exactly one digest.
+    """
+    claimable = Q(digest_id="") | Q(
+        claimed_at__lt=timezone.now() - timedelta(seconds=CLAIM_TIMEOUT)
+    )
+    with transaction.atomic():
+        pks = list(
+            BookNotification.objects.filter(claimable, sent_at__isnull=True)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:limit]
+        )
+        return BookNotification.objects.filter(
+            claimable, pk__in=pks, sent_at__isnull=True
+        ).update(digest_id=digest_id, claimed_at=timezone.now())
+
+
+def digest_message(books):
+    """Return the ``(subject, body)`` of one digest."""
+    if len(books) == 1:
+        return (
+            "Нова книга додана",
+            f'Книга "{books[0].title}" була додана в систему.',
+        )
+    titles = "\n".join(f'- "{book.title}"' for book in books)
+    return (
+        "Нові книги додані",
+        f"В систему додано книг: {len(books)}.\n{titles}",
+    )
+
+
+def send_digest(digest_id):
+    """Send every unsent row claimed by ``digest_id``; return the messages sent.
+
+    Each recipient gets its own messages of up to ``DIGEST_SIZE`` books, and
+    the rows of a message are marked sent as soon as it went out. A retry of
+    the same flush (same task id) therefore resends nothing that a recipient
+    already got, and a flush that already finished finds nothing left to send.
+    """
+    rows = BookNotification.objects.filter(digest_id=digest_id, sent_at__isnull=True)
+    pending = {}
+    for recipient, book_id in rows.values_list("recipient", "book_id"):
+        pending.setdefault(recipient, []).append(book_id)
+    if not pending:
+        return 0
+    books = Book.objects.only("title").in_bulk(
+        {book_id for book_ids in pending.values() for book_id in book_ids}
+    )
+
+    sent = 0
+    with get_connection(fail_silently=False) as connection:
+        for recipient, book_ids in sorted(pending.items()):
+            book_ids = sorted(book_ids)
+            for start in range(0, len(book_ids), DIGEST_SIZE):
+                chunk = book_ids[start : start + DIGEST_SIZE]
+                # A book deleted since the claim has no row left to send.
+                chunk_books = [books[pk] for pk in chunk if pk in books]
+                if chunk_books:
+                    subject, body = digest_message(chunk_books)
+                    send_mail(
+                        subject, body, FROM_EMAIL, [recipient], connection=connection
+                    )
+                    sent += 1
+                rows.filter(recipient=recipient, book_id__in=chunk).update(
+                    sent_at=timezone.now()
+                )
+    return sent
+
+
+def prune_sent(retention=RETENTION):
+    """Delete rows sent more than ``retention`` seconds ago; return how many."""
+    cutoff = timezone.now() - timedelta(seconds=retention)
+    deleted, _ = BookNotification.objects.filter(sent_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,70 @@
+import codecs
+import json
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException, ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+MAX_BODY_SIZE = getattr(settings, "LIB_BULK_MAX_BODY_SIZE", 10 * 1024 * 1024)
+
+
+class RequestTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Request body too large."
+    default_code = "request_too_large"
+
+
+def check_body_size(parser_context):
+    """Refuse a body over ``MAX_BODY_SIZE`` by its ``Content-Length``, unread."""
+    request = (parser_context or {}).get("request")
+    if request is None:
+        return
+    try:
+        length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        length = 0
+    if length > MAX_BODY_SIZE:
+        raise RequestTooLarge(f"Request body is over {MAX_BODY_SIZE} bytes.")
+
+
+class BoundedJSONParser(JSONParser):
+    """``JSONParser`` that refuses bodies over ``LIB_BULK_MAX_BODY_SIZE``.
+
+    A JSON document can only be parsed whole, so its size is checked first.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        check_body_size(parser_context)
+        return super().parse(stream, media_type, parser_context)
+
+
+class NDJSONParser(BaseParser):
+    """Parse newline delimited JSON into a list, one item per non-blank line.
+
+    The body is read a line at a time and parsing stops as soon as there are
+    more items than the view's ``max_items``, so an oversized body is never
+    held in memory.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return []
+        parser_context = parser_context or {}
+        check_body_size(parser_context)
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        max_items = getattr(parser_context.get("view"), "max_items", None)
+        items = []
+        for number, line in enumerate(codecs.getreader(encoding)(stream), start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if max_items is not None and len(items) == max_items:
+                raise ParseError(f"At most {max_items} items per request.")
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                raise ParseError(f"NDJSON parse error on line {number}: {e}") from e
+        return items
@@ -0,0 +1,65 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Book
+
+FTS_TABLE = "lib_book_fts"
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# The index is an external content FTS5 table over ``lib_book`` kept in sync
+# by these triggers, so bulk_create, bulk_update and queryset deletes are
+# indexed too. SQLite drops triggers together with their table, so run
+# ``manage.py rebuild_book_search`` after a migration that remakes lib_book.
+TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON lib_book BEGIN "
+    f"INSERT INTO {FTS_TABLE} (rowid, title, author) "
+    "VALUES (new.id, new.title, new.author); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON lib_book BEGIN "
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, author) "
+    "VALUES ('delete', old.id, old.title, old.author); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON lib_book BEGIN "
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, author) "
+    "VALUES ('delete', old.id, old.title, old.author); "
+    f"INSERT INTO {FTS_TABLE} (rowid, title, author) "
+    "VALUES (new.id, new.title, new.author); END",
+]
+
+
+def build_match(query):
+    """Turn user input into an FTS5 query of quoted prefix terms."""
+    return " ".join(f'"{token}"*' for token in TOKEN_RE.findall(query))
+
+
+def uses_fts(using="default"):
+    return connections[using].vendor == "sqlite"
+
+
+def search_books(queryset, text):
+    """Keep books where every word of ``text`` starts a word of the title or
+    author; ``icontains`` per word where there is no FTS5 index.
+    """
+    if not uses_fts(queryset.db):
+        for token in TOKEN_RE.findall(text):
+            queryset = queryset.filter(
+                Q(title__icontains=token) | Q(author__icontains=token)
+            )
+        return queryset
+    match = build_match(text)
+    if not match:
+        return queryset
+    return queryset.filter(
+        pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+    )
+
+
+def rebuild(using="default"):
+    """Recreate missing triggers and rebuild the index from ``lib_book``."""
+    with connections[using].cursor() as cursor:
+        for sql in TRIGGERS:
+            cursor.execute(sql)
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+    return Book.objects.using(using).count()
@@ -0,0 +1,67 @@
+import datetime
+import random
+
+import factory.random
+from django.conf import settings
+from faker import Faker
+
+from .cache import bump_catalog_version
+from .factories import BookFactory
+from .models import Book
+
+CHUNK_SIZE = 5000
+MAX_BOOKS = getattr(settings, "LIB_SEED_MAX_BOOKS", 1_000_000)
+
+# Dates are drawn from a fixed range so a seed always yields the same rows.
+FIRST_DATE = datetime.date(1900, 1, 1).toordinal()
+LAST_DATE = datetime.date(2024, 12, 31).toordinal()
+
+
+def generated_chunks(count, seed=None, chunk_size=CHUNK_SIZE):
+    """Yield lists of unsaved books that look like ``BookFactory`` output.
+
+    Faker only fills a vocabulary and a pool of author names once; the rows
+    are then combined from those pools with ``random.Random(seed)``, which is
+    orders of magnitude cheaper than a Faker call per field.
+    """
+    rng = random.Random(seed)
+    fake = Faker()
+    fake.seed_instance(seed)
+    words = fake.words(nb=2000)
+    authors = [fake.name() for _ in range(5000)]
+    for start in range(0, count, chunk_size):
+        yield [
+            Book(
+                title=" ".join(rng.choices(words, k=4)).capitalize() + ".",
+                author=rng.choice(authors),
+                published_date=datetime.date.fromordinal(
+                    rng.randint(FIRST_DATE, LAST_DATE)
+                ),
+            )
+            for _ in range(min(chunk_size, count - start))
+        ]
+
+
+def factory_chunks(count, seed=None, chunk_size=CHUNK_SIZE):
+    """Yield ``BookFactory.build_batch`` chunks; slower but uses the factory."""
+    if seed is not None:
+        factory.random.reseed_random(seed)
+    for start in range(0, count, chunk_size):
+        yield BookFactory.build_batch(min(chunk_size, count - start))
+
+
+def seed_books(count, seed=None, chunk_size=CHUNK_SIZE, use_factory=False, progress=None):
+    """Insert ``count`` books with one ``bulk_create`` per chunk.
+
+    ``progress(done, total)`` is called after every chunk. Seeded books do
+    not queue new-book notifications.
+    """
+    chunks = factory_chunks if use_factory else generated_chunks
+    done = 0
+    for chunk in chunks(count, seed, chunk_size):
+        Book.objects.bulk_create(chunk)
+        done += len(chunk)
+        if progress is not None:
+            progress(done, count)
+    bump_catalog_version()
+    return done
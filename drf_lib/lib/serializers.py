@@ -1,7 +1,86 @@
-from rest_framework import serializers
+import datetime
+
+from django.utils.functional import cached_property
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
 from .models import Book
+from .seeding import MAX_BOOKS
 
 class BookSerializer(serializers.ModelSerializer):
     class Meta:
         model = Book
-        fields = '__all__'
+        # updated_at only serves incremental exports.
+        exclude = ['updated_at']
+
+
+class GenerateBooksSerializer(serializers.Serializer):
+    num_books = serializers.IntegerField(min_value=1, max_value=MAX_BOOKS, default=10)
+    seed = serializers.IntegerField(required=False, allow_null=True, default=None)
+
+
+class ValuesSerializer:
+    """Read-only twin of a ``ModelSerializer`` that works on ``values()`` rows.
+
+    The field plan (column, output name, converter) is compiled once from the
+    serializer's own fields. A row is the dict ``values()`` already built,
+    with only the fields that need it converted in place, instead of a
+    ``to_representation`` call per field. Writes and validation stay with the
+    ``ModelSerializer``.
+    """
+
+    # Fields whose model value already is its JSON representation.
+    passthrough = (
+        serializers.BooleanField,
+        serializers.CharField,
+        serializers.IntegerField,
+    )
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+    def converter_for(self, field):
+        if isinstance(field, self.passthrough):
+            return None
+        if (
+            isinstance(field, serializers.DateField)
+            and getattr(field, "format", api_settings.DATE_FORMAT) == ISO_8601
+        ):
+            return datetime.date.isoformat
+        return field.to_representation
+
+    @cached_property
+    def plan(self):
+        """Return ``(sources, renames, converters)`` for the readable fields."""
+        sources, renames, converters = [], [], []
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if field.source == "*" or "." in field.source:
+                raise TypeError(f"{name!r} has no column to read from.")
+            sources.append(field.source)
+            if field.source != name:
+                renames.append((field.source, name))
+            converter = self.converter_for(field)
+            if converter is not None:
+                converters.append((field.source, converter))
+        return sources, renames, converters
+
+    def values(self, queryset):
+        return queryset.values(*self.plan[0])
+
+    def to_representation(self, row):
+        _, renames, converters = self.plan
+        for source, converter in converters:
+            value = row[source]
+            if value is not None:
+                row[source] = converter(value)
+        for source, name in renames:
+            row[name] = row.pop(source)
+        return row
+
+    def many(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
+book_values_serializer = ValuesSerializer(BookSerializer)
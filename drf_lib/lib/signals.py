@@ -0,0 +1,14 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_catalog_version, forget_books
+from .models import Book
+
+
+@receiver([post_save, post_delete], sender=Book)
+def invalidate_catalog(instance, **kwargs):
+    transaction.on_commit(bump_catalog_version)
+    transaction.on_commit(partial(forget_books, [instance.pk]))
@@ -1,16 +1,60 @@
+import uuid
+from smtplib import SMTPException
+
 from celery import shared_task
-from django.core.mail import send_mail
-from .models import Book
+from django.core.cache import cache
+from django.db import transaction
+
+from . import notifications, seeding
+
+FLUSH_SCHEDULED_KEY = "lib:notifications:flush-scheduled"
+FLUSH_NOW_KEY = "lib:notifications:flush-now"
+
+
+def queue_book_notifications(book_ids):
+    """Buffer new books for the next digest e-mail.
+
+    Call it inside the transaction that creates the books, so the outbox rows
+    commit or roll back together with them. The flush is scheduled on commit.
+    """
+    notifications.queue(book_ids)
+    transaction.on_commit(schedule_flush, robust=True)
+
+
+def schedule_flush():
+    if notifications.pending_count() >= notifications.DIGEST_SIZE:
+        if cache.add(FLUSH_NOW_KEY, True, 10):
+            flush_book_notifications.delay()
+    elif cache.add(FLUSH_SCHEDULED_KEY, True, notifications.WINDOW):
+        flush_book_notifications.apply_async(countdown=notifications.WINDOW)
+
+
+@shared_task(bind=True, max_retries=5, default_retry_delay=60)
+def flush_book_notifications(self):
+    digest_id = self.request.id or uuid.uuid4().hex
+    cache.delete(FLUSH_NOW_KEY)
+    notifications.claim(digest_id)
+    try:
+        sent = notifications.send_digest(digest_id)
+    except (SMTPException, OSError) as e:
+        raise self.retry(exc=e)
+    if notifications.pending_count():
+        flush_book_notifications.delay()
+    else:
+        notifications.prune_sent()
+    return sent
 
 
 @shared_task
 def send_new_book_notification(book_id):
+    # Kept for tasks queued before the digest pipeline existed.
+    queue_book_notifications([book_id])
+
+
+@shared_task(bind=True)
+def generate_books(self, num_books, seed=None):
+    def progress(done, total):
+        self.update_state(state="PROGRESS", meta={"done": done, "total": total})
 
-    book = Book.objects.get(id=book_id)
-    send_mail(
-        "Нова книга додана",
-        f'Книга "{book.title}" була додана в систему.',
-        "admin@example.com",
-        ["user@example.com"],
-        fail_silently=False,
-    )
+    done = seeding.seed_books(num_books, seed, progress=progress)
+    return {"done": done, "total": num_books}
@@ -1,3 +1,782 @@
-from django.test import TestCase
+import base64
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import zlib
+from datetime import date, timedelta
+from smtplib import SMTPException
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from drf_lib import profiling
+
+from . import cache as lib_cache
+from . import exports, notifications, parsers, search, seeding
+from .cache import book_response_key, get_catalog_version
+from .models import Book, BookNotification
+from .serializers import BookSerializer, book_values_serializer
+from .tasks import queue_book_notifications
+
+
+def cursor(position, reverse=False):
+    payload = json.dumps({"p": position, "r": reverse}).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+class CursorTests(TestCase):
+    tampered = [
+        ["notadate", 1],
+        ["2020-01-01", "x"],
+        [None, None],
+        ["2020-01-01"],
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        Book.objects.create(title="A", author="B", published_date=date(2020, 1, 1))
+
+    def assert_tampered_cursors_not_found(self, url):
+        for position in self.tampered:
+            with self.subTest(position=position):
+                response = self.client.get(url, {"cursor": cursor(position)})
+                self.assertEqual(response.status_code, 404)
+        response = self.client.get(url, {"cursor": "not base64!"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_tampered_cursor_is_not_found(self):
+        self.assert_tampered_cursors_not_found(reverse("books:book-list-create"))
+
+    def test_tampered_cursor_is_not_found_async(self):
+        self.assert_tampered_cursors_not_found(reverse("books:async-book-list"))
+
+    async def test_valid_cursor_async(self):
+        url = reverse("books:async-book-list")
+        response = await self.async_client.get(
+            url, {"cursor": cursor(["2019-12-31", 1])}
+        )
+        self.assertEqual(response.status_code, 200)
+        chunks = [chunk async for chunk in response.streaming_content]
+        body = json.loads(b"".join(chunks))
+        self.assertEqual([book["title"] for book in body["results"]], ["A"])
+
+
+class PaginationTests(TestCase):
+    url = reverse("books:book-list-create")
+
+    @classmethod
+    def setUpTestData(cls):
+        # Pairs of equal titles and dates, so only the tie breakers order them.
+        for i in range(9):
+            Book.objects.create(
+                title=f"T{i // 2}",
+                author="B",
+                published_date=date(2020, 1, 1 + i // 4),
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, url, params, link="next"):
+        pages = []
+        response = self.client.get(url, params)
+        while True:
+            body = response.json()
+            pages.append([book["id"] for book in body["results"]])
+            if not body[link]:
+                return pages
+            response = self.client.get(body[link])
+
+    def test_pages_follow_every_ordering_field(self):
+        params = {"ordering": "title,-published_date", "page_size": 2}
+        pages = self.walk(self.url, params)
+        expected = list(
+            Book.objects.order_by("title", "-published_date", "-id").values_list(
+                "id", flat=True
+            )
+        )
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 2, 1])
+
+        last = self.client.get(self.url, params)
+        while last.json()["next"]:
+            last = self.client.get(last.json()["next"])
+        backwards = []
+        response = last
+        while response.json()["previous"]:
+            response = self.client.get(response.json()["previous"])
+            backwards = [book["id"] for book in response.json()["results"]] + backwards
+        self.assertEqual(backwards, expected[:8])
+
+    async def test_async_list_follows_every_ordering_field(self):
+        url = reverse("books:async-book-list")
+        params = {"ordering": "-title,published_date", "page_size": 4}
+        ids = []
+        while url:
+            body = await self.async_get(url, params)
+            ids += [book["id"] for book in body["results"]]
+            url, params = body["next"], {}
+            if url:
+                last = url
+        expected = [
+            pk
+            async for pk in Book.objects.order_by(
+                "-title", "published_date", "id"
+            ).values_list("id", flat=True)
+        ]
+        self.assertEqual(ids, expected)
+
+        body = await self.async_get(last, {})
+        backwards = []
+        while body["previous"]:
+            body = await self.async_get(body["previous"], {})
+            backwards = [book["id"] for book in body["results"]] + backwards
+            self.assertIsNotNone(body["next"])
+        self.assertEqual(backwards, expected[:8])
+
+    async def async_get(self, url, params):
+        response = await self.async_client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        chunks = [chunk async for chunk in response.streaming_content]
+        return json.loads(b"".join(chunks))
+
+    def test_browsable_api_shows_page_controls(self):
+        response = self.client.get(
+            self.url, {"page_size": 2}, HTTP_ACCEPT="text/html"
+        )
+        self.assertIsNotNone(response.context["paginator"])
+        self.assertContains(response, 'class="pager"')
+        response = self.client.get(self.url, HTTP_ACCEPT="text/html")
+        self.assertIsNone(response.context["paginator"])
+
+
+class ConditionalGetTests(TestCase):
+    url = reverse("books:book-list-create")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.book = Book.objects.create(
+            title="A", author="B", published_date=date(2020, 1, 1)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_etag_and_last_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["ETag"])
+        self.assertTrue(response["Last-Modified"])
+
+        with self.assertNumQueries(0):
+            again = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+        again = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(again.status_code, 304)
+
+    def test_etag_depends_on_the_query(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(
+            self.url, {"author": "B"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_write_changes_the_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.title = "New"
+            self.book.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["title"], "New")
+
+    def test_async_list_not_modified(self):
+        url = reverse("books:async-book-list")
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+@override_settings(
+    CELERY_TASK_ALWAYS_EAGER=True,
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+@mock.patch.object(notifications, "RECIPIENTS", ["a@example.com", "b@example.com"])
+class NotificationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.books = [
+            Book.objects.create(
+                title=f"Book {i}", author="B", published_date=date(2020, 1, i)
+            )
+            for i in range(1, 4)
+        ]
+
+    def queue(self, books):
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_book_notifications([book.pk for book in books])
+
+    def test_one_message_per_recipient(self):
+        self.queue(self.books)
+        self.assertEqual(
+            [message.to for message in mail.outbox],
+            [["a@example.com"], ["b@example.com"]],
+        )
+        for message in mail.outbox:
+            for book in self.books:
+                self.assertIn(book.title, message.body)
+        unsent = BookNotification.objects.filter(sent_at__isnull=True)
+        self.assertFalse(unsent.exists())
+
+    def test_digest_is_split_by_size(self):
+        with mock.patch.object(notifications, "DIGEST_SIZE", 2):
+            self.queue(self.books)
+        self.assertEqual(len(mail.outbox), 4)
+
+    def test_queueing_twice_sends_once(self):
+        self.queue(self.books[:1])
+        self.queue(self.books[:1])
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_retry_skips_recipients_already_sent(self):
+        send_mail = notifications.send_mail
+
+        def fail_for_b(subject, body, from_email, recipients, **kwargs):
+            if recipients == ["b@example.com"]:
+                raise SMTPException("down")
+            return send_mail(subject, body, from_email, recipients, **kwargs)
+
+        notifications.queue([book.pk for book in self.books])
+        notifications.claim("digest")
+        with mock.patch.object(notifications, "send_mail", fail_for_b):
+            with self.assertRaises(SMTPException):
+                notifications.send_digest("digest")
+        self.assertEqual([message.to for message in mail.outbox], [["a@example.com"]])
+
+        self.assertEqual(notifications.send_digest("digest"), 1)
+        self.assertEqual(
+            [message.to for message in mail.outbox],
+            [["a@example.com"], ["b@example.com"]],
+        )
+        self.assertEqual(notifications.send_digest("digest"), 0)
+
+    def test_prune_sent(self):
+        self.queue(self.books[:2])
+        notifications.queue([self.books[2].pk])
+        old = BookNotification.objects.filter(book=self.books[0])
+        cutoff = timezone.now() - timedelta(seconds=notifications.RETENTION)
+        old.update(sent_at=cutoff - timedelta(seconds=1))
+
+        self.assertEqual(notifications.prune_sent(), 2)
+        self.assertFalse(old.exists())
+        rows = BookNotification.objects
+        self.assertEqual(rows.filter(book=self.books[1]).count(), 2)
+        self.assertEqual(rows.filter(sent_at__isnull=True).count(), 2)
+
+
+
+class CatalogFilterTests(TestCase):
+    url = reverse("books:book-list-create")
+
+    @classmethod
+    def setUpTestData(cls):
+        for title, author, day in [
+            ("Dune", "Frank Herbert", date(1965, 8, 1)),
+            ("Dune Messiah", "Frank Herbert", date(1969, 10, 15)),
+            ("Émile", "Jean-Jacques Rousseau", date(1762, 5, 1)),
+            ("The Rune Stone", "Ann Other", date(1969, 12, 31)),
+        ]:
+            Book.objects.create(title=title, author=author, published_date=day)
+
+    def setUp(self):
+        cache.clear()
+
+    def titles(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [book["title"] for book in response.json()["results"]]
+
+    def test_published_range_is_inclusive(self):
+        self.assertEqual(
+            self.titles(published_after="1965-08-01", published_before="1969-12-31"),
+            ["Dune", "Dune Messiah", "The Rune Stone"],
+        )
+        self.assertEqual(
+            self.titles(published_after="1969-01-01"),
+            ["Dune Messiah", "The Rune Stone"],
+        )
+        self.assertEqual(self.titles(published_before="1900-01-01"), ["Émile"])
+
+    def test_invalid_date_is_rejected(self):
+        response = self.client.get(self.url, {"published_after": "someday"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_author_and_ordering(self):
+        self.assertEqual(
+            self.titles(author="Frank Herbert", ordering="-published_date"),
+            ["Dune Messiah", "Dune"],
+        )
+
+    def test_search_matches_word_prefixes(self):
+        self.assertEqual(self.titles(search="dun"), ["Dune", "Dune Messiah"])
+        self.assertEqual(self.titles(search="herb mess"), ["Dune Messiah"])
+        self.assertEqual(self.titles(search="emile"), ["Émile"])
+        # "une" is inside "Dune" and "Rune" but starts no word.
+        self.assertEqual(self.titles(search="une"), [])
+
+    def test_search_orders_by_the_ordering_parameter(self):
+        self.assertEqual(
+            self.titles(search="dune", ordering="-published_date"),
+            ["Dune Messiah", "Dune"],
+        )
+
+    def test_fts_syntax_in_the_query_is_literal(self):
+        for text in ['"dune', "dune*", "(dune", "-dune", "^dune)", "dune:"]:
+            with self.subTest(text=text):
+                self.assertEqual(self.titles(search=text), ["Dune", "Dune Messiah"])
+        # Operators are searched for as words, not applied.
+        self.assertEqual(self.titles(search="dune OR emile"), [])
+        self.assertEqual(self.titles(search="title:dune"), [])
+        self.assertEqual(len(self.titles(search='"*:()')), 4)
+
+    def test_fallback_without_fts(self):
+        with mock.patch.object(search, "uses_fts", return_value=False):
+            self.assertEqual(self.titles(search="herb mess"), ["Dune Messiah"])
+            # icontains also matches inside a word.
+            self.assertEqual(
+                self.titles(search="une"), ["Dune", "Dune Messiah", "The Rune Stone"]
+            )
+
+    def test_triggers_follow_bulk_writes(self):
+        def found(text):
+            return list(
+                search.search_books(Book.objects.all(), text).values_list(
+                    "title", flat=True
+                )
+            )
+
+        Book.objects.bulk_create(
+            [Book(title="Solaris", author="Lem", published_date=date(1961, 1, 1))]
+        )
+        self.assertEqual(found("solaris"), ["Solaris"])
+        Book.objects.filter(title="Solaris").update(title="Fiasco")
+        self.assertEqual(found("solaris"), [])
+        self.assertEqual(found("fiasco lem"), ["Fiasco"])
+        Book.objects.filter(title="Fiasco").delete()
+        self.assertEqual(found("fiasco"), [])
+
+    def test_rebuild_command(self):
+        out = io.StringIO()
+        call_command("rebuild_book_search", stdout=out)
+        self.assertIn("4", out.getvalue())
+        self.assertEqual(len(self.titles(search="dune")), 2)
+
+
+
+class SeedingTests(TestCase):
+    def rows(self, chunks):
+        return [
+            [(book.title, book.author, book.published_date) for book in chunk]
+            for chunk in chunks
+        ]
+
+    def test_chunk_sizes_and_progress(self):
+        calls = []
+        version = get_catalog_version()
+        done = seeding.seed_books(
+            7, seed=1, chunk_size=3, progress=lambda *args: calls.append(args)
+        )
+        self.assertEqual(done, 7)
+        self.assertEqual(calls, [(3, 7), (6, 7), (7, 7)])
+        self.assertEqual(Book.objects.count(), 7)
+        self.assertGreater(get_catalog_version(), version)
+
+    def test_bulk_create_per_chunk(self):
+        with self.assertNumQueries(3):
+            seeding.seed_books(5, seed=1, chunk_size=2)
+
+    def test_same_seed_same_books(self):
+        first = self.rows(seeding.generated_chunks(5, seed=1, chunk_size=2))
+        self.assertEqual([len(chunk) for chunk in first], [2, 2, 1])
+        self.assertEqual(
+            first, self.rows(seeding.generated_chunks(5, seed=1, chunk_size=2))
+        )
+        self.assertNotEqual(first, self.rows(seeding.generated_chunks(5, seed=2)))
+
+    def test_factory_chunks(self):
+        first = self.rows(seeding.factory_chunks(4, seed=1, chunk_size=3))
+        self.assertEqual([len(chunk) for chunk in first], [3, 1])
+        again = self.rows(seeding.factory_chunks(4, seed=1, chunk_size=3))
+        self.assertEqual(first, again)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command("seed_books", "5", "--seed=1", "--chunk-size=2", stdout=out)
+        self.assertIn("4/5 books", out.getvalue())
+        self.assertIn("Created 5 books", out.getvalue())
+        self.assertEqual(Book.objects.count(), 5)
+
+
+class GenerateBooksViewTests(TestCase):
+    url = reverse("books:generate-books")
+
+    @classmethod
+    def setUpTestData(cls):
+        model = get_user_model()
+        cls.user = model.objects.create_user("reader", password="x", is_active=True)
+        cls.admin = model.objects.create_user(
+            "admin", password="x", is_active=True, is_staff=True
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def status(self, state, info=None):
+        job = mock.Mock(state=state, info=info)
+        job.successful.return_value = state == "SUCCESS"
+        job.failed.return_value = state == "FAILURE"
+        self.client.force_authenticate(self.admin)
+        url = reverse("books:generate-books-status", args=["job-1"])
+        with mock.patch("lib.views.AsyncResult", return_value=job) as result:
+            response = self.client.get(url)
+        result.assert_called_once_with("job-1")
+        return response.json()
+
+    def test_requires_staff(self):
+        with mock.patch("lib.views.generate_books.delay") as delay:
+            response = self.client.post(self.url, {"num_books": 5})
+            self.assertIn(response.status_code, (401, 403))
+            self.client.force_authenticate(self.user)
+            response = self.client.post(self.url, {"num_books": 5})
+            self.assertEqual(response.status_code, 403)
+            status_url = reverse("books:generate-books-status", args=["job-1"])
+            self.assertEqual(self.client.get(status_url).status_code, 403)
+        delay.assert_not_called()
+
+    def test_starts_a_job(self):
+        self.client.force_authenticate(self.admin)
+        with mock.patch("lib.views.generate_books.delay") as delay:
+            delay.return_value.id = "job-1"
+            response = self.client.post(self.url, {"num_books": 5, "seed": 3})
+        self.assertEqual(response.status_code, 202)
+        delay.assert_called_once_with(num_books=5, seed=3)
+        self.assertEqual(response.json()["job_id"], "job-1")
+        self.assertTrue(
+            response.json()["status_url"].endswith("/generate-books/job-1/")
+        )
+
+    def test_rejects_bad_counts(self):
+        self.client.force_authenticate(self.admin)
+        with mock.patch("lib.views.generate_books.delay") as delay:
+            for count in (0, seeding.MAX_BOOKS + 1, "many"):
+                with self.subTest(count=count):
+                    response = self.client.post(self.url, {"num_books": count})
+                    self.assertEqual(response.status_code, 400)
+        delay.assert_not_called()
+
+    def test_status_states(self):
+        self.assertEqual(
+            self.status("PENDING"), {"job_id": "job-1", "state": "PENDING"}
+        )
+        self.assertEqual(
+            self.status("PROGRESS", {"done": 2, "total": 5}),
+            {"job_id": "job-1", "state": "PROGRESS", "done": 2, "total": 5},
+        )
+        self.assertEqual(
+            self.status("SUCCESS", {"done": 5, "total": 5}),
+            {"job_id": "job-1", "state": "SUCCESS", "done": 5, "total": 5},
+        )
+        self.assertEqual(
+            self.status("FAILURE", ValueError("disk full")),
+            {"job_id": "job-1", "state": "FAILURE", "error": "disk full"},
+        )
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Book.objects.bulk_create(
+            Book(title=f'Book "{i}"', author="B", published_date=date(2020, 1, 1))
+            for i in range(50)
+        )
+
+    def export(self, export_format, **kwargs):
+        return b"".join(exports.export_chunks(export_format, **kwargs)).decode()
+
+    def test_csv(self):
+        rows = list(csv.reader(io.StringIO(self.export("csv"))))
+        self.assertEqual(rows[0], exports.COLUMNS)
+        titles = [row[1] for row in rows[1:]]
+        self.assertEqual(titles, [f'Book "{i}"' for i in range(50)])
+
+    def test_ndjson_since_id(self):
+        last = Book.objects.order_by("id")[9].id
+        lines = self.export("ndjson", since_id=last).splitlines()
+        self.assertEqual(len(lines), 40)
+        self.assertEqual(json.loads(lines[0])["id"], last + 1)
+
+    def test_since_updated_at(self):
+        old = timezone.now() - timedelta(days=1)
+        Book.objects.filter(id__gt=Book.objects.order_by("id")[9].id).update(
+            updated_at=old
+        )
+        since = old + timedelta(seconds=1)
+        lines = self.export("ndjson", since=since).splitlines()
+        self.assertEqual(len(lines), 10)
+        self.assertGreater(
+            exports.parse_since(json.loads(lines[0])["updated_at"]), since
+        )
+
+    def test_since_in_the_view_and_command(self):
+        user = get_user_model().objects.create_user("reader", password="x")
+        client = APIClient()
+        client.force_authenticate(user)
+        url = reverse("books:book-export")
+        self.assertEqual(client.get(url, {"since": "yesterday"}).status_code, 400)
+        future = (timezone.now() + timedelta(days=1)).isoformat()
+        response = client.get(url, {"since": future, "format": "csv"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(b"".join(response.streaming_content).splitlines()), 1)
+
+        out = io.StringIO()
+        with mock.patch("sys.stdout", mock.Mock(buffer=io.BytesIO())) as stdout:
+            call_command("export_books", f"--since={future}")
+            self.assertEqual(stdout.buffer.getvalue(), b"")
+        with self.assertRaises(CommandError):
+            call_command("export_books", "--since=yesterday", stderr=out)
+
+    def test_first_record_is_sent_alone(self):
+        with mock.patch.object(exports, "FLUSH_SIZE", 10**6):
+            chunks = list(exports.export_chunks("ndjson"))
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(chunks[0].count(b"\n"), 1)
+
+    def test_gzip(self):
+        chunks = list(exports.export_chunks("ndjson", gzip=True))
+        data = gzip.decompress(b"".join(chunks))
+        self.assertEqual(data.decode(), self.export("ndjson"))
+        # Each chunk is flushed, so what came so far can already be decoded.
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        self.assertTrue(decompressor.decompress(chunks[0]).endswith(b"\n"))
+
+    def test_command_writes_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "books.csv")
+            call_command("export_books", "--format=csv", "-o", path)
+            with open(path, encoding="utf-8", newline="") as output:
+                self.assertEqual(output.read(), self.export("csv"))
+
+
+class BulkParserTests(TestCase):
+    url = reverse("books:book-bulk")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("reader", password="x")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, body, content_type="application/x-ndjson"):
+        return self.client.post(self.url, body, content_type=content_type)
+
+    def book(self, i):
+        return {"title": f"Book {i}", "author": "B", "published_date": "2020-01-01"}
+
+    def test_ndjson(self):
+        body = "\n".join(json.dumps(self.book(i)) for i in range(3)) + "\n\n"
+        response = self.post(body)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()["created"]), 3)
+
+    def test_update_stamps_updated_at(self):
+        book = Book.objects.create(
+            title="A", author="B", published_date=date(2020, 1, 1)
+        )
+        Book.objects.filter(pk=book.pk).update(
+            updated_at=timezone.now() - timedelta(days=1)
+        )
+        started = timezone.now()
+        body = json.dumps([{"id": book.pk, "title": "New"}])
+        response = self.client.patch(self.url, body, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        book.refresh_from_db()
+        self.assertEqual(book.title, "New")
+        self.assertGreaterEqual(book.updated_at, started)
+
+    def test_ndjson_error_names_the_line(self):
+        response = self.post(json.dumps(self.book(0)) + "\n{oops\n")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("line 2", response.json()["detail"])
+
+    def test_ndjson_stops_at_max_items(self):
+        body = "\n".join(json.dumps(self.book(i)) for i in range(3))
+        with mock.patch("lib.views.BookBulkView.max_items", 2):
+            response = self.post(body)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Book.objects.exists())
+
+    def test_body_size_limit(self):
+        items = [self.book(i) for i in range(3)]
+        for content_type, body in [
+            ("application/json", json.dumps(items)),
+            ("application/x-ndjson", "\n".join(json.dumps(item) for item in items)),
+        ]:
+            with self.subTest(content_type=content_type):
+                with mock.patch.object(parsers, "MAX_BODY_SIZE", 100):
+                    response = self.post(body, content_type)
+                self.assertEqual(response.status_code, 413)
+        self.assertFalse(Book.objects.exists())
+
+
+class ValuesSerializerTests(TestCase):
+    def test_matches_model_serializer(self):
+        Book.objects.create(title="A", author="B", published_date=date(2020, 1, 2))
+        rows = book_values_serializer.values(Book.objects.all())
+        self.assertEqual(
+            book_values_serializer.many(rows),
+            BookSerializer(Book.objects.all(), many=True).data,
+        )
+
+
+class DetailCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("reader", password="x")
+        cls.book = Book.objects.create(
+            title="Old", author="B", published_date=date(2020, 1, 1)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("books:book-detail", args=[self.book.pk])
+
+    def rename(self, title):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.title = title
+            self.book.save()
+
+    def test_save_retires_cached_detail(self):
+        self.assertEqual(self.client.get(self.url).json()["title"], "Old")
+        self.rename("New")
+        self.assertEqual(self.client.get(self.url).json()["title"], "New")
+
+    def test_late_stale_set_is_not_served(self):
+        # A reader that looked up the key and read the row before the commit.
+        key = book_response_key(self.book.pk)
+        stale = self.client.get(self.url).json()
+        self.rename("New")
+        cache.set(key, stale)
+        self.assertEqual(self.client.get(self.url).json()["title"], "New")
+
+
+@override_settings(REQUEST_PROFILING=True)
+class RequestProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.book = Book.objects.create(
+            title="A", author="B", published_date=date(2020, 1, 1)
+        )
+        cls.user = get_user_model().objects.create_user(
+            "reader", password="x", is_active=True
+        )
+        cls.staff = get_user_model().objects.create_user(
+            "staff", password="x", is_active=True, is_staff=True
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse("books:book-detail", args=[self.book.pk]))
+        timing = response["Server-Timing"]
+        self.assertIn("total;dur=", timing)
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertIn('cache;desc="', timing)
+
+    async def test_async_view_queries_are_counted(self):
+        url = reverse("books:async-book-detail", args=[self.book.pk])
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(
+            response["Server-Timing"], r'db;dur=[\d.]+;desc="[1-9]\d* queries"'
+        )
+
+    def test_duplicate_queries_are_flagged(self):
+        def view(request):
+            for _ in range(3):
+                Book.objects.get(pk=self.book.pk)
+            return HttpResponse()
+
+        middleware = profiling.RequestProfilingMiddleware(view)
+        with self.assertLogs(profiling.logger, "WARNING") as logs:
+            response = middleware(RequestFactory().get("/"))
+        self.assertIn('dup;desc="2 duplicate queries"', response["Server-Timing"])
+        self.assertIn("ran 2 duplicate queries", logs.output[0])
+
+    def test_stats_view_is_staff_only(self):
+        url = reverse("request_profiling")
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(self.staff)
+        self.client.get(reverse("books:book-detail", args=[self.book.pk]))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        stats = response.json()["current"]["books:book-detail"]
+        self.assertGreaterEqual(stats["wall_ms"]["count"], 1)
+
+
+class GetOrComputeTests(TestCase):
+    key = "lib:test"
+    lock = "lib:test:lock"
+
+    def setUp(self):
+        cache.clear()
+
+    def test_failed_compute_releases_the_lock(self):
+        with self.assertRaises(ValueError):
+            lib_cache.get_or_compute(self.key, mock.Mock(side_effect=ValueError))
+        self.assertIsNone(cache.get(self.lock))
+        self.assertEqual(lib_cache.get_or_compute(self.key, lambda: 1), 1)
+        self.assertEqual(lib_cache.get_or_compute(self.key, lambda: 2), 1)
+
+    def wait(self, release):
+        cache.add(self.lock, True)
+        compute = mock.Mock(return_value="computed")
+        with mock.patch.object(lib_cache.time, "sleep", side_effect=release) as sleep:
+            value = lib_cache.get_or_compute(self.key, compute)
+        return value, compute.call_count, sleep.call_count
+
+    def test_waiter_takes_the_winners_value(self):
+        def release(seconds):
+            cache.set(self.key, "stored")
+            cache.delete(self.lock)
+
+        self.assertEqual(self.wait(release), ("stored", 0, 1))
+
+    def test_waiter_computes_once_the_winner_failed(self):
+        def release(seconds):
+            cache.delete(self.lock)
+
+        self.assertEqual(self.wait(release), ("computed", 1, 1))
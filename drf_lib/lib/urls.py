@@ -1,17 +1,32 @@
-from django.urls import path, include
-from rest_framework.routers import DefaultRouter
-from .views import BookListCreateView, BookDetailView, GenerateBooksView
+from django.urls import path
 
-app_name = "lib"
+from . import async_views
+from .views import (
+    BookBulkView,
+    BookDetailView,
+    BookExportView,
+    BookListCreateView,
+    GenerateBooksStatusView,
+    GenerateBooksView,
+)
 
-router = DefaultRouter()
-router.register(r"books", BookListCreateView, basename="book-list-create")
+app_name = "lib"
 
 urlpatterns = [
-    path("", include(router.urls)),
     path("books/", BookListCreateView.as_view(), name="book-list-create"),
+    path("books/bulk/", BookBulkView.as_view(), name="book-bulk"),
+    path("books/export/", BookExportView.as_view(), name="book-export"),
     path("books/<int:pk>/", BookDetailView.as_view(), name="book-detail"),
+    path("async/books/", async_views.book_list, name="async-book-list"),
+    path(
+        "async/books/<int:pk>/", async_views.book_detail, name="async-book-detail"
+    ),
     path(
         "generate-books/", GenerateBooksView.as_view(), name="generate-books"
     ),
+    path(
+        "generate-books/<str:job_id>/",
+        GenerateBooksStatusView.as_view(),
+        name="generate-books-status",
+    ),
 ]
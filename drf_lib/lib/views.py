@@ -1,47 +1,209 @@
+from celery.result import AsyncResult
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import generics, filters
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAdminUser
+from rest_framework import generics, filters, status
+from rest_framework.exceptions import ParseError
+from rest_framework.permissions import (
+    IsAdminUser,
+    IsAuthenticated,
+    IsAuthenticatedOrReadOnly,
+)
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
+from .bulk import BookBulkWriter
+from .cache import catalog_etag, catalog_last_modified
+from .exports import FORMATS, export_chunks, parse_since
+from .filters import BookFilter, BookSearchFilter
+from .mixins import FastReadMixin, ResponseCacheMixin
 from .models import Book
-from .serializers import BookSerializer
-from .tasks import send_new_book_notification
-from .factories import BookFactory
+from .pagination import BookCursorPagination
+from .parsers import BoundedJSONParser, NDJSONParser
+from .serializers import (
+    BookSerializer,
+    GenerateBooksSerializer,
+    book_values_serializer,
+)
+from .tasks import generate_books, queue_book_notifications
 
+# Unchanged polls get a 304 before the queryset or serializer is touched.
+catalog_conditional = method_decorator(
+    condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified)
+)
 
-class BookListCreateView(generics.ListCreateAPIView):
+
+class BookListCreateView(
+    ResponseCacheMixin, FastReadMixin, generics.ListCreateAPIView
+):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
+    values_serializer = book_values_serializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        BookSearchFilter,
         filters.OrderingFilter,
     ]
-    filterset_fields = ["author", "published_date"]
+    filterset_class = BookFilter
     search_fields = ["title", "author"]
     ordering_fields = ["title", "published_date"]
     ordering = ["published_date"]
+    pagination_class = BookCursorPagination
+
+    @catalog_conditional
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        book = serializer.save()
-        send_new_book_notification.delay(book.id)
+        with transaction.atomic():
+            book = serializer.save()
+            queue_book_notifications([book.id])
 
 
-class BookDetailView(generics.RetrieveUpdateDestroyAPIView):
+class BookDetailView(
+    ResponseCacheMixin, FastReadMixin, generics.RetrieveUpdateDestroyAPIView
+):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
+    values_serializer = book_values_serializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    @catalog_conditional
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def perform_destroy(self, instance):
         instance.delete()
 
 
+class BookBulkView(APIView):
+    """Bulk create (POST), update (PATCH) and delete (DELETE) of books.
+
+    The body is a JSON array or NDJSON. Updates are partial and need an
+    ``id`` per item; deletes take ids or ``{"id": ...}`` items. Pass
+    ``?partial_success=1`` to keep the valid items when others fail.
+    """
+
+    permission_classes = [IsAuthenticated]
+    parser_classes = [BoundedJSONParser, NDJSONParser]
+    max_items = getattr(settings, "LIB_BULK_MAX_ITEMS", 10000)
+
+    def get_items(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            raise ParseError("Expected a JSON array or NDJSON lines.")
+        if len(items) > self.max_items:
+            raise ParseError(f"At most {self.max_items} items per request.")
+        return items
+
+    def get_writer(self, request):
+        partial_success = request.query_params.get("partial_success", "")
+        return BookBulkWriter(partial_success=partial_success.lower() in ("1", "true"))
+
+    def respond(self, result, key, success_status=status.HTTP_200_OK):
+        if result.errors and not result.ids:
+            return Response(result.as_dict(key), status=status.HTTP_400_BAD_REQUEST)
+        return Response(result.as_dict(key), status=success_status)
+
+    def post(self, request, *args, **kwargs):
+        result = self.get_writer(request).create(self.get_items(request))
+        return self.respond(result, "created", status.HTTP_201_CREATED)
+
+    def patch(self, request, *args, **kwargs):
+        result = self.get_writer(request).update(self.get_items(request))
+        return self.respond(result, "updated")
+
+    def delete(self, request, *args, **kwargs):
+        result = self.get_writer(request).delete(self.get_items(request))
+        return self.respond(result, "deleted")
+
+
+class BookExportView(APIView):
+    """Stream the whole catalog as CSV or NDJSON.
+
+    ``?format=csv|ndjson``, ``?since_id=N`` for books added after a previous
+    export, ``?since=<ISO 8601 time>`` for books added or changed after it,
+    ``?gzip=1`` to compress the stream.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def perform_content_negotiation(self, request, force=False):
+        # ``?format=`` picks the export format here, not a DRF renderer.
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.query_params.get("format", "ndjson")
+        if export_format not in FORMATS:
+            return Response(
+                {"detail": "Unknown format."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        since_id = request.query_params.get("since_id")
+        if since_id is not None:
+            if not since_id.isdigit():
+                return Response(
+                    {"detail": "Invalid since_id."}, status=status.HTTP_400_BAD_REQUEST
+                )
+            since_id = int(since_id)
+        since = request.query_params.get("since")
+        if since is not None:
+            since = parse_since(since)
+            if since is None:
+                return Response(
+                    {"detail": "Invalid since."}, status=status.HTTP_400_BAD_REQUEST
+                )
+
+        gzip = request.query_params.get("gzip") in ("1", "true")
+        content_type = "application/gzip" if gzip else FORMATS[export_format][1]
+        filename = f"books.{export_format}" + (".gz" if gzip else "")
+        response = StreamingHttpResponse(
+            export_chunks(export_format, since_id, gzip, since=since),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
 class GenerateBooksView(APIView):
+    """Start a background job that seeds ``num_books`` books.
+
+    Passing ``seed`` makes the generated catalog reproducible. The response
+    carries the job id and the URL to poll for progress.
+    """
+
     permission_classes = [IsAdminUser]
 
     def post(self, request, *args, **kwargs):
-        num_books = int(request.data.get("num_books", 10))
-        BookFactory.create_batch(num_books)
-        return Response({"message": f"Successfully created {num_books} books."})
+        serializer = GenerateBooksSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = generate_books.delay(**serializer.validated_data)
+        status_url = reverse(
+            f"{request.resolver_match.namespace}:generate-books-status",
+            args=[job.id],
+        )
+        return Response(
+            {
+                "message": f"Generating {serializer.validated_data['num_books']} books.",
+                "job_id": job.id,
+                "status_url": request.build_absolute_uri(status_url),
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class GenerateBooksStatusView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, job_id, *args, **kwargs):
+        job = AsyncResult(job_id)
+        data = {"job_id": job_id, "state": job.state}
+        if job.state == "PROGRESS" or job.successful():
+            data.update(job.info)
+        elif job.failed():
+            data["error"] = str(job.info)
+        return Response(data)
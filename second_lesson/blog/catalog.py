@@ -0,0 +1,80 @@
+import json
+from collections import namedtuple
+
+from django.conf import settings
+
+Product = namedtuple('Product', ['id', 'name', 'description'])
+
+# Used when BLOG_CATALOG_FILE is not set.
+items = {
+    'Smartphone': {
+        'id': 1,
+        'description': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit'
+    },
+    'Laptop': {
+        'id': 2,
+        'description': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit'
+    },
+    'Keyboard': {
+        'id': 3,
+        'description': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit'
+    },
+    'Mouse': {
+        'id': 4,
+        'description': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit'
+    }
+}
+
+PRODUCTS = [
+    {'id': fields['id'], 'name': name, 'description': fields['description']}
+    for name, fields in items.items()
+]
+
+HOME_PRODUCTS = getattr(settings, 'BLOG_HOME_PRODUCTS', 20)
+
+
+class ProductNotFound(LookupError):
+    pass
+
+
+class Catalog:
+    """Read-only product catalog indexed by id.
+
+    Everything is built once, so a lookup is a dict access and the home
+    page reuses the same slice of products on every request. The module
+    level ``catalog`` is loaded at import, so a changed ``BLOG_CATALOG_FILE``
+    needs a restart.
+    """
+
+    def __init__(self, rows):
+        self.products = tuple(sorted(
+            (Product(int(row['id']), row['name'], row.get('description', '')) for row in rows),
+            key=lambda product: product.id,
+        ))
+        self.by_id = {product.id: product for product in self.products}
+        if len(self.by_id) != len(self.products):
+            raise ValueError('Product ids must be unique.')
+        self.featured = self.products[:HOME_PRODUCTS]
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a JSON list of ``{"id", "name", "description"}`` objects."""
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.products)
+
+    def get(self, product_id):
+        try:
+            return self.by_id[product_id]
+        except KeyError as e:
+            raise ProductNotFound(product_id) from e
+
+
+def load_catalog():
+    path = getattr(settings, 'BLOG_CATALOG_FILE', None)
+    return Catalog.from_file(path) if path else Catalog(PRODUCTS)
+
+
+catalog = load_catalog()
@@ -1,3 +1,28 @@
-from django.test import TestCase
+import json
+import tempfile
 
-# Create your tests here.
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from .catalog import Catalog, ProductNotFound, catalog
+
+
+class CatalogTests(SimpleTestCase):
+    def test_lookup(self):
+        self.assertEqual(catalog.get(2).name, 'Laptop')
+        with self.assertRaises(ProductNotFound):
+            catalog.get(99)
+
+    def test_from_file(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as f:
+            json.dump([{'id': 7, 'name': 'Monitor'}, {'id': '3', 'name': 'Cable'}], f)
+            f.flush()
+            loaded = Catalog.from_file(f.name)
+        self.assertEqual([product.id for product in loaded.featured], [3, 7])
+        self.assertEqual(loaded.get(7).description, '')
+
+    def test_pages(self):
+        response = self.client.get(reverse('blog:items', args=[1]))
+        self.assertContains(response, 'Smartphone')
+        self.assertEqual(self.client.get(reverse('blog:items', args=[99])).status_code, 404)
+        self.assertContains(self.client.get(reverse('blog:home')), 'Mouse')
@@ -1,38 +1,27 @@
+from django.http import Http404
 from django.shortcuts import render
-menu = ['home','about','post']
-items = {
-'Smartphone': {
-    'id': 1,
-    'description': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit'
-},
-'Laptop': {
-    'id': 2,
-    'description': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit'
-},
-'Keyboard': {
-    'id': 3,
-    'description': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit'
-},
-'Mouse': {
-    'id': 4,
-    'description': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit'
-}
+
+from .catalog import ProductNotFound, catalog
+
+menu = ['home', 'about', 'posts']
+
+home_context = {
+    'menu': menu,
+    'items': catalog.featured,
 }
 
-def home(request):
-    menu = ["home", "about", "posts"]
 
-    data = {
-        'menu': menu,
-        'items': items
-    }
-    return render(request,'blog/index.html', context=data)
+def home(request):
+    return render(request, 'blog/index.html', context=home_context)
 
 
 def about(request):
     return render(request, 'blog/about.html')
 
 
-def items(request,items_id):
-    items = [i for i in items if items[i]['id'] == items_id]
-    return render(request, 'blog/items.html', {'items_description': items[items_lst[0]], 'items_name': items_lst[0]})
\ No newline at end of file
+def items(request, items_id):
+    try:
+        item = catalog.get(items_id)
+    except ProductNotFound as e:
+        raise Http404('No item with id %s.' % items_id) from e
+    return render(request, 'blog/items.html', {'items_description': item, 'items_name': item.name})
@@ -0,0 +1,64 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+ROSTER_VERSION_KEY = "roster:version"
+ROSTER_TIMEOUT = getattr(settings, "ROSTER_CACHE_TIMEOUT", 60 * 15)
+
+
+def get_roster_version():
+    """Return the current roster version, creating it if it was evicted."""
+    version = cache.get(ROSTER_VERSION_KEY)
+    if version is None:
+        # A time based seed keeps a re-created version above every value
+        # that was handed out before the key was lost.
+        cache.add(ROSTER_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(ROSTER_VERSION_KEY)
+    return version
+
+
+def bump_roster_version():
+    """Invalidate every cached roster page by moving to a new version."""
+    try:
+        return cache.incr(ROSTER_VERSION_KEY)
+    except ValueError:
+        cache.set(ROSTER_VERSION_KEY, time.time_ns(), timeout=None)
+        return cache.get(ROSTER_VERSION_KEY)
+
+
+def roster_page_key(roster, page, school_id=None, version=None):
+    if version is None:
+        version = get_roster_version()
+    page = str(page)
+    if len(page) > 32:
+        page = hashlib.md5(page.encode()).hexdigest()
+    return f"roster:{roster}:v{version}:school:{school_id or 'all'}:page:{page}"
+
+
+def get_roster_page(roster, page, school_id=None):
+    return cache.get(roster_page_key(roster, page, school_id))
+
+
+def set_roster_page(roster, page, entry, school_id=None):
+    cache.set(roster_page_key(roster, page, school_id), entry, ROSTER_TIMEOUT)
+
+
+def build_rows(values):
+    """Turn ``values()`` dicts into nested dicts the templates can traverse.
+
+    ``{"school__name": "X"}`` becomes ``{"school": {"name": "X"}}`` so that
+    ``student.school.name`` keeps working against cached rows.
+    """
+    rows = []
+    for value in values:
+        row = {}
+        for field, data in value.items():
+            *path, name = field.split("__")
+            target = row
+            for part in path:
+                target = target.setdefault(part, {})
+            target[name] = data
+        rows.append(row)
+    return rows
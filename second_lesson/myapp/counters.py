@@ -0,0 +1,128 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .models import Class, RosterCounter, Student, Teacher
+
+COUNTED_MODELS = {"students": Student, "teachers": Teacher, "classes": Class}
+COUNTER_TIMEOUT = getattr(settings, "ROSTER_COUNTER_TIMEOUT", 60 * 60)
+
+
+def counter_for(model):
+    for name, counted in COUNTED_MODELS.items():
+        if counted is model:
+            return name
+    return None
+
+
+def counter_version_key(name, school_id=None):
+    return f"roster:count:{name}:school:{school_id or 'all'}:version"
+
+
+def get_counter_version(name, school_id=None):
+    key = counter_version_key(name, school_id)
+    version = cache.get(key)
+    if version is None:
+        # Time based, like the roster version, so a re-created version is
+        # above every value handed out before the key was lost.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_counter_versions(names_and_schools):
+    for name, school_id in names_and_schools:
+        key = counter_version_key(name, school_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def counter_key(name, school_id=None, version=None):
+    if version is None:
+        version = get_counter_version(name, school_id)
+    return f"roster:count:{name}:school:{school_id or 'all'}:v{version}"
+
+
+def get_count(name, school_id=None):
+    """Read a counter through the cache, seeding the counter row if missing.
+
+    The value is cached under the counter's current version with ``add``,
+    so a reader that loaded the row before a write committed can only store
+    it under a version nobody reads any more.
+    """
+    key = counter_key(name, school_id)
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    row = (
+        RosterCounter.objects.filter(name=name, school_id=school_id)
+        .values_list("value", flat=True)
+        .first()
+    )
+    if row is None:
+        queryset = COUNTED_MODELS[name].objects.all()
+        if school_id is not None:
+            queryset = queryset.filter(school_id=school_id)
+        row = queryset.count()
+        try:
+            with transaction.atomic():
+                RosterCounter.objects.create(name=name, school_id=school_id, value=row)
+        except IntegrityError:
+            pass
+    cache.add(key, row, COUNTER_TIMEOUT)
+    return row
+
+
+def adjust(name, school_id, delta):
+    """Add ``delta`` to the global and the per-school counter of ``name``.
+
+    Rows that do not exist yet are left alone; they are seeded with an exact
+    count on the next read. Once the surrounding transaction commits the
+    counters move to a new cache version, which retires the cached values
+    and any value a concurrent reader is about to store.
+    """
+    scopes = [None] if school_id is None else [None, school_id]
+    for scope in scopes:
+        RosterCounter.objects.filter(name=name, school_id=scope).update(
+            value=F("value") + delta
+        )
+    transaction.on_commit(
+        lambda: bump_counter_versions((name, scope) for scope in scopes)
+    )
+
+
+def reconcile():
+    """Recompute every counter from the tables and repair drifted rows.
+
+    Returns a list of ``(name, school_id, stored, actual)`` for each repair.
+    """
+    repaired = []
+    for name, model in COUNTED_MODELS.items():
+        actual = {None: model.objects.count()}
+        actual.update(
+            model.objects.order_by()
+            .values_list("school_id")
+            .annotate(total=Count("pk"))
+        )
+        stored = dict(
+            RosterCounter.objects.filter(name=name).values_list("school_id", "value")
+        )
+        with transaction.atomic():
+            for school_id in stored.keys() | actual.keys():
+                value = actual.get(school_id, 0)
+                if stored.get(school_id) == value:
+                    continue
+                RosterCounter.objects.update_or_create(
+                    name=name, school_id=school_id, defaults={"value": value}
+                )
+                repaired.append((name, school_id, stored.get(school_id), value))
+        bump_counter_versions(
+            (name, school_id) for school_id in stored.keys() | actual.keys()
+        )
+    return repaired
@@ -0,0 +1,133 @@
+import csv
+import json
+import zlib
+
+from .models import Class, School, Student, Teacher
+
+# (column, lookup) pairs per export; related names are joined in SQL.
+EXPORTS = {
+    "students": (
+        Student,
+        [
+            ("id", "id"),
+            ("first_name", "first_name"),
+            ("last_name", "last_name"),
+            ("address", "address"),
+            ("school_id", "school_id"),
+            ("school", "school__name"),
+            ("class_id", "class_number_id"),
+            ("class", "class_number__class_number"),
+        ],
+    ),
+    "teachers": (
+        Teacher,
+        [
+            ("id", "id"),
+            ("first_name", "first_name"),
+            ("last_name", "last_name"),
+            ("email", "email"),
+            ("school_id", "school_id"),
+            ("school", "school__name"),
+        ],
+    ),
+    "classes": (
+        Class,
+        [
+            ("id", "id"),
+            ("class_number", "class_number"),
+            ("location", "location"),
+            ("school_id", "school_id"),
+            ("school", "school__name"),
+        ],
+    ),
+    "schools": (
+        School,
+        [
+            ("id", "id"),
+            ("name", "name"),
+            ("address", "address"),
+            ("school_number", "school_number"),
+        ],
+    ),
+}
+
+# Query string filter -> lookup, per export.
+FILTERS = {
+    "students": {"school": "school_id", "class": "class_number_id"},
+    "teachers": {"school": "school_id"},
+    "classes": {"school": "school_id", "class": "id"},
+    "schools": {"school": "id"},
+}
+
+CHUNK_SIZE = 2000
+FLUSH_BYTES = 64 * 1024
+
+
+class Echo:
+    """File-like object whose ``write`` hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(kind, filters=None, chunk_size=CHUNK_SIZE):
+    """Return ``(header, rows)`` where ``rows`` iterates tuples from the DB."""
+    model, columns = EXPORTS[kind]
+    queryset = model.objects.order_by("id")
+    for name, value in (filters or {}).items():
+        queryset = queryset.filter(**{FILTERS[kind][name]: value})
+    header = [column for column, lookup in columns]
+    rows = queryset.values_list(*[lookup for column, lookup in columns]).iterator(
+        chunk_size=chunk_size
+    )
+    return header, rows
+
+
+def csv_lines(header, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(header, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(header, row)), default=str) + "\n"
+
+
+def buffered(lines, flush_bytes=FLUSH_BYTES):
+    """Join small lines into chunks of about ``flush_bytes`` bytes.
+
+    The first line is sent on its own so the client gets bytes immediately.
+    """
+    buffer = []
+    size = 0
+    first = True
+    for line in lines:
+        data = line.encode()
+        if first:
+            yield data
+            first = False
+            continue
+        buffer.append(data)
+        size += len(data)
+        if size >= flush_bytes:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    first = True
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if first:
+            # Sync flush the header chunk so compression does not hold it back.
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            first = False
+        if data:
+            yield data
+    yield compressor.flush()
@@ -105,3 +105,10 @@ class SchoolForm(forms.ModelForm):
     class Meta:
         model = School
         fields = ["name", "address", "school_number"]
+
+class RosterImportForm(forms.Form):
+    """Form for uploading a student or teacher roster file."""
+
+    kind = forms.ChoiceField(choices=[("students", "Students"), ("teachers", "Teachers")])
+    file = forms.FileField(help_text="CSV, TSV or XLSX with a header row.")
+    batch_size = forms.IntegerField(min_value=1, max_value=10000, initial=1000)
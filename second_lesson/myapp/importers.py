@@ -0,0 +1,220 @@
+import csv
+import io
+import os
+
+from django.db import IntegrityError, transaction
+
+from .forms import StudentForm, TeacherForm
+from .models import Class, School, Student, Teacher
+from .signals import bulk_created
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+def iter_rows(fileobj, filename):
+    """Yield ``(line_number, row_dict)`` from a binary file, one row at a time.
+
+    CSV and TSV are read with the ``csv`` module; ``.xlsx`` needs openpyxl,
+    which is only imported when such a file is uploaded.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".xlsx":
+        try:
+            from openpyxl import load_workbook
+        except ImportError as e:
+            raise ImportFormatError("Install openpyxl to import .xlsx files.") from e
+        sheet = load_workbook(fileobj, read_only=True).active
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(cell or "").strip() for cell in next(rows, ())]
+        for line, values in enumerate(rows, start=2):
+            yield line, {
+                name: "" if value is None else str(value)
+                for name, value in zip(header, values)
+            }
+        return
+
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text, delimiter="\t" if extension == ".tsv" else ",")
+    if reader.fieldnames is None:
+        return
+    reader.fieldnames = [name.strip() for name in reader.fieldnames]
+    for row in reader:
+        yield reader.line_num, {
+            name: (value or "").strip() for name, value in row.items() if name
+        }
+
+
+class ImportResult:
+    def __init__(self, max_errors=100):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def add_error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line, errors))
+
+
+def import_form(form_class, exclude):
+    """Return ``form_class`` without the ``exclude`` fields and unique checks.
+
+    The importer resolves those foreign keys through its lookup maps and
+    checks uniqueness against sets loaded once and on insert, so the form
+    runs no query per row. Everything else, including the form's and the
+    model's ``clean()``, still runs.
+    """
+
+    class ImportForm(form_class):
+        class Meta(form_class.Meta):
+            fields = [name for name in form_class.Meta.fields if name not in exclude]
+
+        def validate_unique(self):
+            pass
+
+    return ImportForm
+
+
+class RosterImporter:
+    """Validate rows with the model form and insert them in batches.
+
+    School and class references are resolved through lookup maps loaded once
+    per import, so rows never query for their foreign keys. Only one batch is
+    held in memory; errors beyond ``max_errors`` are only written to
+    ``error_writer`` (a ``csv.writer``) when one is given.
+    """
+
+    model = None
+    form_class = None
+    fk_fields = ("school",)
+
+    def __init__(self, batch_size=1000, error_writer=None, max_errors=100):
+        self.batch_size = batch_size
+        self.error_writer = error_writer
+        self.max_errors = max_errors
+        self.form = import_form(self.form_class, self.fk_fields)
+        self.load_lookups()
+
+    def load_lookups(self):
+        self.schools = {}
+        for school in School.objects.only("id", "name", "school_number"):
+            self.schools[str(school.pk)] = school
+            self.schools[f"#{school.school_number}"] = school
+            self.schools[school.name.lower()] = school
+
+    def resolve_school(self, value):
+        value = value.strip()
+        return (
+            self.schools.get(f"#{value}")
+            or self.schools.get(value)
+            or self.schools.get(value.lower())
+        )
+
+    def clean_row(self, row):
+        """Return ``(instance, errors)`` for one parsed row."""
+        errors = {}
+        instance = self.model()
+        school = self.resolve_school(row.get("school", ""))
+        if school is None:
+            errors["school"] = ["Unknown school."]
+        else:
+            instance.school = school
+
+        form = self.form(row, instance=instance)
+        for name, messages in form.errors.items():
+            errors[name] = list(messages)
+        self.clean_related(form.instance, row, errors)
+        return form.instance, errors
+
+    def clean_related(self, instance, row, errors):
+        pass
+
+    def run(self, rows):
+        result = ImportResult(self.max_errors)
+        batch = []
+        for line, row in rows:
+            instance, errors = self.clean_row(row)
+            if errors:
+                self.report(result, line, errors)
+                continue
+            batch.append((line, instance))
+            if len(batch) >= self.batch_size:
+                self.flush(batch, result)
+                batch = []
+        if batch:
+            self.flush(batch, result)
+        return result
+
+    def flush(self, batch, result):
+        try:
+            with transaction.atomic():
+                created = self.model.objects.bulk_create(
+                    [instance for line, instance in batch]
+                )
+                bulk_created.send(sender=self.model, instances=created)
+        except IntegrityError:
+            # Fall back to one row per savepoint to find the offending rows.
+            created = []
+            for line, instance in batch:
+                try:
+                    with transaction.atomic():
+                        created += self.model.objects.bulk_create([instance])
+                except IntegrityError as e:
+                    self.report(result, line, {"__all__": [str(e)]})
+            if created:
+                with transaction.atomic():
+                    bulk_created.send(sender=self.model, instances=created)
+        result.created += len(created)
+
+    def report(self, result, line, errors):
+        result.add_error(line, errors)
+        if self.error_writer is not None:
+            for field, messages in errors.items():
+                self.error_writer.writerow([line, field, " ".join(messages)])
+
+
+class StudentImporter(RosterImporter):
+    model = Student
+    form_class = StudentForm
+    fk_fields = ("school", "class_number")
+
+    def load_lookups(self):
+        super().load_lookups()
+        self.classes = {
+            (school_id, class_number.lower()): pk
+            for pk, school_id, class_number in Class.objects.values_list(
+                "id", "school_id", "class_number"
+            )
+        }
+
+    def clean_related(self, instance, row, errors):
+        class_number = row.get("class_number", "").strip()
+        if not class_number or instance.school_id is None:
+            return
+        class_id = self.classes.get((instance.school_id, class_number.lower()))
+        if class_id is None:
+            errors["class_number"] = ["Unknown class for this school."]
+        instance.class_number_id = class_id
+
+
+class TeacherImporter(RosterImporter):
+    model = Teacher
+    form_class = TeacherForm
+
+    def load_lookups(self):
+        super().load_lookups()
+        self.emails = set(Teacher.objects.values_list("email", flat=True))
+
+    def clean_related(self, instance, row, errors):
+        if "email" in errors:
+            return
+        if instance.email in self.emails:
+            errors["email"] = ["Teacher with this Email already exists."]
+        elif not errors:
+            self.emails.add(instance.email)
+
+
+IMPORTERS = {"students": StudentImporter, "teachers": TeacherImporter}
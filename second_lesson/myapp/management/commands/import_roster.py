@@ -0,0 +1,45 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.importers import IMPORTERS, ImportFormatError, iter_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk import students or teachers from a CSV, TSV or XLSX file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(IMPORTERS))
+        parser.add_argument("path")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--report", help="Write every rejected row to this CSV file."
+        )
+
+    def handle(self, *args, **options):
+        report = None
+        try:
+            writer = None
+            if options["report"]:
+                report = open(options["report"], "w", newline="")
+                writer = csv.writer(report)
+                writer.writerow(["line", "field", "error"])
+            importer = IMPORTERS[options["kind"]](
+                batch_size=options["batch_size"], error_writer=writer
+            )
+            with open(options["path"], "rb") as fileobj:
+                result = importer.run(iter_rows(fileobj, options["path"]))
+        except (OSError, ImportFormatError) as e:
+            raise CommandError(str(e)) from e
+        finally:
+            if report is not None:
+                report.close()
+
+        for line, errors in result.errors:
+            for field, messages in errors.items():
+                self.stderr.write(f"line {line}: {field}: {' '.join(messages)}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result.created} {options['kind']}, {result.failed} rejected."
+            )
+        )
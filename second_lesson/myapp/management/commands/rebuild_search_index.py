@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from myapp.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the student/teacher search index from the database."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        with transaction.atomic():
+            backend.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Search index rebuilt ({type(backend).__name__}).")
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from myapp.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recount students, teachers and classes and repair drifted counters."
+
+    def handle(self, *args, **options):
+        repaired = reconcile()
+        for name, school_id, stored, actual in repaired:
+            scope = f"school {school_id}" if school_id else "global"
+            self.stdout.write(f"{name} ({scope}): {stored} -> {actual}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Counters reconciled, {len(repaired)} repaired.")
+        )
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS myapp_person_fts USING fts5("
+        "first_name, last_name, address, school_name, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+    )
+    schema_editor.execute(
+        "INSERT INTO myapp_person_fts "
+        "(rowid, first_name, last_name, address, school_name) "
+        "SELECT p.id * 2, p.first_name, p.last_name, p.address, s.name "
+        "FROM myapp_student p JOIN myapp_school s ON s.id = p.school_id"
+    )
+    schema_editor.execute(
+        "INSERT INTO myapp_person_fts "
+        "(rowid, first_name, last_name, address, school_name) "
+        "SELECT p.id * 2 + 1, p.first_name, p.last_name, '', s.name "
+        "FROM myapp_teacher p JOIN myapp_school s ON s.id = p.school_id"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS myapp_person_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0002_teacher_saved_classes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
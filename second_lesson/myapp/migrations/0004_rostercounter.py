@@ -0,0 +1,26 @@
+# Generated by Django 5.1.1 on 2026-10-18 15:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0003_person_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RosterCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=32)),
+                ('value', models.BigIntegerField(default=0)),
+                ('school', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='myapp.school')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('name', 'school'), name='unique_school_roster_counter'), models.UniqueConstraint(condition=models.Q(('school__isnull', True)), fields=('name',), name='unique_global_roster_counter')],
+            },
+        ),
+    ]
@@ -0,0 +1,139 @@
+from django.core.paginator import InvalidPage
+from django.http import Http404
+
+from . import cache as roster_cache
+from .pagination import KeysetPage, KeysetPaginator, RosterPaginator
+
+
+class QueryProfileMixin:
+    """Shape ``get_queryset()`` with a declared profile.
+
+    ``query_profile`` may hold ``select_related``, ``prefetch_related`` and
+    ``only`` sequences, e.g. ``{"select_related": ("school",)}``.
+    """
+
+    query_profile = {}
+
+    def get_query_profile(self):
+        return self.query_profile
+
+    def shape_queryset(self, queryset):
+        profile = self.get_query_profile()
+        if profile.get("select_related"):
+            queryset = queryset.select_related(*profile["select_related"])
+        if profile.get("prefetch_related"):
+            queryset = queryset.prefetch_related(*profile["prefetch_related"])
+        if profile.get("only"):
+            queryset = queryset.only(*profile["only"])
+        return queryset
+
+    def get_queryset(self):
+        return self.shape_queryset(super().get_queryset())
+
+
+class RosterCacheMixin:
+    """Cache list pages as plain row data under a versioned, per-school key.
+
+    ``roster_fields`` are passed to ``values()``; related lookups such as
+    ``school__name`` are nested so templates can keep using ``row.school.name``.
+    ``pagination_mode`` is ``"keyset"`` (seek on ``keyset_ordering`` with a
+    ``?cursor=`` token) or ``"offset"`` (classic ``?page=`` numbers).
+    """
+
+    roster_name = None
+    roster_fields = ()
+    pagination_mode = "keyset"
+    keyset_ordering = ("last_name", "id")
+    count_mode = "exact"
+    count_cap = 1000
+    cursor_kwarg = "cursor"
+
+    def get_school_id(self):
+        school_id = self.request.GET.get("school")
+        return int(school_id) if school_id and school_id.isdigit() else None
+
+    def filter_by_school(self, queryset):
+        school_id = self.get_school_id()
+        if school_id is not None:
+            queryset = queryset.filter(school_id=school_id)
+        return queryset
+
+    def get_page_token(self):
+        if self.pagination_mode == "keyset":
+            return self.request.GET.get(self.cursor_kwarg) or "first"
+        return (
+            self.kwargs.get(self.page_kwarg) or self.request.GET.get(self.page_kwarg) or 1
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        token = self.get_page_token()
+        school_id = self.get_school_id()
+        entry = roster_cache.get_roster_page(self.roster_name, token, school_id)
+        if entry is None:
+            if self.pagination_mode == "keyset":
+                entry = self.build_keyset_page(queryset, page_size, token)
+            else:
+                entry = self.build_roster_page(queryset, page_size, token)
+            roster_cache.set_roster_page(self.roster_name, token, entry, school_id)
+
+        if self.pagination_mode == "keyset":
+            paginator = KeysetPaginator(
+                queryset, page_size, self.keyset_ordering, self.count_mode
+            )
+            page = KeysetPage(
+                entry["rows"],
+                paginator,
+                entry["next"],
+                entry["previous"],
+                entry["count"],
+                entry["approximate"],
+            )
+        else:
+            paginator = RosterPaginator(entry["rows"], page_size, entry["count"])
+            page = paginator.page(entry["number"])
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def build_keyset_page(self, queryset, page_size, token):
+        paginator = KeysetPaginator(
+            queryset.values(*self.roster_fields),
+            page_size,
+            ordering=self.keyset_ordering,
+            count_mode=self.count_mode,
+            count_cap=self.count_cap,
+        )
+        try:
+            page = paginator.page(None if token == "first" else token)
+        except InvalidPage as e:
+            raise Http404(f"Invalid cursor: {e}") from e
+
+        return {
+            "rows": roster_cache.build_rows(page.object_list),
+            "next": page.next_cursor,
+            "previous": page.previous_cursor,
+            "count": page.count,
+            "approximate": page.count_is_approximate,
+        }
+
+    def build_roster_page(self, queryset, page_size, page_number):
+        paginator = self.get_paginator(
+            queryset,
+            page_size,
+            orphans=self.get_paginate_orphans(),
+            allow_empty_first_page=self.get_allow_empty(),
+        )
+        try:
+            if page_number == "last":
+                number = paginator.num_pages
+            else:
+                number = paginator.validate_number(page_number)
+        except InvalidPage as e:
+            raise Http404(f"Invalid page ({page_number}): {e}") from e
+
+        page = paginator.page(number)
+        return {
+            "rows": roster_cache.build_rows(
+                page.object_list.values(*self.roster_fields)
+            ),
+            "count": paginator.count,
+            "number": number,
+        }
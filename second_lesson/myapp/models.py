@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Case, Value, When
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -6,6 +7,21 @@ from django.contrib.auth.models import (
 )
 
 
+class LoadedSchoolMixin:
+    """Remember the ``school_id`` a row was loaded with.
+
+    The roster counters compare it on save to tell whether the row moved to
+    another school, without reading the old row back.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "school_id" in field_names:
+            instance._loaded_school_id = instance.school_id
+        return instance
+
+
 class School(models.Model):
     name = models.CharField(max_length=255)
     address = models.CharField(max_length=255)
@@ -22,7 +38,7 @@ class Subject(models.Model):
         return self.name
 
 
-class Class(models.Model):
+class Class(LoadedSchoolMixin, models.Model):
     school = models.ForeignKey(School, on_delete=models.CASCADE)
     class_number = models.CharField(max_length=10)
     location = models.CharField(max_length=255)
@@ -32,21 +48,40 @@ class Class(models.Model):
         return f"Class {self.class_number} at {self.school.name}"
 
 
-class StudentManager(models.Manager):
-    def search_by_name(self, query):
-        return self.filter(first_name__icontains=query) | self.filter(
-            last_name__icontains=query
-        )
+class NameSearchManager(models.Manager):
+    def search_by_name(self, query, fuzzy=False, limit=None):
+        """Search first and last names and return a queryset.
+
+        By default this matches substrings. With ``fuzzy=True`` the rows are
+        ranked by trigram similarity, best first, which also finds
+        misspelled names.
+        """
+        if fuzzy:
+            from .trigram import get_trigram_index
 
+            matches = get_trigram_index(self.model).search(query, limit=limit or 10)
+            if not matches:
+                return self.none()
+            rank = Case(
+                *[When(pk=pk, then=Value(i)) for i, (pk, score) in enumerate(matches)]
+            )
+            return self.filter(pk__in=[pk for pk, score in matches]).order_by(rank)
 
-class TeacherManager(models.Manager):
-    def search_by_name(self, query):
-        return self.filter(first_name__icontains=query) | self.filter(
+        queryset = self.filter(first_name__icontains=query) | self.filter(
             last_name__icontains=query
         )
+        return queryset[:limit] if limit else queryset
+
+
+class StudentManager(NameSearchManager):
+    pass
 
 
-class Student(models.Model):
+class TeacherManager(NameSearchManager):
+    pass
+
+
+class Student(LoadedSchoolMixin, models.Model):
     first_name = models.CharField(max_length=255)
     last_name = models.CharField(max_length=255)
     address = models.CharField(max_length=255)
@@ -61,7 +96,7 @@ class Student(models.Model):
         return f"{self.first_name} {self.last_name}"
 
 
-class Teacher(models.Model):
+class Teacher(LoadedSchoolMixin, models.Model):
     first_name = models.CharField(max_length=255)
     last_name = models.CharField(max_length=255)
     email = models.EmailField(unique=True)
@@ -74,6 +109,31 @@ class Teacher(models.Model):
         return f"{self.first_name} {self.last_name}"
 
 
+class RosterCounter(models.Model):
+    """Denormalized row count, global (``school=None``) or per school."""
+
+    name = models.CharField(max_length=32)
+    school = models.ForeignKey(
+        School, on_delete=models.CASCADE, null=True, blank=True
+    )
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["name", "school"], name="unique_school_roster_counter"
+            ),
+            models.UniqueConstraint(
+                fields=["name"],
+                condition=models.Q(school__isnull=True),
+                name="unique_global_roster_counter",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
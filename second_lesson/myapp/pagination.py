@@ -0,0 +1,187 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def encode_cursor(position, reverse=False):
+    """Pack a keyset position into an opaque, URL safe token."""
+    payload = json.dumps({"p": list(position), "r": reverse}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, fields=None):
+    """Return ``(position, reverse)`` for a token made by ``encode_cursor``.
+
+    With ``fields`` (the model fields of the ordering) every value of the
+    position is converted with ``to_python``, so a tampered token fails here
+    instead of in the query.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        position, reverse = tuple(payload["p"]), payload["r"]
+        if not isinstance(reverse, bool):
+            raise TypeError(reverse)
+        if fields is not None:
+            if len(position) != len(fields):
+                raise ValueError(position)
+            position = tuple(
+                field.to_python(value) for field, value in zip(fields, position)
+            )
+        # The seek lookups can not compare against NULL.
+        if None in position:
+            raise ValueError(position)
+        return position, reverse
+    except (binascii.Error, ValueError, KeyError, TypeError, ValidationError) as e:
+        raise InvalidCursor("Invalid cursor.") from e
+
+
+class RosterPaginator(Paginator):
+    """Paginator over one already materialized page with a known total."""
+
+    def __init__(self, rows, per_page, count):
+        super().__init__(rows, per_page)
+        self._count = count
+
+    @cached_property
+    def count(self):
+        return self._count
+
+    def page(self, number):
+        number = self.validate_number(number)
+        return self._get_page(self.object_list, number, self)
+
+
+class KeysetPage:
+    def __init__(
+        self, object_list, paginator, next_cursor=None, previous_cursor=None,
+        count=None, count_is_approximate=False,
+    ):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+        self.count_is_approximate = count_is_approximate
+
+    def __repr__(self):
+        return f"<KeysetPage next={self.next_cursor!r}>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Seek pagination over a unique ordering such as ``("last_name", "id")``.
+
+    Every page is one ``WHERE (last_name, id) > (...) LIMIT n`` query, so
+    deep pages cost the same as the first one. ``count_mode`` is ``"exact"``,
+    ``"approximate"`` (a COUNT capped at ``count_cap`` rows) or ``"none"``.
+    """
+
+    keyset = True
+
+    def __init__(
+        self, queryset, per_page, ordering=("last_name", "id"),
+        count_mode="exact", count_cap=1000,
+    ):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.count_mode = count_mode
+        self.count_cap = count_cap
+
+    def get_count(self):
+        if self.count_mode == "none":
+            return None, False
+        if self.count_mode == "approximate":
+            count = self.queryset.order_by()[: self.count_cap + 1].count()
+            if count > self.count_cap:
+                return self.count_cap, True
+            return count, False
+        return self.queryset.count(), False
+
+    def _fields(self, reverse):
+        for field in self.ordering:
+            descending = field.startswith("-")
+            name = field.lstrip("-")
+            yield name, descending != reverse
+
+    def _seek(self, position, reverse):
+        """Build ``(a, b) > (x, y)`` as ``a > x OR (a = x AND b > y)``."""
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self._fields(reverse), position):
+            lookup = "lt" if descending else "gt"
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return condition
+
+    def _model_fields(self):
+        opts = self.queryset.model._meta
+        try:
+            return [opts.get_field(field.lstrip("-")) for field in self.ordering]
+        except FieldDoesNotExist:
+            # Annotations can not be checked; leave them to the database.
+            return None
+
+    def _position(self, item):
+        names = [field.lstrip("-") for field in self.ordering]
+        if isinstance(item, dict):
+            return tuple(item[name] for name in names)
+        return tuple(getattr(item, name) for name in names)
+
+    def page(self, cursor=None):
+        position, reverse = (
+            decode_cursor(cursor, self._model_fields()) if cursor else (None, False)
+        )
+        if position is not None and len(position) != len(self.ordering):
+            raise InvalidCursor("Invalid cursor.")
+
+        order_by = [
+            f"-{name}" if descending else name
+            for name, descending in self._fields(reverse)
+        ]
+        queryset = self.queryset.order_by(*order_by)
+        if position is not None:
+            queryset = queryset.filter(self._seek(position, reverse))
+
+        rows = list(queryset[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if reverse:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or reverse:
+                next_cursor = encode_cursor(self._position(rows[-1]))
+            if position is not None and (has_more or not reverse):
+                previous_cursor = encode_cursor(self._position(rows[0]), reverse=True)
+
+        count, approximate = self.get_count()
+        return KeysetPage(rows, self, next_cursor, previous_cursor, count, approximate)
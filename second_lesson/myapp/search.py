@@ -0,0 +1,203 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from .models import School, Student, Teacher
+
+FTS_TABLE = "myapp_person_fts"
+
+# Students and teachers share one index; the kind is folded into the rowid
+# so that updates and deletes stay primary key lookups.
+KINDS = {"student": 0, "teacher": 1}
+MODELS = {"student": Student, "teacher": Teacher}
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def person_rowid(kind, pk):
+    return pk * len(KINDS) + KINDS[kind]
+
+
+def kind_for(instance):
+    return "teacher" if isinstance(instance, Teacher) else "student"
+
+
+class BaseSearchBackend:
+    """Interface of the student/teacher name search index."""
+
+    def search(self, query, kind=None, limit=10):
+        """Return up to ``limit`` result dicts, best match first."""
+        raise NotImplementedError
+
+    def index(self, instances):
+        pass
+
+    def remove(self, kind, pks):
+        pass
+
+    def update_school(self, school):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """Portable fallback: ``istartswith`` on names, no extra index to keep."""
+
+    def search(self, query, kind=None, limit=10):
+        tokens = TOKEN_RE.findall(query)
+        if not tokens:
+            return []
+        results = []
+        for name in [kind] if kind else KINDS:
+            queryset = MODELS[name].objects.all()
+            for token in tokens:
+                queryset = queryset.filter(first_name__istartswith=token) | queryset.filter(
+                    last_name__istartswith=token
+                )
+            rows = queryset.order_by("last_name", "id").values_list(
+                "id", "first_name", "last_name", "school__name"
+            )[:limit]
+            results.extend(
+                {
+                    "id": pk,
+                    "kind": name,
+                    "name": f"{first_name} {last_name}",
+                    "school": school,
+                }
+                for pk, first_name, last_name, school in rows
+            )
+        return results[:limit]
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """SQLite FTS5 index over names, address and school name.
+
+    The virtual table is created by migration ``0003_person_search_index``
+    with prefix indexes, so typeahead prefixes are served from the index and
+    results are ranked with ``bm25()``.
+    """
+
+    table = FTS_TABLE
+    # bm25 column weights: first_name, last_name, address, school_name.
+    weights = (10.0, 10.0, 1.0, 2.0)
+
+    def build_match(self, query):
+        tokens = TOKEN_RE.findall(query)
+        return " ".join(f'"{token}"*' for token in tokens)
+
+    def search(self, query, kind=None, limit=10):
+        match = self.build_match(query)
+        if not match:
+            return []
+        weights = ", ".join(str(weight) for weight in self.weights)
+        sql = (
+            f"SELECT rowid, first_name, last_name, school_name FROM {self.table} "
+            f"WHERE {self.table} MATCH %s"
+        )
+        params = [match]
+        if kind:
+            sql += " AND rowid %% %s = %s"
+            params += [len(KINDS), KINDS[kind]]
+        sql += f" ORDER BY bm25({self.table}, {weights}) LIMIT %s"
+        params.append(limit)
+
+        names = {code: name for name, code in KINDS.items()}
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [
+                {
+                    "id": rowid // len(KINDS),
+                    "kind": names[rowid % len(KINDS)],
+                    "name": f"{first_name} {last_name}",
+                    "school": school,
+                }
+                for rowid, first_name, last_name, school in cursor.fetchall()
+            ]
+
+    def school_names(self, instances):
+        """Map school ids to names in one query for schools not already loaded."""
+        names = {}
+        missing = set()
+        for instance in instances:
+            if type(instance).school.is_cached(instance):
+                names[instance.school_id] = instance.school.name
+            else:
+                missing.add(instance.school_id)
+        missing -= names.keys()
+        if missing:
+            names.update(
+                School.objects.filter(pk__in=missing).values_list("id", "name")
+            )
+        return names
+
+    def index(self, instances):
+        schools = self.school_names(instances)
+        rows = []
+        for instance in instances:
+            rows.append(
+                (
+                    person_rowid(kind_for(instance), instance.pk),
+                    instance.first_name,
+                    instance.last_name,
+                    getattr(instance, "address", ""),
+                    schools[instance.school_id],
+                )
+            )
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {self.table} WHERE rowid = %s", [(row[0],) for row in rows]
+            )
+            cursor.executemany(
+                f"INSERT INTO {self.table} "
+                "(rowid, first_name, last_name, address, school_name) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                rows,
+            )
+
+    def remove(self, kind, pks):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {self.table} WHERE rowid = %s",
+                [(person_rowid(kind, pk),) for pk in pks],
+            )
+
+    def update_school(self, school):
+        with connection.cursor() as cursor:
+            for kind, model in MODELS.items():
+                cursor.execute(
+                    f"UPDATE {self.table} SET school_name = %s WHERE rowid IN "
+                    f"(SELECT id * %s + %s FROM {model._meta.db_table} "
+                    "WHERE school_id = %s)",
+                    [school.name, len(KINDS), KINDS[kind], school.pk],
+                )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            for kind, model in MODELS.items():
+                address = "p.address" if kind == "student" else "''"
+                cursor.execute(
+                    f"INSERT INTO {self.table} "
+                    "(rowid, first_name, last_name, address, school_name) "
+                    f"SELECT p.id * %s + %s, p.first_name, p.last_name, {address}, s.name "
+                    f"FROM {model._meta.db_table} p "
+                    f"JOIN {School._meta.db_table} s ON s.id = p.school_id",
+                    [len(KINDS), KINDS[kind]],
+                )
+
+
+def get_search_backend():
+    path = getattr(settings, "MYAPP_SEARCH_BACKEND", None)
+    if path is None:
+        path = (
+            "myapp.search.SQLiteFTSBackend"
+            if connection.vendor == "sqlite"
+            else "myapp.search.DatabaseSearchBackend"
+        )
+    return import_string(path)()
@@ -1,14 +1,101 @@
-from django.core.cache import cache
-from django.db.models.signals import post_save, post_delete
-from django.dispatch import receiver
-from .models import Teacher, Student
+from collections import Counter
 
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+from . import counters
+from .cache import bump_roster_version
+from .models import Class, School, Student, Teacher
+from .search import get_search_backend, kind_for
+from .trigram import log_change
 
-@receiver([post_save, post_delete], sender=Teacher)
-def clear_teacher_cache(sender, instance, **kwargs):
-    cache.delete("all_teachers")
+# Sent with ``instances=`` after ``bulk_create()``, which skips ``post_save``.
+bulk_created = Signal()
 
 
 @receiver([post_save, post_delete], sender=Student)
-def clear_student_cache(sender, instance, **kwargs):
-    cache.delete("all_students")
+@receiver([post_save, post_delete], sender=Teacher)
+@receiver([post_save, post_delete], sender=School)
+@receiver([post_save, post_delete], sender=Class)
+def invalidate_roster_cache(**kwargs):
+    # After commit, so a reader can not tag the old rows with the new version.
+    transaction.on_commit(bump_roster_version)
+
+
+@receiver(m2m_changed, sender=Class.favorite_subjects.through)
+def invalidate_roster_cache_on_m2m(action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        transaction.on_commit(bump_roster_version)
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Teacher)
+def index_person(sender, instance, **kwargs):
+    get_search_backend().index([instance])
+    pk = instance.pk
+    transaction.on_commit(lambda: log_change(sender, [pk]))
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Teacher)
+def unindex_person(sender, instance, **kwargs):
+    get_search_backend().remove(kind_for(instance), [instance.pk])
+    # delete() clears instance.pk before the commit.
+    pk = instance.pk
+    transaction.on_commit(lambda: log_change(sender, [pk]))
+
+
+@receiver(post_save, sender=School)
+def reindex_school(instance, created, **kwargs):
+    if not created:
+        get_search_backend().update_school(instance)
+
+
+@receiver(pre_save, sender=Student)
+@receiver(pre_save, sender=Teacher)
+@receiver(pre_save, sender=Class)
+def remember_counted_school(sender, instance, **kwargs):
+    # Rows loaded from the database know their school already (see
+    # LoadedSchoolMixin); only instances built by hand, or loaded with
+    # ``school`` deferred, cost a SELECT here.
+    if not instance._state.adding and not hasattr(instance, "_loaded_school_id"):
+        instance._loaded_school_id = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list("school_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Teacher)
+@receiver(post_save, sender=Class)
+def count_saved(sender, instance, created, **kwargs):
+    name = counters.counter_for(sender)
+    if created:
+        counters.adjust(name, instance.school_id, 1)
+    else:
+        old_school_id = getattr(instance, "_loaded_school_id", instance.school_id)
+        if old_school_id != instance.school_id:
+            counters.adjust(name, old_school_id, -1)
+            counters.adjust(name, instance.school_id, 1)
+    instance._loaded_school_id = instance.school_id
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Teacher)
+@receiver(post_delete, sender=Class)
+def count_deleted(sender, instance, **kwargs):
+    counters.adjust(counters.counter_for(sender), instance.school_id, -1)
+
+
+@receiver(bulk_created)
+def handle_bulk_created(sender, instances, **kwargs):
+    transaction.on_commit(bump_roster_version)
+    name = counters.counter_for(sender)
+    if name is not None:
+        for school_id, total in Counter(i.school_id for i in instances).items():
+            counters.adjust(name, school_id, total)
+    if sender in (Student, Teacher):
+        get_search_backend().index(instances)
+        pks = [instance.pk for instance in instances]
+        transaction.on_commit(lambda: log_change(sender, pks))
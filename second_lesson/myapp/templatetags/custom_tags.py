@@ -1,20 +1,23 @@
 from django import template
 from django.urls import reverse_lazy
-from myapp.models import Student, Teacher, Class
+from myapp.counters import get_count
 
 register = template.Library()
 
+def _school_id(school):
+    return getattr(school, "pk", school) or None
+
 @register.simple_tag
-def total_students():
-    return Student.objects.count()
+def total_students(school=None):
+    return get_count("students", _school_id(school))
 
 @register.simple_tag
-def total_teachers():
-    return Teacher.objects.count()
+def total_teachers(school=None):
+    return get_count("teachers", _school_id(school))
 
 @register.simple_tag
-def total_classes():
-    return Class.objects.count()
+def total_classes(school=None):
+    return get_count("classes", _school_id(school))
 
 @register.inclusion_tag("tags/profile_menu.html")
 def profile_menu(user, school_id=None, student_id=None, teacher_id=None):
@@ -39,6 +42,7 @@ def profile_menu(user, school_id=None, student_id=None, teacher_id=None):
                 else None
             ),
             "Create Student": reverse_lazy("myapp:create_student"),
+            "Import Roster": reverse_lazy("myapp:import_roster"),
             "Create Teacher": reverse_lazy("myapp:create_teacher"),
             "Create Class": reverse_lazy("myapp:create_class"),
             "Create School": reverse_lazy("myapp:create_school"),
@@ -0,0 +1,33 @@
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """TestCase mixin that fails when a page runs more queries than allowed.
+
+    Unlike ``assertNumQueries`` it sets an upper bound, so adding a cheaper
+    query plan does not break the test while an N+1 regression does.
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, num, using=DEFAULT_DB_ALIAS):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = len(context)
+        if executed > num:
+            queries = "\n".join(
+                f"{i}. {query['sql']}"
+                for i, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(
+                f"{executed} queries executed, at most {num} expected.\n"
+                f"Captured queries were:\n{queries}"
+            )
+
+    def assertPageQueries(self, url, num, **extra):
+        """GET ``url`` with the test client within a budget of ``num`` queries."""
+        with self.assertMaxQueries(num):
+            response = self.client.get(url, **extra)
+        return response
@@ -1,3 +1,686 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache, caches
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from second_lesson import profiling
+
+from . import counters, trigram
+from .cache import get_roster_version
+from .models import Class, CustomUser, RosterCounter, School, Student, Teacher
+from .search import get_search_backend
+from .signals import bulk_created
+from .testing import QueryBudgetMixin
+
+
+class RosterQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """The roster pages must not grow a query per row (N+1).
+
+    The budgets include the session and user lookups of the logged in client.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.schools = [
+            School.objects.create(name=f"School {n}", address="Main st.", school_number=n)
+            for n in (1, 2)
+        ]
+        cls.classes = [
+            Class.objects.create(school=school, class_number=f"{n}A", location="1st floor")
+            for n, school in enumerate(cls.schools * 3, start=1)
+        ]
+        for n in range(30):
+            school_class = cls.classes[n % len(cls.classes)]
+            Student.objects.create(
+                first_name=f"Student{n}",
+                last_name=f"Last{n:02d}",
+                address="Main st.",
+                school=school_class.school,
+                class_number=school_class,
+            )
+            Teacher.objects.create(
+                first_name=f"Teacher{n}",
+                last_name=f"Last{n:02d}",
+                email=f"teacher{n}@example.com",
+                school=cls.schools[n % 2],
+            )
+        cls.user = CustomUser.objects.create_user(
+            "teacher@example.com", "password", is_teacher=True
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_student_list(self):
+        response = self.assertPageQueries(reverse("myapp:student_list"), 4)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, reverse("myapp:edit_student", args=[1]))
+
+    def test_student_list_cached(self):
+        self.client.get(reverse("myapp:student_list"))
+        response = self.assertPageQueries(reverse("myapp:student_list"), 2)
+        self.assertEqual(response.status_code, 200)
+
+    def test_student_list_next_page(self):
+        response = self.client.get(reverse("myapp:student_list"))
+        cursor = response.context["page_obj"].next_cursor
+        response = self.assertPageQueries(
+            reverse("myapp:student_list") + f"?cursor={cursor}", 4
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_student_list_requires_teacher(self):
+        self.client.force_login(
+            CustomUser.objects.create_user("student@example.com", "password")
+        )
+        response = self.client.get(reverse("myapp:student_list"))
+        self.assertEqual(response.status_code, 403)
+
+    def test_teacher_list(self):
+        response = self.assertPageQueries(reverse("myapp:teacher_list"), 4)
+        self.assertEqual(response.status_code, 200)
+
+    def test_class_list(self):
+        response = self.assertPageQueries(reverse("myapp:class_list"), 3)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "6A")
+
+
+class SearchNameViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school = School.objects.create(name="North", address="a", school_number=1)
+        Student.objects.create(
+            first_name="Ada", last_name="Lovelace", address="a", school=cls.school
+        )
+
+    def test_anonymous_is_redirected_to_login(self):
+        response = self.client.get(reverse("myapp:search_name"), {"query": "ada"})
+        self.assertEqual(response.status_code, 302)
+
+    def test_requires_teacher(self):
+        self.client.force_login(
+            CustomUser.objects.create_user("student@example.com", "password")
+        )
+        response = self.client.get(reverse("myapp:search_name"), {"query": "ada"})
+        self.assertEqual(response.status_code, 403)
+
+    def test_teacher_gets_results(self):
+        self.client.force_login(
+            CustomUser.objects.create_user(
+                "teacher@example.com", "password", is_teacher=True
+            )
+        )
+        response = self.client.get(reverse("myapp:search_name"), {"query": "ada"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["name"], "Ada Lovelace")
+
+    def test_index_loads_schools_in_one_query(self):
+        for name in ("Grace", "Alan"):
+            Student.objects.create(
+                first_name=name, last_name="Test", address="a", school=self.school
+            )
+        students = list(Student.objects.all())
+        with self.assertNumQueries(3):
+            # One school lookup, then the delete and insert statements.
+            get_search_backend().index(students)
+
+
+class TrigramSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school = School.objects.create(name="North", address="a", school_number=1)
+        Student.objects.create(
+            first_name="Grace", last_name="Hopper", address="a", school=cls.school
+        )
+
+    def setUp(self):
+        cache.clear()
+        trigram._indexes.clear()
+
+    def create_student(self, first_name, last_name):
+        return Student.objects.create(
+            first_name=first_name, last_name=last_name, address="a", school=self.school
+        )
+
+    def fuzzy(self, query):
+        return list(
+            Student.objects.search_by_name(query, fuzzy=True).values_list(
+                "first_name", flat=True
+            )
+        )
+
+    def test_returns_a_ranked_queryset(self):
+        self.create_student("Grade", "Hopkins")
+        result = Student.objects.search_by_name("Grace Hoper", fuzzy=True)
+        self.assertIsInstance(result, QuerySet)
+        self.assertEqual(self.fuzzy("Grace Hoper"), ["Grace", "Grade"])
+        self.assertFalse(Student.objects.search_by_name("Zzz", fuzzy=True).exists())
+
+    def test_rolled_back_rows_are_not_indexed(self):
+        self.fuzzy("Grace")
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.create_student("Ghost", "Zzz")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(self.fuzzy("Ghost Zzz"), [])
+
+    def test_committed_rows_are_indexed(self):
+        self.fuzzy("Grace")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_student("Linus", "Torvalds")
+        self.assertEqual(self.fuzzy("Linus Torvalds"), ["Linus"])
+
+    def test_committed_deletes_are_dropped(self):
+        student = self.create_student("Linus", "Torvalds")
+        self.fuzzy("Grace")
+        with self.captureOnCommitCallbacks(execute=True):
+            student.delete()
+        self.assertEqual(self.fuzzy("Linus Torvalds"), [])
+
+    def test_change_from_another_process_is_caught_up(self):
+        self.fuzzy("Grace")
+        # Another worker commits a rename and logs it.
+        grace = Student.objects.get(first_name="Grace")
+        Student.objects.filter(pk=grace.pk).update(first_name="Marie")
+        trigram.log_change(Student, [grace.pk])
+        with self.assertNumQueries(2):
+            # The changed row, then the ranked result; no full scan.
+            self.assertEqual(self.fuzzy("Marie Hopper"), ["Marie"])
+
+    def test_gap_in_the_change_log_rebuilds(self):
+        self.fuzzy("Grace")
+        Student.objects.filter(first_name="Grace").update(first_name="Marie")
+        trigram.bump_shared_version(Student)
+        self.assertEqual(self.fuzzy("Marie Hopper"), ["Marie"])
+
+
+
+
+
+class ImportRosterCommandTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school = School.objects.create(name="North", address="a", school_number=7)
+        Teacher.objects.create(
+            first_name="Old", last_name="T", email="taken@example.com", school=cls.school
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def call(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command("import_roster", *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_rows_are_validated_by_the_whole_form(self):
+        path = self.write(
+            "teachers.csv",
+            "first_name,last_name,email,school\n"
+            "Ada,L,ada@example.com,North\n"
+            "Bad,E,not-an-email,#7\n"
+            f"Long,{'x' * 300},long@example.com,{self.school.pk}\n"
+            "Dup,T,taken@example.com,North\n"
+            "No,S,nos@example.com,Nowhere\n",
+        )
+        report = os.path.join(self.directory, "report.csv")
+        out, err = self.call("teachers", path, "--report", report)
+        self.assertIn("Imported 1 teachers, 4 rejected.", out)
+        self.assertEqual(
+            Teacher.objects.filter(email="ada@example.com").get().school, self.school
+        )
+        with open(report, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ["line", "field", "error"])
+        self.assertEqual(
+            [(line, field) for line, field, error in rows[1:]],
+            [("3", "email"), ("4", "last_name"), ("5", "email"), ("6", "school")],
+        )
+        self.assertIn("line 3: email:", err)
+
+    def test_form_clean_runs(self):
+        path = self.write(
+            "students.csv",
+            "first_name,last_name,address,school\nAda,L,a,North\n",
+        )
+        with mock.patch(
+            "myapp.forms.StudentForm.clean",
+            side_effect=ValidationError("Rejected by the form."),
+            create=True,
+        ):
+            out, err = self.call("students", path)
+        self.assertIn("Imported 0 students, 1 rejected.", out)
+        self.assertIn("__all__: Rejected by the form.", err)
+        self.assertFalse(Student.objects.exists())
+
+    def test_unwritable_report_is_a_command_error(self):
+        path = self.write("students.csv", "first_name,last_name,address,school\n")
+        report = os.path.join(self.directory, "missing", "report.csv")
+        with self.assertRaisesMessage(CommandError, "report.csv"):
+            self.call("students", path, "--report", report)
+
+    def test_missing_file_is_a_command_error(self):
+        with self.assertRaises(CommandError):
+            self.call("students", os.path.join(self.directory, "missing.csv"))
+
+
+class ExportRosterViewTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.north = School.objects.create(name="North", address="a", school_number=1)
+        cls.south = School.objects.create(name="South", address="a", school_number=2)
+        cls.class_1a = Class.objects.create(
+            school=cls.north, class_number="1A", location="a"
+        )
+        Student.objects.bulk_create(
+            Student(
+                first_name=f"Student{n}",
+                last_name="Last",
+                address="Main st., 1",
+                school=cls.north if n % 2 else cls.south,
+                class_number=cls.class_1a if n % 2 else None,
+            )
+            for n in range(2500)
+        )
+        cls.user = CustomUser.objects.create_user(
+            "teacher@example.com", "password", is_teacher=True
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def export(self, kind, **params):
+        response = self.client.get(reverse("myapp:export_roster", args=[kind]), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def body(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    def test_requires_a_teacher(self):
+        url = reverse("myapp:export_roster", args=["students"])
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(
+            CustomUser.objects.create_user("student@example.com", "password")
+        )
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_bad_requests(self):
+        url = reverse("myapp:export_roster", args=["students"])
+        self.assertEqual(
+            self.client.get(reverse("myapp:export_roster", args=["x"])).status_code,
+            404,
+        )
+        self.assertEqual(self.client.get(url, {"format": "xml"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"school": "one"}).status_code, 400)
+
+    def test_csv(self):
+        response = self.export("students", school=self.north.pk)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(
+            response["Content-Disposition"], 'attachment; filename="students.csv"'
+        )
+        rows = list(csv.reader(StringIO(self.body(response))))
+        self.assertEqual(
+            rows[0],
+            [
+                "id",
+                "first_name",
+                "last_name",
+                "address",
+                "school_id",
+                "school",
+                "class_id",
+                "class",
+            ],
+        )
+        self.assertEqual(len(rows), 1251)
+        self.assertEqual(
+            rows[1][1:],
+            ["Student1", "Last", "Main st., 1", str(self.north.pk), "North"]
+            + [str(self.class_1a.pk), "1A"],
+        )
+
+    def test_ndjson(self):
+        response = self.export("classes", format="ndjson")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = self.body(response).splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [
+                {
+                    "id": self.class_1a.pk,
+                    "class_number": "1A",
+                    "location": "a",
+                    "school_id": self.north.pk,
+                    "school": "North",
+                }
+            ],
+        )
+
+    def test_first_line_is_sent_alone(self):
+        chunks = list(self.export("students").streaming_content)
+        self.assertEqual(
+            chunks[0],
+            b"id,first_name,last_name,address,school_id,school,class_id,class\r\n",
+        )
+        self.assertGreater(len(chunks), 2)
+
+    def test_gzip(self):
+        response = self.export("teachers", gzip="1")
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        data = gzip.decompress(b"".join(response.streaming_content)).decode()
+        self.assertEqual(data, self.body(self.export("teachers")))
+
+    def test_large_roster_is_one_query(self):
+        # The session and user lookups, then the export itself.
+        with self.assertMaxQueries(3):
+            body = self.body(self.export("students", format="ndjson"))
+        self.assertEqual(len(body.splitlines()), 2500)
+
+
+class SaveClassViewTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        school = School.objects.create(name="North", address="a", school_number=1)
+        cls.classes = [
+            Class.objects.create(school=school, class_number=f"{n}A", location="a")
+            for n in range(30)
+        ]
+        cls.teacher = Teacher.objects.create(
+            first_name="Ada", last_name="L", email="ada@example.com", school=school
+        )
+        cls.user = CustomUser.objects.create_user(
+            "teacher@example.com", "password", is_teacher=True, teacher=cls.teacher
+        )
+
+    def saved(self):
+        return sorted(self.teacher.saved_classes.values_list("pk", flat=True))
+
+    def save_classes(self, class_ids):
+        return self.client.post(
+            reverse("myapp:save_classes"),
+            json.dumps({"class_ids": class_ids}),
+            content_type="application/json",
+        )
+
+    def test_requires_a_teacher(self):
+        urls = [
+            reverse("myapp:save_class", args=[self.classes[0].pk]),
+            reverse("myapp:save_classes"),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.post(url).status_code, 403)
+        self.client.force_login(
+            CustomUser.objects.create_user("student@example.com", "password")
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.post(url).status_code, 403)
+        self.assertEqual(self.saved(), [])
+
+    async def test_toggle(self):
+        await self.async_client.aforce_login(self.user)
+        url = reverse("myapp:save_class", args=[self.classes[0].pk])
+        response = await self.async_client.post(url)
+        self.assertEqual(response.json()["saved"], True)
+        self.assertEqual(
+            [pk async for pk in self.teacher.saved_classes.values_list("pk", flat=True)],
+            [self.classes[0].pk],
+        )
+        response = await self.async_client.post(url)
+        self.assertEqual(response.json()["saved"], False)
+        self.assertFalse(await self.teacher.saved_classes.aexists())
+
+    async def test_toggle_missing_class(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(reverse("myapp:save_class", args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_batch_toggle(self):
+        self.client.force_login(self.user)
+        first, second = self.classes[0].pk, self.classes[1].pk
+        self.teacher.saved_classes.add(first)
+        response = self.save_classes([first, second, 0])
+        self.assertEqual(response.json(), {"saved_ids": [second]})
+        self.assertEqual(self.saved(), [second])
+
+    def test_batch_rejects_bad_input(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.save_classes("nope").status_code, 400)
+        with mock.patch("myapp.views.SaveClassesView.max_ids", 2):
+            self.assertEqual(self.save_classes([1, 2, 3]).status_code, 400)
+
+    def test_batch_query_count_does_not_grow_with_ids(self):
+        self.client.force_login(self.user)
+        self.teacher.saved_classes.add(*self.classes[::2])
+        # Session and user, the savepoint pair, then select existing, select
+        # classes, delete, insert and the new saved ids.
+        with self.assertMaxQueries(9):
+            self.save_classes([c.pk for c in self.classes])
+        self.assertEqual(self.saved(), [c.pk for c in self.classes[1::2]])
+
+    def test_batch_is_one_transaction(self):
+        self.client.force_login(self.user)
+        first, second = self.classes[0].pk, self.classes[1].pk
+        self.teacher.saved_classes.add(first)
+        through = Teacher.saved_classes.through
+        with mock.patch.object(through.objects, "bulk_create", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.save_classes([first, second])
+        self.assertEqual(self.saved(), [first])
+
+
+class BulkCreatedSignalTests(TestCase):
+    def test_roster_version_moves_after_commit(self):
+        school = School.objects.create(name="North", address="a", school_number=1)
+        version = get_roster_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                students = Student.objects.bulk_create(
+                    [Student(first_name="A", last_name="B", address="a", school=school)]
+                )
+                bulk_created.send(sender=Student, instances=students)
+                self.assertEqual(get_roster_version(), version)
+        self.assertNotEqual(get_roster_version(), version)
+
+
+
+class RosterCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.north = School.objects.create(name="North", address="a", school_number=1)
+        cls.south = School.objects.create(name="South", address="a", school_number=2)
+        for n in range(3):
+            Student.objects.create(
+                first_name=f"S{n}", last_name="L", address="a", school=cls.north
+            )
+        RosterCounter.objects.all().delete()
+
+    def setUp(self):
+        cache.clear()
+
+    def create_student(self, school):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Student.objects.create(
+                first_name="New", last_name="L", address="a", school=school
+            )
+
+    def counts(self):
+        return [
+            counters.get_count("students"),
+            counters.get_count("students", self.north.pk),
+            counters.get_count("students", self.south.pk),
+        ]
+
+    def test_first_read_seeds_the_row_then_hits_the_cache(self):
+        self.assertEqual(counters.get_count("students", self.north.pk), 3)
+        row = RosterCounter.objects.get(name="students", school=self.north)
+        self.assertEqual(row.value, 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(counters.get_count("students", self.north.pk), 3)
+
+    def test_save_move_and_delete(self):
+        self.assertEqual(self.counts(), [3, 3, 0])
+        student = self.create_student(self.north)
+        self.assertEqual(self.counts(), [4, 4, 0])
+
+        student = Student.objects.get(pk=student.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            student.school = self.south
+            student.save()
+        self.assertEqual(self.counts(), [4, 3, 1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            student.delete()
+        self.assertEqual(self.counts(), [3, 3, 0])
+
+    def test_move_does_not_read_the_old_row_back(self):
+        student = Student.objects.first()
+        student.school = self.south
+        with CaptureQueriesContext(connection) as queries:
+            student.save()
+        lookups = [q["sql"] for q in queries if q["sql"].startswith("SELECT")]
+        self.assertFalse(
+            [sql for sql in lookups if 'FROM "myapp_student"' in sql], lookups
+        )
+
+    def test_late_read_is_not_served(self):
+        # A reader that missed the cache and read the row before the commit.
+        stale_key = counters.counter_key("students", self.north.pk)
+        stale = counters.get_count("students", self.north.pk)
+        cache.delete(stale_key)
+        self.create_student(self.north)
+        cache.add(stale_key, stale)
+        self.assertEqual(counters.get_count("students", self.north.pk), 4)
+
+    def test_reconcile_repairs_drift(self):
+        self.counts()
+        RosterCounter.objects.filter(name="students", school=None).update(value=99)
+        repaired = counters.reconcile()
+        # Missing global rows of the other counters are created as well.
+        self.assertIn(("students", None, 99, 3), repaired)
+        self.assertIn(("teachers", None, None, 0), repaired)
+        self.assertEqual(len(repaired), 3)
+        self.assertEqual(self.counts(), [3, 3, 0])
+        self.assertEqual(counters.reconcile(), [])
+
+    def test_reconcile_command(self):
+        self.counts()
+        RosterCounter.objects.filter(name="students", school=self.north).update(
+            value=1
+        )
+        out = StringIO()
+        call_command("reconcile_counters", stdout=out)
+        self.assertIn(f"students (school {self.north.pk}): 1 -> 3", out.getvalue())
+        self.assertIn("Counters reconciled", out.getvalue())
+
+    def test_template_tags(self):
+        template = Template(
+            "{% load custom_tags %}"
+            "{% total_students %}/{% total_students school %}/"
+            "{% total_teachers school %}/{% total_classes school.pk %}"
+        )
+        rendered = template.render(Context({"school": self.north}))
+        self.assertEqual(rendered, "3/3/0/0")
+
+
+@override_settings(REQUEST_PROFILING=True)
+class RequestProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.school = School.objects.create(name="North", address="a", school_number=1)
+        cls.teacher = CustomUser.objects.create_user(
+            "teacher@example.com", "password", is_teacher=True
+        )
+        cls.staff = CustomUser.objects.create_user(
+            "staff@example.com", "password", is_staff=True
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def profile(self, view):
+        request = RequestFactory().get("/")
+        return profiling.RequestProfilingMiddleware(view)(request)
+
+    def test_server_timing_header(self):
+        self.client.force_login(self.teacher)
+        response = self.client.get(reverse("myapp:student_list"))
+        timing = response["Server-Timing"]
+        self.assertIn("total;dur=", timing)
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertIn("render;dur=", timing)
+        self.assertNotIn("dup;", timing)
+
+    def test_disabled_by_default(self):
+        with self.settings(REQUEST_PROFILING=False):
+            self.client.force_login(self.teacher)
+            response = self.client.get(reverse("myapp:student_list"))
+        self.assertNotIn("Server-Timing", response)
+
+    def test_duplicate_queries_are_flagged(self):
+        def view(request):
+            for _ in range(3):
+                School.objects.get(pk=self.school.pk)
+            return HttpResponse()
+
+        with self.assertLogs(profiling.logger, "WARNING") as logs:
+            response = self.profile(view)
+        self.assertIn('dup;desc="2 duplicate queries"', response["Server-Timing"])
+        self.assertIn("ran 2 duplicate queries", logs.output[0])
+
+    def test_cache_gets_are_counted(self):
+        def view(request):
+            cache.get("missing")
+            cache.set("present", 1)
+            cache.get("present")
+            return HttpResponse()
+
+        response = self.profile(view)
+        self.assertIn('cache;desc="1 hits 1 misses"', response["Server-Timing"])
+        self.assertNotIn("get", vars(caches["default"]))
+
+    def test_stats_view_is_staff_only(self):
+        url = reverse("request_profiling")
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(self.teacher)
+        self.client.get(reverse("myapp:student_list"))
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(self.staff)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        stats = response.json()["current"]["myapp:student_list"]
+        self.assertGreaterEqual(stats["wall_ms"]["count"], 1)
+        self.assertGreater(stats["queries"]["max"], 0)
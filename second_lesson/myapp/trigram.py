@@ -0,0 +1,205 @@
+import heapq
+import threading
+import time
+from array import array
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+# The index lives in each process. Every committed change bumps a version
+# per model in the shared cache and logs the changed pks under the new
+# version, so another process catches up on its next search by re-reading
+# only those rows. It rebuilds from the table only when the log has a gap.
+_indexes = {}
+_registry_lock = threading.Lock()
+
+CHANGE_LOG_TIMEOUT = getattr(settings, "ROSTER_TRIGRAM_CHANGE_LOG_TIMEOUT", 60 * 60)
+MAX_CATCH_UP = 1000
+
+
+def trigrams(text):
+    """Return the set of trigrams of ``text``, padded per word like pg_trgm."""
+    grams = set()
+    for word in text.lower().split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """In-process inverted index from name trigrams to compact document ids.
+
+    Every posting list is an ``array`` of document ids, so a lookup only
+    touches the postings of the query's trigrams instead of every row.
+    Updates append a new document and mark the old one dead; dead documents
+    are dropped by ``compact()`` once they outnumber live ones.
+    """
+
+    def __init__(self, version=None):
+        self.version = version
+        self._postings = defaultdict(lambda: array("I"))
+        self._doc_pks = array("q")
+        self._doc_sizes = array("H")
+        self._doc_of = {}
+        self._dead = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._doc_of)
+
+    def _append(self, pk, grams):
+        doc = len(self._doc_pks)
+        self._doc_pks.append(pk)
+        self._doc_sizes.append(min(len(grams), 0xFFFF))
+        for gram in grams:
+            self._postings[gram].append(doc)
+        self._doc_of[pk] = doc
+
+    def _discard(self, pk):
+        doc = self._doc_of.pop(pk, None)
+        if doc is not None:
+            self._doc_pks[doc] = -1
+            self._dead += 1
+
+    def add(self, pk, text):
+        grams = trigrams(text)
+        with self._lock:
+            self._discard(pk)
+            if grams:
+                self._append(pk, grams)
+            if self._dead > len(self._doc_of):
+                self._compact()
+
+    def discard(self, pk):
+        with self._lock:
+            self._discard(pk)
+
+    def _compact(self):
+        live = {}
+        for gram, docs in self._postings.items():
+            for doc in docs:
+                pk = self._doc_pks[doc]
+                if pk >= 0:
+                    live.setdefault(pk, set()).add(gram)
+        self._postings = defaultdict(lambda: array("I"))
+        self._doc_pks = array("q")
+        self._doc_sizes = array("H")
+        self._doc_of = {}
+        self._dead = 0
+        for pk in sorted(live):
+            self._append(pk, live[pk])
+
+    def search(self, query, limit=10, threshold=0.3):
+        """Return ``[(pk, similarity), ...]`` ordered by descending similarity.
+
+        Similarity is shared trigrams over the union of both trigram sets.
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+        with self._lock:
+            shared = defaultdict(int)
+            for gram in grams:
+                for doc in self._postings.get(gram, ()):
+                    shared[doc] += 1
+            scored = []
+            for doc, common in shared.items():
+                pk = self._doc_pks[doc]
+                if pk < 0:
+                    continue
+                score = common / (len(grams) + self._doc_sizes[doc] - common)
+                if score >= threshold:
+                    scored.append((score, -pk, pk))
+        return [(pk, score) for score, _, pk in heapq.nlargest(limit, scored)]
+
+
+def person_name(first_name, last_name):
+    return f"{first_name} {last_name}"
+
+
+def version_key(model):
+    return f"roster:trigram:{model._meta.label_lower}:version"
+
+
+def get_shared_version(model):
+    version = cache.get(version_key(model))
+    if version is None:
+        cache.add(version_key(model), time.time_ns(), timeout=None)
+        version = cache.get(version_key(model))
+    return version
+
+
+def bump_shared_version(model):
+    """Return the new version, or None if the key was lost and re-seeded."""
+    try:
+        return cache.incr(version_key(model))
+    except ValueError:
+        cache.set(version_key(model), time.time_ns(), timeout=None)
+        return None
+
+
+def change_key(model, version):
+    return f"roster:trigram:{model._meta.label_lower}:changes:{version}"
+
+
+def log_change(model, pks):
+    """Bump the shared version and record the changed ``pks`` under it.
+
+    Call from ``transaction.on_commit`` for saved and deleted rows alike.
+    """
+    version = bump_shared_version(model)
+    if version is not None:
+        cache.set(change_key(model, version), list(pks), CHANGE_LOG_TIMEOUT)
+
+
+def build_index(model, version):
+    index = TrigramIndex(version)
+    rows = model._default_manager.values_list("pk", "first_name", "last_name")
+    for pk, first_name, last_name in rows.iterator(chunk_size=5000):
+        index.add(pk, person_name(first_name, last_name))
+    return index
+
+
+def catch_up(index, model, version):
+    """Apply the logged changes up to ``version``; False if any is missing.
+
+    Changed rows are read back from the table rather than taken from the
+    log, so two writers committing in another order than they bumped the
+    version still leave the index as the table is.
+    """
+    behind = version - index.version
+    if not 0 < behind <= MAX_CATCH_UP:
+        return False
+    keys = [change_key(model, v) for v in range(index.version + 1, version + 1)]
+    changes = cache.get_many(keys)
+    if len(changes) != len(keys):
+        return False
+    pks = set().union(*changes.values())
+    rows = model._default_manager.filter(pk__in=pks).values_list(
+        "pk", "first_name", "last_name"
+    )
+    for pk, first_name, last_name in rows:
+        index.add(pk, person_name(first_name, last_name))
+        pks.discard(pk)
+    for pk in pks:
+        index.discard(pk)
+    index.version = version
+    return True
+
+
+def get_trigram_index(model):
+    """Return the index for ``model``, brought up to the shared version."""
+    version = get_shared_version(model)
+    index = _indexes.get(model)
+    if index is None or index.version != version:
+        with _registry_lock:
+            index = _indexes.get(model)
+            if index is None:
+                # The version is read before the rows, so a write committed
+                # while building is caught up on the next search.
+                index = _indexes[model] = build_index(model, version)
+            elif index.version != version and not catch_up(index, model, version):
+                index = _indexes[model] = build_index(model, version)
+    return index
+
@@ -5,11 +5,14 @@ from .views import (
     RegisterView,
     LoginView,
     SaveClassView,
+    SaveClassesView,
     SchoolListView,
     StudentListView,
     TeacherListView,
     CreateStudentView,
     UpdateStudentView,
+    ImportRosterView,
+    ExportRosterView,
     CreateClassView,
     UpdateClassView,
     CreateSchoolView,
@@ -31,6 +34,8 @@ urlpatterns = [
     path("teachers/", TeacherListView.as_view(), name="teacher_list"),
     path("create_student/", CreateStudentView.as_view(), name="create_student"),
     path("edit_student/<int:pk>/", UpdateStudentView.as_view(), name="edit_student"),
+    path("import_roster/", ImportRosterView.as_view(), name="import_roster"),
+    path("export/<str:kind>/", ExportRosterView.as_view(), name="export_roster"),
     path("create_teacher/", CreateTeacherView.as_view(), name="create_teacher"),
     path("edit_teacher/<int:pk>/", UpdateTeacherView.as_view(), name="edit_teacher"),
     path("class_list/", ClassListView.as_view(), name="class_list"),
@@ -67,7 +72,9 @@ urlpatterns = [
         ),
         name="password_reset_complete",
     ),
+    path("search/", SearchNameView.as_view(), name="search_name"),
     path("teachers/search/", SearchNameView.as_view(), name="search_teacher_name"),
     path('save-class/<int:class_id>/', SaveClassView.as_view(), name='save_class'),
+    path('save-classes/', SaveClassesView.as_view(), name='save_classes'),
 ]
 
@@ -1,20 +1,34 @@
-from django.shortcuts import get_object_or_404, redirect, render
-from django.views.generic import View, ListView, CreateView, UpdateView
+import json
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import redirect, render
+from django.views.generic import View, ListView, CreateView, UpdateView, FormView
 from django.contrib.auth import login, authenticate
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.urls import reverse, reverse_lazy
 from django.core.exceptions import PermissionDenied, ObjectDoesNotExist
-from django.db.models import Q
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.contrib.auth.views import LogoutView
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.cache import cache
+from .exports import (
+    EXPORTS,
+    FILTERS,
+    buffered,
+    csv_lines,
+    export_rows,
+    gzipped,
+    ndjson_lines,
+)
+from .importers import IMPORTERS, ImportFormatError, iter_rows
+from .mixins import QueryProfileMixin, RosterCacheMixin
 from .models import Class, CustomUser, School, Student, Teacher
+from .search import KINDS, get_search_backend
 from .forms import (
     ClassForm,
     CustomUserChangeForm,
     ProfileForm,
+    RosterImportForm,
     SchoolForm,
     StudentForm,
     UserLoginForm,
@@ -97,11 +111,21 @@ class LoginView(View):
             )
         return render(request, "login.html", {"form": form})
 
-class StudentListView(LoginRequiredMixin, ListView):
+class StudentListView(LoginRequiredMixin, RosterCacheMixin, ListView):
     model = Student
     template_name = "index.html"
     context_object_name = "students"
     paginate_by = 10
+    roster_name = "students"
+    count_mode = "approximate"
+    roster_fields = (
+        "id",
+        "first_name",
+        "last_name",
+        "address",
+        "school__name",
+        "class_number__class_number",
+    )
 
     def get_queryset(self):
         if not self.request.user.is_teacher:
@@ -110,27 +134,19 @@ class StudentListView(LoginRequiredMixin, ListView):
             )
             raise PermissionDenied("You do not have permission to view this page.")
 
-        cached_students = cache.get('all_students')
-        if not cached_students:
-            cached_students = Student.objects.all()
-            cache.set('all_students', cached_students)
-        return cached_students
+        return self.filter_by_school(Student.objects.order_by("last_name", "id"))
 
 
-
-class TeacherListView(LoginRequiredMixin, ListView):
+class TeacherListView(LoginRequiredMixin, RosterCacheMixin, ListView):
     model = Teacher
     template_name = "teacher_list.html"
     context_object_name = "teachers"
     paginate_by = 10
+    roster_name = "teachers"
+    roster_fields = ("id", "first_name", "last_name", "email", "school__name")
 
     def get_queryset(self):
-        cached_teachers = cache.get('all_teachers')
-        if not cached_teachers:
-            cached_teachers = Teacher.objects.order_by("last_name")
-            cache.set('all_teachers', cached_teachers)
-        return cached_teachers
-
+        return self.filter_by_school(Teacher.objects.order_by("last_name", "id"))
 
 
 class CreateStudentView(LoginRequiredMixin, CreateView):
@@ -179,6 +195,78 @@ class UpdateStudentView(LoginRequiredMixin, UpdateView):
         return context
 
 
+class ImportRosterView(LoginRequiredMixin, FormView):
+    form_class = RosterImportForm
+    template_name = "import_roster.html"
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated and not request.user.is_teacher:
+            raise PermissionDenied("You do not have permission to view this page.")
+        return super().dispatch(request, *args, **kwargs)
+
+    def form_valid(self, form):
+        upload = form.cleaned_data["file"]
+        importer = IMPORTERS[form.cleaned_data["kind"]](
+            batch_size=form.cleaned_data["batch_size"]
+        )
+        try:
+            with upload.open("rb") as fileobj:
+                result = importer.run(iter_rows(fileobj, upload.name))
+        except (ImportFormatError, UnicodeDecodeError) as e:
+            form.add_error("file", str(e))
+            return self.form_invalid(form)
+
+        messages.success(
+            self.request,
+            f"Imported {result.created} rows, {result.failed} rejected.",
+        )
+        return self.render_to_response(
+            self.get_context_data(form=self.form_class(), result=result)
+        )
+
+    def form_invalid(self, form):
+        messages.error(
+            self.request, "There was an error with the form. Please check the inputs."
+        )
+        return self.render_to_response(self.get_context_data(form=form))
+
+
+class ExportRosterView(LoginRequiredMixin, View):
+    formats = {
+        "csv": (csv_lines, "text/csv"),
+        "ndjson": (ndjson_lines, "application/x-ndjson"),
+    }
+
+    def get(self, request, kind):
+        if not request.user.is_teacher:
+            raise PermissionDenied("You do not have permission to view this page.")
+        if kind not in EXPORTS:
+            raise Http404("Unknown export.")
+        export_format = request.GET.get("format", "csv")
+        if export_format not in self.formats:
+            return JsonResponse({"error": "Unknown format."}, status=400)
+
+        filters = {}
+        for name in FILTERS[kind]:
+            value = request.GET.get(name)
+            if value is not None:
+                if not value.isdigit():
+                    return JsonResponse({"error": f"Invalid {name}."}, status=400)
+                filters[name] = int(value)
+
+        lines, content_type = self.formats[export_format]
+        chunks = buffered(lines(*export_rows(kind, filters)))
+        filename = f"{kind}.{export_format}"
+        if request.GET.get("gzip") in ("1", "true"):
+            chunks = gzipped(chunks)
+            content_type = "application/gzip"
+            filename += ".gz"
+
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
 class CreateClassView(LoginRequiredMixin, CreateView):
     form_class = ClassForm
     template_name = "create_class.html"
@@ -296,25 +384,56 @@ class UpdateTeacherView(LoginRequiredMixin, UpdateView):
         return Teacher.objects.get(pk=self.kwargs["pk"])
 
 
-class ClassListView(LoginRequiredMixin, ListView):
+class ClassListView(LoginRequiredMixin, QueryProfileMixin, ListView):
     model = Class
     template_name = "class_list.html"
     context_object_name = "classes"
+    query_profile = {
+        "select_related": ("school",),
+        "only": ("id", "class_number", "school__name"),
+    }
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        teacher_id = getattr(self.request.user, "teacher_id", None)
+        context["saved_class_ids"] = (
+            set(
+                Teacher.saved_classes.through.objects.filter(
+                    teacher_id=teacher_id
+                ).values_list("class_id", flat=True)
+            )
+            if teacher_id
+            else set()
+        )
+        return context
 
 
-class SchoolListView(LoginRequiredMixin, ListView):
+class SchoolListView(LoginRequiredMixin, QueryProfileMixin, ListView):
     model = School
     template_name = "school_list.html"
     context_object_name = "schools"
+    query_profile = {"only": ("id", "name", "address", "school_number")}
+
 
+class SearchNameView(LoginRequiredMixin, View):
+    max_limit = 50
 
-class SearchNameView(View):
     def get(self, request):
-        query = request.GET.get("query", "")
+        if not request.user.is_teacher:
+            raise PermissionDenied("You do not have permission to view this page.")
+        query = request.GET.get("query", "").strip()
+        kind = request.GET.get("kind")
+        if kind not in KINDS:
+            kind = None
+        try:
+            limit = min(int(request.GET.get("limit", 10)), self.max_limit)
+        except ValueError:
+            limit = 10
+
         results = []
         if query:
-            results = Student.objects.filter(Q(name__icontains=query)).values("name")
-        return JsonResponse(list(results), safe=False)
+            results = get_search_backend().search(query, kind=kind, limit=limit)
+        return JsonResponse(results, safe=False)
 
 
 class EditUserView(LoginRequiredMixin, UpdateView):
@@ -377,21 +496,90 @@ class EditProfileView(LoginRequiredMixin, UpdateView):
 
 
 class SaveClassView(View):
-    def post(self, request, *args, **kwargs):
-        if not request.user.is_teacher:
+    """Toggle one saved class for the current teacher.
+
+    Works on the ``saved_classes`` through table directly: unsaving is a
+    single DELETE and saving adds an EXISTS and one INSERT, instead of
+    loading every saved class to test membership.
+    """
+
+    async def get_teacher_id(self, request):
+        user = await request.auser()
+        if not user.is_authenticated or not user.is_teacher:
+            return None
+        return user.teacher_id
+
+    async def post(self, request, *args, **kwargs):
+        teacher_id = await self.get_teacher_id(request)
+        if teacher_id is None:
             return JsonResponse({"error": "Permission denied."}, status=403)
 
         class_id = kwargs.get("class_id")
-        class_obj = get_object_or_404(Class, id=class_id)
+        saved = Teacher.saved_classes.through.objects.filter(
+            teacher_id=teacher_id, class_id=class_id
+        )
+        deleted, _ = await saved.adelete()
+        if deleted:
+            return JsonResponse({"message": "Class unsaved.", "saved": False}, status=200)
+
+        # Checked up front: the foreign key is only enforced at commit on
+        # backends that defer constraints, so a failed insert can't tell us.
+        if not await Class.objects.filter(pk=class_id).aexists():
+            raise Http404("No Class matches the given query.")
+        try:
+            await Teacher.saved_classes.through.objects.acreate(
+                teacher_id=teacher_id, class_id=class_id
+            )
+        except IntegrityError:
+            pass  # A concurrent save of the same class won the race.
+        return JsonResponse({"message": "Class saved.", "saved": True}, status=200)
 
-        teacher = request.user.teacher
 
-        if class_obj in teacher.saved_classes.all():
-            teacher.saved_classes.remove(class_obj)
-            return JsonResponse({"message": "Class unsaved."}, status=200)
-        else:
-            teacher.saved_classes.add(class_obj)
-            return JsonResponse({"message": "Class saved."}, status=200)
+class SaveClassesView(SaveClassView):
+    """Toggle many saved classes at once and return the new saved id set.
+
+    Expects a JSON body like ``{"class_ids": [1, 2, 3]}``.
+    """
+
+    max_ids = 500
+
+    async def post(self, request, *args, **kwargs):
+        teacher_id = await self.get_teacher_id(request)
+        if teacher_id is None:
+            return JsonResponse({"error": "Permission denied."}, status=403)
+        try:
+            class_ids = {int(pk) for pk in json.loads(request.body)["class_ids"]}
+        except (ValueError, KeyError, TypeError):
+            return JsonResponse({"error": "Expected a list of class_ids."}, status=400)
+        if len(class_ids) > self.max_ids:
+            return JsonResponse({"error": "Too many class_ids."}, status=400)
+
+        saved_ids = await sync_to_async(self.toggle)(teacher_id, class_ids)
+        return JsonResponse({"saved_ids": saved_ids}, status=200)
+
+    @transaction.atomic
+    def toggle(self, teacher_id, class_ids):
+        """Flip every id in one transaction and return the sorted saved ids.
+
+        Runs in a worker thread, as ``transaction.atomic`` does not work in
+        async code.
+        """
+        through = Teacher.saved_classes.through
+        saved = through.objects.filter(teacher_id=teacher_id)
+        existing = set(
+            saved.filter(class_id__in=class_ids).values_list("class_id", flat=True)
+        )
+        to_save = [
+            through(teacher_id=teacher_id, class_id=pk)
+            for pk in Class.objects.filter(pk__in=class_ids - existing).values_list(
+                "id", flat=True
+            )
+        ]
+        if existing:
+            saved.filter(class_id__in=existing).delete()
+        if to_save:
+            through.objects.bulk_create(to_save, ignore_conflicts=True)
+        return sorted(saved.values_list("class_id", flat=True))
 
 
 class LogoutUserView(LogoutView):
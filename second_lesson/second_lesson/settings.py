@@ -30,6 +30,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "second_lesson.profiling.RequestProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -39,6 +40,10 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Per view timing, query and cache statistics, see second_lesson/profiling.py.
+REQUEST_PROFILING = False
+REQUEST_PROFILING_WINDOW = 300
+
 ROOT_URLCONF = "second_lesson.urls"
 
 TEMPLATES = [
@@ -19,7 +19,10 @@ from django.contrib import admin
 from django.urls import path, include
 from django.contrib.auth import views as auth_views
 
+from . import profiling
+
 urlpatterns = [
+    path('admin/profiling/', profiling.stats_view, name='request_profiling'),
     path('admin/', admin.site.urls),
     path('blog/', include('blog.urls', namespace='blog')),
     path('app/', include('app.urls', namespace='app')),
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Post, Category
+from .models import ArchiveMonth, Post, Category
 
 admin.site.register(Post)
 admin.site.register(Category)
+admin.site.register(ArchiveMonth)
@@ -0,0 +1,106 @@
+import calendar
+from datetime import date, datetime
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from .models import ArchiveMonth, Post
+
+
+def month_of(publish):
+    """Return the ``(year, month)`` a publish time is archived under."""
+    local = timezone.localtime(publish) if timezone.is_aware(publish) else publish
+    return local.year, local.month
+
+
+def month_range(year, month):
+    """Return the ``[start, end)`` publish times of one archive month."""
+    start = datetime(year, month, 1)
+    end = datetime(year + month // 12, month % 12 + 1, 1)
+    return timezone.make_aware(start), timezone.make_aware(end)
+
+
+def adjust(year, month, category_id, delta):
+    """Add ``delta`` to the post count of one month and category.
+
+    Runs in the caller's transaction, so the summary always commits or rolls
+    back together with the post that changed it.
+    """
+    rows = ArchiveMonth.objects.filter(year=year, month=month, category_id=category_id)
+    if rows.update(post_count=F('post_count') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            ArchiveMonth.objects.create(
+                year=year, month=month, category_id=category_id, post_count=delta
+            )
+    except IntegrityError:
+        # Another writer created the row first.
+        rows.update(post_count=F('post_count') + delta)
+
+
+def post_moved(old, new):
+    """Move one post between ``(publish, category_id)`` states, either may be None."""
+    old = old and (*month_of(old[0]), old[1])
+    new = new and (*month_of(new[0]), new[1])
+    if old == new:
+        return
+    if old:
+        adjust(*old, -1)
+    if new:
+        adjust(*new, 1)
+
+
+def counts(queryset=None):
+    """Post counts per month and category, straight from the posts table."""
+    if queryset is None:
+        queryset = Post.objects.all()
+    tzinfo = timezone.get_current_timezone()
+    return (
+        queryset.order_by()
+        .annotate(
+            year=ExtractYear('publish', tzinfo=tzinfo),
+            month=ExtractMonth('publish', tzinfo=tzinfo),
+        )
+        .values_list('year', 'month', 'category_id')
+        .annotate(post_count=Count('id'))
+    )
+
+
+@transaction.atomic
+def rebuild():
+    """Recompute the whole summary from the posts table; returns the row count."""
+    rows = [
+        ArchiveMonth(year=year, month=month, category_id=category_id, post_count=post_count)
+        for year, month, category_id, post_count in counts()
+    ]
+    ArchiveMonth.objects.all().delete()
+    ArchiveMonth.objects.bulk_create(rows)
+    return len(rows)
+
+
+def archive_months(year=None):
+    """Return the archive as a list of months, newest first.
+
+    Each month is a dict with ``date``, ``total`` and ``categories``, a list
+    of ``(category, count)`` pairs; ``category`` is None for posts without one.
+    """
+    rows = ArchiveMonth.objects.filter(post_count__gt=0).select_related('category')
+    if year is not None:
+        rows = rows.filter(year=year)
+    months = {}
+    for row in rows.order_by('-year', '-month', 'category__name'):
+        entry = months.setdefault((row.year, row.month), {
+            'date': date(row.year, row.month, 1),
+            'total': 0,
+            'categories': [],
+        })
+        entry['total'] += row.post_count
+        entry['categories'].append((row.category, row.post_count))
+    return list(months.values())
+
+
+def month_name(year, month):
+    return f'{calendar.month_name[month]} {year}'
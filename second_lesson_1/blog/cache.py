@@ -0,0 +1,149 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from .models import Post
+
+PAGE_TIMEOUT = getattr(settings, 'BLOG_PAGE_CACHE_TIMEOUT', 60 * 60)
+
+
+# Left in place of a deleted post's state for a while, so a reader that
+# loaded the row before the delete committed can not cache it again.
+DELETED = 'deleted'
+
+
+def post_state_key(post_id):
+    return f'blog:post:{post_id}:state'
+
+
+def category_version_key(category_id):
+    return f'blog:category:{category_id}:version'
+
+
+def category_changed_key(category_id):
+    return f'blog:category:{category_id}:changed'
+
+
+def get_post_state(post_id):
+    """Return ``(updated, category_id)`` of a post, or ``None`` if it is gone.
+
+    The state is written through by the signals on every save, so only the
+    first read after an eviction goes to the database. That read is only
+    added: a save or delete that committed after it has already written
+    the newer state.
+    """
+    key = post_state_key(post_id)
+    state = cache.get(key)
+    if state is None:
+        state = (
+            Post.objects.filter(id=post_id)
+            .values_list('updated', 'category_id')
+            .first()
+        )
+        if state is None:
+            return None
+        cache.add(key, state, timeout=None)
+        state = cache.get(key, state)
+    return None if state == DELETED else state
+
+
+def set_post_state(post):
+    cache.set(post_state_key(post.id), (post.updated, post.category_id), timeout=None)
+
+
+def forget_post_state(post_id):
+    cache.set(post_state_key(post_id), DELETED, PAGE_TIMEOUT)
+
+
+def get_category_version(category_id):
+    """Return the version of a category's pages, a counter bumped on changes.
+
+    A missing version is seeded with the current time in nanoseconds, which
+    is past any counter handed out before it was evicted.
+    """
+    if category_id is None:
+        return 0
+    key = category_version_key(category_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_category_changed(category_id):
+    """Return when a category last changed.
+
+    A missing time is seeded with now, which can only make ``Last-Modified``
+    later than the real change, never earlier.
+    """
+    key = category_changed_key(category_id)
+    changed = cache.get(key)
+    if changed is None:
+        cache.add(key, datetime.now(tz=timezone.utc), timeout=None)
+        changed = cache.get(key)
+    return changed
+
+
+def bump_category_version(category_id):
+    # The time first, so a reader that sees the new version sees it too.
+    now = datetime.now(tz=timezone.utc)
+    cache.set(category_changed_key(category_id), now, timeout=None)
+    key = category_version_key(category_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Evicted. If a reader seeded it in the meantime, it may have
+        # rendered the old posts under that seed, so move past it too.
+        if cache.add(key, time.time_ns(), timeout=None):
+            return cache.get(key)
+        return cache.incr(key)
+
+
+FEED_STAMP_KEY = 'blog:feed:updated'
+
+
+def get_feed_stamp():
+    """Return the newest ``Post.updated``, or a post deletion if that came later."""
+    stamp = cache.get(FEED_STAMP_KEY)
+    if stamp is None:
+        stamp = Post.objects.aggregate(newest=Max('updated'))['newest']
+        stamp = stamp or datetime.fromtimestamp(0, tz=timezone.utc)
+        cache.add(FEED_STAMP_KEY, stamp, timeout=None)
+        stamp = cache.get(FEED_STAMP_KEY, stamp)
+    return stamp
+
+
+def touch_feed(when):
+    # Never move backwards, so an older save can not resurrect an old feed.
+    stamp = cache.get(FEED_STAMP_KEY)
+    if stamp is None or when > stamp:
+        cache.set(FEED_STAMP_KEY, when, timeout=None)
+
+
+def cached_page(request, key, last_modified, render, content_type=None):
+    """Serve the page cached under ``key``, or a 304 if the client has it.
+
+    ``key`` must change whenever the page does; ``render`` builds the HTML
+    on a miss. Pages are rendered without the request, so nothing user
+    specific can end up in the shared cache.
+    """
+    etag = quote_etag(hashlib.md5(key.encode()).hexdigest())
+    timestamp = int(last_modified.timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        content = cache.get(key)
+        if content is None:
+            content = render()
+            cache.set(key, content, PAGE_TIMEOUT)
+        response = HttpResponse(content, content_type=content_type)
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(timestamp)
+    return response
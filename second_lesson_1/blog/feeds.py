@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+
+from . import cache
+from .listing import LIST_FIELDS, ORDERING, listing_queryset, make_excerpt
+
+FEED_ITEMS = getattr(settings, 'BLOG_FEED_ITEMS', 20)
+
+
+class LatestPostsFeed(Feed):
+    """RSS feed of the newest posts.
+
+    The generated XML is cached under the newest ``Post.updated``, which the
+    signals keep in the cache, so a feed reader polling an unchanged blog
+    gets a 304 or the cached bytes without a query.
+    """
+
+    title = 'Second Lesson'
+    description = 'Latest posts'
+
+    def __call__(self, request, *args, **kwargs):
+        stamp = cache.get_feed_stamp()
+        key = f'blog:feed:{type(self).__name__}:{request.get_host()}:{stamp.timestamp()}'
+        generate = super().__call__
+        return cache.cached_page(
+            request, key, stamp, lambda: generate(request, *args, **kwargs).content,
+            content_type=self.feed_type.content_type,
+        )
+
+    def link(self):
+        return reverse('blog:posts')
+
+    def items(self):
+        queryset = listing_queryset(fields=LIST_FIELDS + ('updated',))
+        return queryset.order_by(*ORDERING)[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return make_excerpt(item.excerpt)
+
+    def item_link(self, item):
+        return reverse('blog:post_details', args=[item.id])
+
+    def item_pubdate(self, item):
+        return item.publish
+
+    def item_updateddate(self, item):
+        return item.updated
+
+    def item_categories(self, item):
+        return [item.category.name] if item.category else []
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
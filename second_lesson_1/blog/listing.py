@@ -0,0 +1,135 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.functions import Substr
+from django.utils.dateparse import parse_datetime
+
+from .models import Post
+
+PER_PAGE = getattr(settings, 'BLOG_POSTS_PER_PAGE', 10)
+EXCERPT_LENGTH = getattr(settings, 'BLOG_EXCERPT_LENGTH', 200)
+
+# Post.Meta.ordering plus the primary key, so every position is unique.
+ORDERING = ('-publish', '-id')
+LIST_FIELDS = ('title', 'publish', 'category__name')
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(post, reverse=False):
+    """Pack the position of ``post`` into an opaque, URL safe token."""
+    payload = json.dumps(
+        {'p': [post.publish.isoformat(), post.id], 'r': reverse},
+        separators=(',', ':'),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return ``(publish, id, reverse)`` for a token made by ``encode_cursor``."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        publish, post_id = payload['p']
+        publish = parse_datetime(publish)
+        if publish is None or not isinstance(post_id, int):
+            raise ValueError(token)
+        return publish, post_id, bool(payload['r'])
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor('Invalid cursor.') from e
+
+
+def make_excerpt(text, length=EXCERPT_LENGTH):
+    """Cut ``text`` at the last word boundary before ``length`` characters."""
+    if len(text) <= length:
+        return text
+    cut = text[:length]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip(' ,.;:') + '…'
+
+
+def listing_queryset(queryset=None, fields=LIST_FIELDS):
+    """Posts with their category, without ``body`` but with an ``excerpt``.
+
+    Only the first ``EXCERPT_LENGTH + 1`` characters of the body are read,
+    the extra one tells ``make_excerpt`` whether the text was cut.
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+    return (
+        queryset.select_related('category')
+        .only(*fields)
+        .annotate(excerpt=Substr('body', 1, EXCERPT_LENGTH + 1))
+    )
+
+
+class PostPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def paginate_posts(queryset=None, cursor=None, per_page=PER_PAGE):
+    """Return one ``PostPage`` in ``(-publish, -id)`` order.
+
+    Pages are found by seeking past the cursor's position instead of an
+    OFFSET, so with the ``(publish, id)`` and ``(category, publish, id)``
+    indexes every page costs one short index range scan, however deep.
+    """
+    queryset = listing_queryset(queryset)
+    reverse = False
+    if cursor:
+        publish, post_id, reverse = decode_cursor(cursor)
+        # The plain range bound lets SQLite seek into the index; the OR
+        # alone would make it walk the index from the first post.
+        if reverse:
+            queryset = queryset.filter(
+                Q(publish__gt=publish) | Q(publish=publish, id__gt=post_id),
+                publish__gte=publish,
+            )
+        else:
+            queryset = queryset.filter(
+                Q(publish__lt=publish) | Q(publish=publish, id__lt=post_id),
+                publish__lte=publish,
+            )
+    queryset = queryset.order_by(*(
+        field.lstrip('-') if reverse else field for field in ORDERING
+    ))
+
+    posts = list(queryset[:per_page + 1])
+    has_more = len(posts) > per_page
+    posts = posts[:per_page]
+    if reverse:
+        posts.reverse()
+    for post in posts:
+        post.excerpt = make_excerpt(post.excerpt)
+
+    next_cursor = previous_cursor = None
+    if posts:
+        if has_more or reverse:
+            next_cursor = encode_cursor(posts[-1])
+        if cursor and (has_more or not reverse):
+            previous_cursor = encode_cursor(posts[0], reverse=True)
+    return PostPage(posts, next_cursor, previous_cursor)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog import archive
+
+
+class Command(BaseCommand):
+    help = 'Recompute the monthly post counts of the blog archive from the posts table.'
+
+    def handle(self, *args, **options):
+        rows = archive.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the archive: {rows} month/category rows.'))
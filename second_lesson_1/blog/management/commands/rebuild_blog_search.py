@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the blog post search index from the posts table.'
+
+    def handle(self, *args, **options):
+        posts = get_search_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {posts} posts.'))
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_category_post_category'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='category',
+            options={'verbose_name_plural': 'Categories'},
+        ),
+        migrations.AlterModelOptions(
+            name='post',
+            options={'ordering': ['-publish', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['publish', 'id'], name='blog_post_publish_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['category', 'publish', 'id'], name='blog_post_category_publish_idx'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+
+
+def fill_archive(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    ArchiveMonth = apps.get_model('blog', 'ArchiveMonth')
+    # The same months as blog.archive.counts(), in the current time zone.
+    tzinfo = timezone.get_current_timezone()
+    counts = (
+        Post.objects.order_by()
+        .annotate(
+            year=ExtractYear('publish', tzinfo=tzinfo),
+            month=ExtractMonth('publish', tzinfo=tzinfo),
+        )
+        .values_list('year', 'month', 'category_id')
+        .annotate(post_count=Count('id'))
+    )
+    ArchiveMonth.objects.bulk_create([
+        ArchiveMonth(year=year, month=month, category_id=category_id, post_count=post_count)
+        for year, month, category_id, post_count in counts
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_post_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('post_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-year', '-month'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['updated'], name='blog_post_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivemonth',
+            name='category',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archive_months', to='blog.category'),
+        ),
+        migrations.AddConstraint(
+            model_name='archivemonth',
+            constraint=models.UniqueConstraint(fields=('year', 'month', 'category'), name='blog_archive_month_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='archivemonth',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('year', 'month'), name='blog_archive_month_uncategorized_unique'),
+        ),
+        migrations.RunPython(fill_archive, migrations.RunPython.noop),
+    ]
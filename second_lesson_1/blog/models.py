@@ -14,7 +14,12 @@ class Post(models.Model):
         return self.title
 
     class Meta:
-        ordering = ['-publish']
+        ordering = ['-publish', '-id']
+        indexes = [
+            models.Index(fields=['publish', 'id'], name='blog_post_publish_idx'),
+            models.Index(fields=['category', 'publish', 'id'], name='blog_post_category_publish_idx'),
+            models.Index(fields=['updated'], name='blog_post_updated_idx'),
+        ]
 
 
 class Category(models.Model):
@@ -28,3 +33,29 @@ class Category(models.Model):
         verbose_name_plural = 'Categories'
 
 
+
+
+class ArchiveMonth(models.Model):
+    """Number of posts published per month and category.
+
+    Kept up to date by the Post signals, so the archive never has to group
+    the posts table. ``manage.py rebuild_blog_archive`` recomputes it.
+    """
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    category = models.ForeignKey('Category', on_delete=models.CASCADE, related_name='archive_months', null=True)
+    post_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.year}-{self.month:02d} {self.category or "Without category"}: {self.post_count}'
+
+    class Meta:
+        ordering = ['-year', '-month']
+        constraints = [
+            models.UniqueConstraint(fields=['year', 'month', 'category'], name='blog_archive_month_unique'),
+            models.UniqueConstraint(
+                fields=['year', 'month'],
+                condition=models.Q(category__isnull=True),
+                name='blog_archive_month_uncategorized_unique',
+            ),
+        ]
@@ -0,0 +1,207 @@
+import re
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+
+from .listing import make_excerpt
+from .models import Post
+
+FTS_TABLE = 'blog_post_fts'
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# FTS5 wraps matches in these; they can not occur in escaped HTML, so the
+# text is escaped first and the markers become <mark> tags afterwards.
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+SearchHit = namedtuple('SearchHit', ['post', 'title', 'snippet'])
+
+
+def mark_matches(text):
+    """Escape ``text`` and turn the FTS5 match markers into ``<mark>`` tags."""
+    html = escape(text).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+    return mark_safe(html)
+
+
+def load_posts(ids):
+    """Return the listed posts for ``ids`` in the same order, skipping missing ones."""
+    posts = (
+        Post.objects.select_related('category')
+        .only('title', 'publish', 'category__name')
+        .in_bulk(ids)
+    )
+    return [posts[pk] for pk in ids if pk in posts]
+
+
+class BaseSearchBackend:
+    """Interface of the post title/body search index."""
+
+    def count(self, query):
+        """Return the number of posts matching ``query``."""
+        raise NotImplementedError
+
+    def search(self, query, offset=0, limit=10):
+        """Return up to ``limit`` ``SearchHit`` tuples, best match first."""
+        raise NotImplementedError
+
+    def index(self, posts):
+        pass
+
+    def remove(self, pks):
+        pass
+
+    def rebuild(self):
+        """Rebuild the index from the posts table; returns the number of posts."""
+        return Post.objects.count()
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """Portable fallback: ``icontains`` per word, newest first.
+
+    This scans the posts table, so it is only meant for databases without
+    a full text index.
+    """
+
+    def filter(self, query):
+        tokens = TOKEN_RE.findall(query)
+        if not tokens:
+            return Post.objects.none()
+        queryset = Post.objects.all()
+        for token in tokens:
+            queryset = queryset.filter(Q(title__icontains=token) | Q(body__icontains=token))
+        return queryset
+
+    def count(self, query):
+        return self.filter(query).count()
+
+    def search(self, query, offset=0, limit=10):
+        posts = self.filter(query).select_related('category').order_by('-publish', '-id')
+        return [
+            SearchHit(post, escape(post.title), escape(make_excerpt(post.body)))
+            for post in posts[offset:offset + limit]
+        ]
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """SQLite FTS5 index over post titles and bodies.
+
+    The virtual table is created by migration ``0006_post_search_index`` with
+    prefix indexes. Matches are ranked with ``bm25()``, a title match
+    weighing more than a body match, and ``snippet()`` cuts the highlighted
+    passage out of the body, so no body is loaded for a results page.
+    """
+
+    table = FTS_TABLE
+    # bm25 column weights: title, body.
+    weights = (5.0, 1.0)
+    snippet_tokens = 24
+
+    def build_match(self, query):
+        return ' '.join(f'"{token}"*' for token in TOKEN_RE.findall(query))
+
+    def count(self, query):
+        match = self.build_match(query)
+        if not match:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT count(*) FROM {self.table} WHERE {self.table} MATCH %s', [match]
+            )
+            return cursor.fetchone()[0]
+
+    def search(self, query, offset=0, limit=10):
+        match = self.build_match(query)
+        if not match:
+            return []
+        weights = ', '.join(str(weight) for weight in self.weights)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, highlight({self.table}, 0, %s, %s), '
+                f'snippet({self.table}, 1, %s, %s, %s, %s) '
+                f'FROM {self.table} WHERE {self.table} MATCH %s '
+                f'ORDER BY bm25({self.table}, {weights}) LIMIT %s OFFSET %s',
+                [
+                    MARK_START, MARK_END,
+                    MARK_START, MARK_END, '…', self.snippet_tokens,
+                    match, limit, offset,
+                ],
+            )
+            rows = cursor.fetchall()
+        posts = {post.pk: post for post in load_posts([row[0] for row in rows])}
+        return [
+            SearchHit(posts[pk], mark_matches(title), mark_matches(snippet))
+            for pk, title, snippet in rows
+            if pk in posts
+        ]
+
+    def index(self, posts):
+        rows = [(post.pk, post.title, post.body) for post in posts]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s', [(row[0],) for row in rows]
+            )
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, title, body) VALUES (%s, %s, %s)', rows
+            )
+
+    def remove(self, pks):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s', [(pk,) for pk in pks]
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, title, body) '
+                f'SELECT id, title, body FROM {Post._meta.db_table}'
+            )
+            cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+        return Post.objects.count()
+
+
+class SearchResults:
+    """Lazy sequence of search hits for ``django.core.paginator.Paginator``.
+
+    The paginator asks for ``count()`` and one slice, so a results page costs
+    a count and one ranked query for that page only.
+    """
+
+    def __init__(self, query, backend=None):
+        self.query = query
+        self.backend = backend or get_search_backend()
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.backend.count(self.query)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop, _ = index.indices(self.count())
+        return self.backend.search(self.query, offset=start, limit=max(stop - start, 0))
+
+
+def get_search_backend():
+    path = getattr(settings, 'BLOG_SEARCH_BACKEND', None)
+    if path is None:
+        path = (
+            'blog.search.SQLiteFTSBackend'
+            if connection.vendor == 'sqlite'
+            else 'blog.search.DatabaseSearchBackend'
+        )
+    return import_string(path)()
@@ -0,0 +1,67 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import archive, cache
+from .search import get_search_backend
+from .models import Category, Post
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_state(sender, instance, **kwargs):
+    # A post moved to another category or month has to leave the old
+    # category's pages and archive month.
+    instance._old_state = None
+    if instance.pk is not None:
+        instance._old_state = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list('publish', 'category_id')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Post)
+def refresh_post_cache(sender, instance, **kwargs):
+    old_state = getattr(instance, '_old_state', None)
+    archive.post_moved(old_state, (instance.publish, instance.category_id))
+    categories = {instance.category_id, old_state and old_state[1]}
+
+    def refresh():
+        cache.set_post_state(instance)
+        cache.touch_feed(instance.updated)
+        for category_id in categories - {None}:
+            cache.bump_category_version(category_id)
+
+    transaction.on_commit(refresh)
+
+
+@receiver(post_delete, sender=Post)
+def forget_post_cache(sender, instance, **kwargs):
+    archive.post_moved((instance.publish, instance.category_id), None)
+    # The instance has no pk any more once the delete is done.
+    post_id = instance.pk
+
+    def forget():
+        cache.forget_post_state(post_id)
+        cache.touch_feed(timezone.now())
+        if instance.category_id is not None:
+            cache.bump_category_version(instance.category_id)
+
+    transaction.on_commit(forget)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    get_search_backend().index([instance])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    get_search_backend().remove([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Category)
+def refresh_category_cache(sender, instance, **kwargs):
+    category_id = instance.pk
+    transaction.on_commit(lambda: cache.bump_category_version(category_id))
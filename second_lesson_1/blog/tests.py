@@ -1,3 +1,430 @@
-from django.test import TestCase
+import json
+import tempfile
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from importlib import import_module
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps as django_apps
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from . import archive
+from . import cache as blog_cache
+from .catalog import Catalog, ProductNotFound, catalog
+from .listing import (
+    EXCERPT_LENGTH,
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    make_excerpt,
+    paginate_posts,
+)
+from .models import ArchiveMonth, Category, Post
+from .search import DatabaseSearchBackend, SearchResults, get_search_backend
+
+
+class CatalogTests(SimpleTestCase):
+    def test_lookup(self):
+        self.assertEqual(catalog.get(2).name, 'Laptop')
+        with self.assertRaises(ProductNotFound):
+            catalog.get(99)
+
+    def test_from_file(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as f:
+            json.dump([{'id': 7, 'name': 'Monitor'}, {'id': '3', 'name': 'Cable'}], f)
+            f.flush()
+            loaded = Catalog.from_file(f.name)
+        self.assertEqual([product.id for product in loaded.featured], [3, 7])
+        self.assertEqual(loaded.get(7).description, '')
+
+    def test_duplicate_ids(self):
+        with self.assertRaises(ValueError):
+            Catalog([{'id': 1, 'name': 'a'}, {'id': '1', 'name': 'b'}])
+
+    def test_pages(self):
+        response = self.client.get(reverse('blog:product', args=[1]))
+        self.assertContains(response, 'Smartphone')
+        self.assertEqual(self.client.get(reverse('blog:product', args=[99])).status_code, 404)
+        self.assertContains(self.client.get(reverse('blog:home')), 'Mouse')
+
+
+class PostTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def create_post(self, title='Post', body='Body', **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Post.objects.create(title=title, body=body, **kwargs)
+
+
+class SearchTests(PostTestCase):
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        self.in_body = self.create_post('Notes', 'Some words about django.', publish=now)
+        self.in_title = self.create_post(
+            'Django tips', 'Some words.', publish=now - timedelta(days=1)
+        )
+        self.other = self.create_post('Flask', 'Nothing to see.')
+
+    def search(self, query, **kwargs):
+        return list(SearchResults(query, **kwargs)[0:10])
+
+    def test_title_match_ranks_above_body_match(self):
+        hits = self.search('django')
+        self.assertEqual([hit.post for hit in hits], [self.in_title, self.in_body])
+        self.assertEqual(SearchResults('django').count(), 2)
+
+    def test_prefix_match(self):
+        self.assertEqual([hit.post for hit in self.search('djan')][0], self.in_title)
+        self.assertEqual(self.search('wor djan'), self.search('words django'))
+
+    def test_highlight_is_escaped(self):
+        post = self.create_post('<b>Django</b> & co', '<script>django()</script>')
+        hit = next(hit for hit in self.search('django') if hit.post == post)
+        self.assertEqual(hit.title, '&lt;b&gt;<mark>Django</mark>&lt;/b&gt; &amp; co')
+        self.assertNotIn('<script>', hit.snippet)
+        self.assertIn('<mark>django</mark>', hit.snippet)
+
+    def test_view(self):
+        response = self.client.get(reverse('blog:search'), {'q': 'django'})
+        self.assertContains(response, '<mark>Django</mark> tips', html=False)
+        self.assertContains(response, '2 results')
+
+    def test_index_follows_edits(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.title = 'Django too'
+            self.other.save()
+        self.assertIn(self.other, [hit.post for hit in self.search('django')])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.delete()
+        self.assertEqual(SearchResults('django').count(), 2)
+
+    def test_database_backend(self):
+        backend = DatabaseSearchBackend()
+        post = self.create_post('<i>Django</i>', 'x' * 500)
+        hits = self.search('django', backend=backend)
+        self.assertEqual([hit.post for hit in hits], [post, self.in_body, self.in_title])
+        self.assertEqual(hits[0].title, '&lt;i&gt;Django&lt;/i&gt;')
+        self.assertTrue(hits[0].snippet.endswith('…'))
+        self.assertEqual(self.search('words djan', backend=backend)[0].post, self.in_body)
+        self.assertEqual(SearchResults('', backend=backend).count(), 0)
+
+    @override_settings(BLOG_SEARCH_BACKEND='blog.search.DatabaseSearchBackend')
+    def test_backend_setting(self):
+        self.assertIsInstance(get_search_backend(), DatabaseSearchBackend)
+
+
+class ListingTests(PostTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name='News', description='')
+        start = timezone.now()
+        # Pairs of posts share a publish time, so pages split ties by id.
+        self.posts = [
+            self.create_post(
+                f'Post {i}', 'word ' * 100,
+                publish=start - timedelta(hours=i // 2),
+                category=self.category if i % 3 else None,
+            )
+            for i in range(25)
+        ]
+
+    def expected(self, queryset=None):
+        return list((queryset or Post.objects.all()).order_by('-publish', '-id'))
+
+    def walk(self, queryset=None, per_page=10):
+        pages = [paginate_posts(queryset, per_page=per_page)]
+        while pages[-1].has_next():
+            pages.append(paginate_posts(queryset, pages[-1].next_cursor, per_page))
+        return pages
+
+    def test_pages_follow_post_ordering(self):
+        pages = self.walk()
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual([post for page in pages for post in page], self.expected())
+        self.assertFalse(pages[0].has_previous())
+        self.assertTrue(pages[-1].has_previous())
+
+    def test_previous_cursor(self):
+        first, second = self.walk()[:2]
+        back = paginate_posts(cursor=second.previous_cursor, per_page=10)
+        self.assertEqual(list(back), list(first))
+        self.assertTrue(back.has_next())
+        self.assertFalse(back.has_previous())
+
+    def test_category(self):
+        queryset = Post.objects.filter(category=self.category)
+        pages = self.walk(queryset, per_page=7)
+        self.assertEqual([post for page in pages for post in page], self.expected(queryset))
+
+    def test_excerpt_without_body(self):
+        with self.assertNumQueries(1):
+            post = paginate_posts(per_page=1).object_list[0]
+            self.assertEqual(post.category, self.category)
+        self.assertIn('body', post.get_deferred_fields())
+        self.assertTrue(post.excerpt.endswith('…'))
+        self.assertLessEqual(len(post.excerpt), EXCERPT_LENGTH + 1)
+
+    def test_make_excerpt(self):
+        self.assertEqual(make_excerpt('short'), 'short')
+        self.assertEqual(make_excerpt('one two, three', length=9), 'one two…')
+
+    def test_tampered_cursor(self):
+        post = self.posts[0]
+        for cursor in ['nope!', encode_cursor(post)[:-3], 'eyJwIjpbIngiLDFdLCJyIjpmYWxzZX0']:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidCursor):
+                    decode_cursor(cursor)
+                response = self.client.get(reverse('blog:posts'), {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+    def test_views(self):
+        response = self.client.get(reverse('blog:posts'))
+        self.assertContains(response, 'Post 0')
+        self.assertNotContains(response, 'Post 10<')
+        cursor = response.context['page'].next_cursor
+        response = self.client.get(reverse('blog:posts'), {'cursor': cursor})
+        self.assertContains(response, 'Post 10')
+
+
+class PageCacheTests(PostTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name='News', description='')
+        self.post = self.create_post('Cached', 'Hello', category=self.category)
+        self.url = reverse('blog:post_details', args=[self.post.pk])
+
+    def test_hot_post_needs_no_query(self):
+        self.assertContains(self.client.get(self.url), 'Hello')
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get(self.url), 'Hello')
+
+    def test_conditional_get(self):
+        response = self.client.get(self.url)
+        etag = response.headers['ETag']
+        self.assertEqual(
+            response.headers['Last-Modified'], http_date(self.post.updated.timestamp())
+        )
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(
+            self.url, headers={'If-Modified-Since': response.headers['Last-Modified']}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_save_changes_the_page(self):
+        etag = self.client.get(self.url).headers['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.body = 'Changed'
+            self.post.save()
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertContains(response, 'Changed')
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_category_change_changes_the_page(self):
+        etag = self.client.get(self.url).headers['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.name = 'Renamed'
+            self.category.save()
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_delete(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_missing_post(self):
+        response = self.client.get(reverse('blog:post_details', args=[999]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_category_page(self):
+        url = reverse('blog:category_posts', args=[self.category.pk])
+        self.assertContains(self.client.get(url), 'Cached')
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get(url), 'Cached')
+        self.create_post('Second', 'Hi', category=self.category)
+        self.assertContains(self.client.get(url), 'Second')
+
+    def test_empty_category_page(self):
+        category = Category.objects.create(name='Empty', description='')
+        response = self.client.get(reverse('blog:category_posts', args=[category.pk]))
+        self.assertContains(response, 'Empty')
+        self.assertEqual(
+            self.client.get(reverse('blog:category_posts', args=[999])).status_code, 404
+        )
+
+    def read_state_during(self, change):
+        """Call ``get_post_state`` on a miss whose row read races ``change``."""
+        post_id = self.post.pk
+        old = (self.post.updated, self.post.category_id)
+        cache.clear()
+
+        def read_then_change():
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            return old
+
+        with mock.patch.object(blog_cache, 'Post') as post_model:
+            rows = post_model.objects.filter.return_value.values_list.return_value
+            rows.first.side_effect = read_then_change
+            blog_cache.get_post_state(post_id)
+        return blog_cache.get_post_state(post_id)
+
+    def test_late_read_does_not_overwrite_a_save(self):
+        def save():
+            self.post.body = 'Changed'
+            self.post.save()
+
+        state = self.read_state_during(save)
+        self.assertEqual(state, (self.post.updated, self.category.pk))
+        self.assertContains(self.client.get(self.url), 'Changed')
+
+    def test_late_read_does_not_revive_a_delete(self):
+        self.assertIsNone(self.read_state_during(self.post.delete))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_bump_category_version(self):
+        version = blog_cache.get_category_version(self.category.pk)
+        changed = blog_cache.get_category_changed(self.category.pk)
+        self.assertEqual(blog_cache.bump_category_version(self.category.pk), version + 1)
+        self.assertGreaterEqual(blog_cache.get_category_changed(self.category.pk), changed)
+        cache.delete(blog_cache.category_version_key(self.category.pk))
+        self.assertGreater(blog_cache.bump_category_version(self.category.pk), version + 1)
+
+
+def archive_rows():
+    return set(
+        ArchiveMonth.objects.filter(post_count__gt=0)
+        .values_list('year', 'month', 'category_id', 'post_count')
+    )
+
+
+class ArchiveTests(PostTestCase):
+    def setUp(self):
+        super().setUp()
+        self.news = Category.objects.create(name='News', description='')
+        self.misc = Category.objects.create(name='Misc', description='')
+        self.post = self.create_post(
+            publish=datetime(2024, 3, 10, tzinfo=dt_timezone.utc), category=self.news
+        )
+
+    def move(self, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            for name, value in fields.items():
+                setattr(self.post, name, value)
+            self.post.save()
+
+    def test_create_move_and_delete(self):
+        self.assertEqual(archive_rows(), {(2024, 3, self.news.pk, 1)})
+        self.move(publish=datetime(2024, 4, 1, 12, tzinfo=dt_timezone.utc))
+        self.assertEqual(archive_rows(), {(2024, 4, self.news.pk, 1)})
+        self.move(category=self.misc)
+        self.assertEqual(archive_rows(), {(2024, 4, self.misc.pk, 1)})
+        self.move(category=None)
+        self.assertEqual(archive_rows(), {(2024, 4, None, 1)})
+        self.move(body='Edited')
+        self.assertEqual(archive_rows(), {(2024, 4, None, 1)})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.delete()
+        self.assertEqual(archive_rows(), set())
+
+    def test_rebuild_matches_counts(self):
+        for day in (1, 2):
+            self.create_post(publish=datetime(2024, 3, day, tzinfo=dt_timezone.utc))
+        self.create_post(
+            publish=datetime(2023, 12, 31, tzinfo=dt_timezone.utc), category=self.misc
+        )
+        maintained = archive_rows()
+        ArchiveMonth.objects.all().delete()
+        self.assertEqual(archive.rebuild(), 3)
+        self.assertEqual(archive_rows(), maintained)
+        self.assertEqual(set(archive.counts()), maintained)
+        self.assertEqual(maintained, {
+            (2024, 3, self.news.pk, 1), (2024, 3, None, 2), (2023, 12, self.misc.pk, 1),
+        })
+
+    @override_settings(TIME_ZONE='Europe/Kyiv')
+    def test_month_boundary_in_current_time_zone(self):
+        # 23:30 UTC on January 31st is already February in Kyiv.
+        post = self.create_post(
+            publish=datetime(2024, 1, 31, 23, 30, tzinfo=dt_timezone.utc)
+        )
+        self.assertEqual(archive.month_of(post.publish), (2024, 2))
+        expected = archive_rows()
+        self.assertIn((2024, 2, None, 1), expected)
+        self.assertIn((2024, 2, None, 1), set(archive.counts()))
+
+        ArchiveMonth.objects.all().delete()
+        migration = import_module('blog.migrations.0005_archive_month')
+        migration.fill_archive(django_apps, None)
+        self.assertEqual(archive_rows(), expected)
+
+        start, end = archive.month_range(2024, 2)
+        self.assertTrue(start <= post.publish < end)
+
+    def test_archive_months(self):
+        self.create_post(publish=datetime(2024, 3, 2, tzinfo=dt_timezone.utc))
+        months = archive.archive_months()
+        self.assertEqual(len(months), 1)
+        self.assertEqual(months[0]['date'], date(2024, 3, 1))
+        self.assertEqual(months[0]['total'], 2)
+        self.assertEqual(months[0]['categories'], [(None, 1), (self.news, 1)])
+
+    def test_views(self):
+        self.assertContains(self.client.get(reverse('blog:archive')), 'March 2024')
+        response = self.client.get(reverse('blog:archive_year', args=[2024]))
+        self.assertContains(response, 'News: 1')
+        response = self.client.get(reverse('blog:archive_month', args=[2024, 3]))
+        self.assertContains(response, 'March 2024')
+        self.assertContains(response, self.post.title)
+        for name, args in [
+            ('blog:archive_year', [2020]),
+            ('blog:archive_month', [2024, 4]),
+            ('blog:archive_month', [2024, 13]),
+        ]:
+            with self.subTest(args=args):
+                response = self.client.get(reverse(name, args=args))
+                self.assertEqual(response.status_code, 404)
+
+
+class FeedTests(PostTestCase):
+    urls = ['blog:feed_rss', 'blog:feed_atom']
+
+    def setUp(self):
+        super().setUp()
+        self.post = self.create_post('Fresh post', 'Feed body')
+
+    def test_feeds(self):
+        for name in self.urls:
+            with self.subTest(feed=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Fresh post')
+                with self.assertNumQueries(0):
+                    response = self.client.get(
+                        reverse(name), headers={'If-None-Match': response.headers['ETag']}
+                    )
+                self.assertEqual(response.status_code, 304)
+
+    def test_key_changes_after_save_and_delete(self):
+        url = reverse('blog:feed_rss')
+        etag = self.client.get(url).headers['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.title = 'Renamed post'
+            self.post.save()
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertContains(response, 'Renamed post')
+        etag = response.headers['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.delete()
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Renamed post')
@@ -1,6 +1,7 @@
 from django.urls import path
 
 from . import views
+from .feeds import LatestPostsAtomFeed, LatestPostsFeed
 
 app_name = 'blog'
 
@@ -10,5 +11,11 @@ urlpatterns = [
     path('about/', views.about, name='about'),
     path('posts/', views.posts_list, name='posts'),
     path('posts/<int:post_id>/', views.post_details, name='post_details'),
-    path('category/<int:category_id>/', views.category_posts, name='category_posts')
+    path('category/<int:category_id>/', views.category_posts, name='category_posts'),
+    path('archive/', views.archive_index, name='archive'),
+    path('archive/<int:year>/', views.archive_index, name='archive_year'),
+    path('archive/<int:year>/<int:month>/', views.archive_month, name='archive_month'),
+    path('search/', views.search, name='search'),
+    path('feed/rss/', LatestPostsFeed(), name='feed_rss'),
+    path('feed/atom/', LatestPostsAtomFeed(), name='feed_atom'),
 ]
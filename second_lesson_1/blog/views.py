@@ -1,65 +1,110 @@
+import hashlib
+
+from django.core.paginator import Paginator
 from django.http import HttpResponse, Http404
 from django.shortcuts import render, get_object_or_404
+from django.template.loader import render_to_string
 
+from . import archive, cache
+from .catalog import ProductNotFound, catalog
+from .listing import PER_PAGE, InvalidCursor, paginate_posts
 from .models import Post, Category
+from .search import SearchResults
 
 menu = ['home', 'about', 'posts']
-items = {
-    'Smartphone': {
-        'id': 1,
-        'description': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit'
-    },
-    'Laptop': {
-        'id': 2,
-        'description': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit'
-    },
-    'Keyboard': {
-        'id': 3,
-        'description': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit'
-    },
-    'Mouse': {
-        'id': 4,
-        'description': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit'
-    }
+
+home_context = {
+    'menu_bar': menu,
+    'products': catalog.featured,
 }
 
 
 def home(request):
-    data = {
-        'menu_bar': menu,
-        'products': items
-    }
-    return render(request, 'blog/index.html', context=data)
+    return render(request, 'blog/index.html', context=home_context)
 
 
 def product(request, product_id):
-    product_lst = [i for i in items if items[i]['id'] == product_id]
+    try:
+        product = catalog.get(product_id)
+    except ProductNotFound as e:
+        raise Http404('No product with id %s.' % product_id) from e
     return render(request, 'blog/product.html',
-                  {'product_desc': items[product_lst[0]], 'product_name': product_lst[0]})
+                  {'product_desc': product, 'product_name': product.name})
 
 
 def about(request):
     return render(request, 'blog/about.html')
 
 
+def post_page(request, queryset=None):
+    try:
+        return paginate_posts(queryset, request.GET.get('cursor'))
+    except InvalidCursor:
+        raise Http404('Invalid page')
+
+
 def posts_list(request):
-    posts = Post.objects.all()
-    # print(posts)
-    return render(request, 'blog/index.html', {'posts': posts})
+    page = post_page(request)
+    return render(request, 'blog/index.html', {'posts': page, 'page': page})
 
 
 def post_details(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    # try:
-    #     post = Post.objects.get(id=post_id)
-    # except Post.DoesNotExist:
-    #     raise Http404('Not found')
-    # post = Post.objects.filter(id=post_id)
-    # print(post)
-    return render(request, 'blog/product.html', {'post': post})
+    # A hot post is served from the cache without a single query.
+    state = cache.get_post_state(post_id)
+    if state is None:
+        raise Http404('No Post matches the given query.')
+    updated, category_id = state
+    category_version = cache.get_category_version(category_id)
+    key = f'blog:post:{post_id}:page:{updated.timestamp()}:{category_version}'
+
+    def render_post():
+        post = get_object_or_404(Post.objects.select_related('category'), id=post_id)
+        return render_to_string('blog/product.html', {'post': post})
+
+    return cache.cached_page(request, key, updated, render_post)
 
 
 def category_posts(request, category_id):
-    category = get_object_or_404(Category, id=category_id)
-    posts = Post.objects.filter(category=category)
-    return render(request, 'blog/index.html', {'posts': posts})
+    version = cache.get_category_version(category_id)
+    cursor = hashlib.md5(request.GET.get('cursor', '').encode()).hexdigest()
+    key = f'blog:category:{category_id}:page:{version}:{cursor}'
+
+    def render_category():
+        page = post_page(request, Post.objects.filter(category_id=category_id))
+        # The posts already carry their category; only an empty page needs a lookup.
+        if page.object_list:
+            category = page.object_list[0].category
+        else:
+            category = get_object_or_404(Category.objects.only('name'), id=category_id)
+        return render_to_string('blog/index.html',
+                                {'posts': page, 'page': page, 'category': category})
+
+    return cache.cached_page(
+        request, key, cache.get_category_changed(category_id), render_category
+    )
+
+
+def archive_index(request, year=None):
+    months = archive.archive_months(year)
+    if year is not None and not months:
+        raise Http404('No posts in %s.' % year)
+    return render(request, 'blog/archive.html', {'months': months, 'year': year})
+
+
+def archive_month(request, year, month):
+    if not 1 <= month <= 12:
+        raise Http404('No such month.')
+    start, end = archive.month_range(year, month)
+    page = post_page(request, Post.objects.filter(publish__gte=start, publish__lt=end))
+    if not page.object_list:
+        raise Http404('No posts in this month.')
+    return render(request, 'blog/index.html',
+                  {'posts': page, 'page': page, 'heading': archive.month_name(year, month)})
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page = None
+    if query:
+        page = Paginator(SearchResults(query), PER_PAGE).get_page(request.GET.get('page'))
+    return render(request, 'blog/search.html', {'query': query, 'page': page})